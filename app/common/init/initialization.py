@@ -25,7 +25,9 @@ from app.infrastructure.db.mongo.indexes import ensure_mongo_indexes
 from app.infrastructure.db.mongo.mongo_client import get_mongo_client
 from app.infrastructure.db.vector.vector_db import initialize_vector_db
 from app.infrastructure.embedding.embedding_model import get_embedding_model
+from app.infrastructure.embedding.rate_limiter import warm_up_token_estimator
 from app.infrastructure.search.bm25_retriever import get_bm25_retriever
+from app.infrastructure.search.dense_matrix import get_dense_matrix_index
 
 logger = get_logger(__name__)
 
@@ -45,8 +47,10 @@ class InitializationService:
         """
         매 startup에서 호출. 다음만 수행한다:
         - 의존성 초기화 (OpenAI client, 임베딩 모델 — RAG 첫 호출 지연 방지)
+        - OpenAI 임베딩이면 레이트 리미터용 tiktoken 인코딩을 스레드 풀에서 미리 로드
         - 벡터 DB 연결
-        - BM25 인메모리 인덱스 빌드 (데이터 없으면 no-op)
+        - BM25 인덱스 로드 (최신 스냅샷이 있으면 memmap 로드, 없거나 stale 이면 빌드 후 저장)
+        - 소규모 컬렉션 Dense 행렬 로드 (DENSE_MATRIX_ENABLED=1 일 때)
 
         시드 데이터/벡터 인덱싱/가상 질문 생성은 별도 admin API로 분리.
         """
@@ -54,10 +58,13 @@ class InitializationService:
             logger.info("[START] lightweight 초기화 시작...")
 
             initialize_dependencies()
+            if get_embedding_model().use_openai:
+                await warm_up_token_estimator()
             ensure_mongo_indexes(get_mongo_client())
             self.vector_db = initialize_vector_db()
             self.indexing_service = get_indexing_service()
-            self._rebuild_bm25_safely()
+            self._load_or_build_bm25_safely()
+            self._load_dense_matrix_safely()
 
             logger.info("[OK] lightweight 초기화 완료")
             return {"status": "success", "mode": "lightweight"}
@@ -93,11 +100,11 @@ class InitializationService:
             return {"status": "error", "message": str(e)}
 
     async def rebuild_vector_index(self) -> Dict[str, Any]:
-        """ChromaDB에 모든 컬렉션을 재인덱싱한다. (admin)"""
+        """ChromaDB에 모든 컬렉션을 재인덱싱한다. BM25 는 배치 단위로 증분 갱신된다. (admin)"""
         try:
             indexing_service = self._ensure_indexing_service()
+            # BM25 는 index_documents_batch 에서 증분 반영되므로 전체 재구축하지 않는다 (스냅샷은 index_all_data 가 저장)
             result = await indexing_service.index_all_data()
-            self._rebuild_bm25_safely()  # 새 벡터 데이터 반영
             return {"status": "success", "indexing_result": result}
         except Exception as e:
             logger.error(f"[ERROR] 벡터 인덱싱 실패: {e}")
@@ -180,10 +187,28 @@ class InitializationService:
     def _rebuild_bm25_safely(self) -> None:
         try:
             vector_db = self.vector_db or initialize_vector_db()
-            get_bm25_retriever().build_index(vector_db)
+            retriever = get_bm25_retriever()
+            retriever.build_index(vector_db)
+            retriever.save_snapshot(vector_db)
         except Exception as e:
             logger.warning(f"[WARN] BM25 인덱스 빌드 실패 (서비스는 계속): {e}")
 
+    def _load_or_build_bm25_safely(self) -> None:
+        try:
+            vector_db = self.vector_db or initialize_vector_db()
+            if get_bm25_retriever().load_snapshot(vector_db):
+                return
+        except Exception as e:
+            logger.warning(f"[WARN] BM25 스냅샷 로드 실패 → 재빌드: {e}")
+        self._rebuild_bm25_safely()
+
+    def _load_dense_matrix_safely(self) -> None:
+        try:
+            vector_db = self.vector_db or initialize_vector_db()
+            get_dense_matrix_index().load(vector_db)
+        except Exception as e:
+            logger.warning(f"[WARN] Dense 행렬 인덱스 로드 실패 (ChromaDB 로 검색): {e}")
+
 
 # 전역 초기화 서비스 인스턴스
 _initialization_service: Optional[InitializationService] = None
@@ -13,6 +13,7 @@ from app.infrastructure.external.openai_client import OpenAIClient
 from app.infrastructure.rag.retriever import RagRetriever
 from app.infrastructure.rag.service import RagService
 from app.infrastructure.search.hybrid_search import get_hybrid_search_service
+from app.infrastructure.search.search_scope import SearchScope
 
 
 INTERVENTION_COOLDOWN_TURNS = 3  # proactive hint 사이 최소 assistant 턴 수
@@ -157,6 +158,39 @@ class AgentService:
             reason="일반 대화 처리",
         )
 
+    def rag_scope(
+        self,
+        message: str,
+        weakness_profile: StudentWeaknessProfile,
+        decision: AgentDecision,
+    ) -> Optional[SearchScope]:
+        """
+        RAG 검색 범위. 선제 힌트는 대상 개념으로, 질문은 메시지에 언급된 약점 개념으로 좁힌다.
+        해당 개념이 없으면 None (전체 검색).
+        """
+        if decision.action == "proactive_hint" and decision.target_concept:
+            return SearchScope(concept_key=decision.target_concept)
+
+        mentioned = [
+            wc.concept_key
+            for wc in weakness_profile.weak_concepts
+            if wc.concept_key and self._mentions_concept(message, wc.concept_key)
+        ]
+        if mentioned:
+            return SearchScope(concept_key=mentioned)
+        return None
+
+    @staticmethod
+    def _mentions_concept(message: str, concept_key: str) -> bool:
+        """
+        개념 키("되/돼", "맞추다/맞히다")의 단어가 메시지에 모두 나오는지.
+        키 전체는 자유 문장에 그대로 나오지 않으므로 "/" 로 나눠 단어별로 보고,
+        "다" 로 끝나는 단어는 활용형("맞추는", "맞히는")도 잡히도록 어간만 찾는다.
+        """
+        words = [word.strip() for word in concept_key.split("/") if word.strip()]
+        stems = [word[:-1] if len(word) > 1 and word.endswith("다") else word for word in words]
+        return bool(stems) and all(stem in message for stem in stems)
+
     def _is_question(self, message: str) -> bool:
         markers = [
             "?", "？", "뭐야", "뭐예요", "왜", "어떻게", "무슨", "어떤",
@@ -113,12 +113,19 @@ def build_agent_graph(agent_service: Any):
         return {"decision": decision}
 
     async def rag_search(state: AgentState) -> dict:
-        """RagService를 호출해 관련 문서를 검색한다."""
-        result = await agent_service.rag_service.search(state["user_message"])
+        """RagService를 호출해 관련 문서를 검색한다 (약점 개념이 있으면 해당 범위로 좁혀서)."""
+        scope = agent_service.rag_scope(
+            state["user_message"], state["weakness_profile"], state["decision"]
+        )
+        result = await agent_service.rag_service.search(state["user_message"], scope=scope)
+        if scope is not None and not result.documents:
+            # 범위 안에 문서가 없으면 (범위 키 없이 인덱싱된 경우 등) 전체 검색으로 대체
+            result = await agent_service.rag_service.search(state["user_message"])
         context = result.context or ""
         logger.info(
-            "[AGENT] rag_search: query=%r context_chars=%d",
+            "[AGENT] rag_search: query=%r scope=%s context_chars=%d",
             _short(state["user_message"]),
+            scope.filters() if scope is not None else None,
             len(context),
         )
         return {"rag_context": context, "used_tools": ["rag_search"]}
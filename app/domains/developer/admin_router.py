@@ -3,11 +3,16 @@
 
 평소 startup은 lightweight 이므로, 시드/인덱싱/가상 질문 생성은 여기서 호출한다.
 """
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.common.init.initialization import get_initialization_service
 from app.domains.developer.indexing_service import get_indexing_service
 from app.domains.auth.dependency.auth_dependencies import get_current_developer
+from app.infrastructure.embedding.embedding_cache import get_embedding_cache
+from app.infrastructure.embedding.query_embedding_cache import get_query_embedding_cache
+from app.infrastructure.rag.retrieval_cache import get_retrieval_cache
 
 router = APIRouter(
     prefix="/admin",
@@ -29,6 +34,27 @@ async def get_system_status():
         raise HTTPException(status_code=500, detail=f"상태 확인 실패: {str(e)}")
 
 
+@router.get("/retrieval-cache")
+async def get_retrieval_cache_stats():
+    """검색 결과 캐시 적중/미스 집계와 현재 인덱스 세대를 조회합니다 (현재 워커 기준)."""
+    cache = get_retrieval_cache()
+    return {**cache.stats(), "generation": cache.current_generation()}
+
+
+@router.get("/embedding-cache")
+async def get_embedding_cache_stats():
+    """재인덱싱용 디스크 임베딩 캐시의 항목 수와 적중/미스 집계를 조회합니다."""
+    # 항목 수는 SQLite 전체 COUNT → 인덱싱 중 락 대기와 함께 이벤트 루프를 막지 않도록 스레드 풀에서
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_embedding_cache().stats)
+
+
+@router.get("/query-embedding-cache")
+async def get_query_embedding_cache_stats():
+    """질의 임베딩 LRU 의 크기, 메모리 사용량, 적중률을 조회합니다 (현재 워커 기준)."""
+    return get_query_embedding_cache().stats()
+
+
 # ----------------------------------------------------------------------
 # 초기화 / 시드 / 인덱싱
 # ----------------------------------------------------------------------
@@ -58,7 +84,7 @@ async def seed_data():
 
 @router.post("/rebuild-vector-index")
 async def rebuild_vector_index():
-    """ChromaDB 모든 컬렉션(card_check, korean_word_problems, pdf_documents)을 재인덱싱하고 BM25도 다시 빌드합니다."""
+    """ChromaDB 모든 컬렉션(card_check, korean_word_problems, pdf_documents)을 재인덱싱합니다. BM25는 배치마다 증분 반영됩니다."""
     try:
         result = await get_initialization_service().rebuild_vector_index()
         if result.get("status") != "success":
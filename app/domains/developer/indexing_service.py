@@ -3,16 +3,40 @@ from typing import List, Dict, Any
 import logging
 import os
 
+from app.infrastructure.embedding.embedding_cache import get_embedding_cache
+from app.infrastructure.search.bm25_retriever import BM25_COLLECTIONS, get_bm25_retriever
+from app.infrastructure.search.dense_matrix import get_dense_matrix_index
+from app.infrastructure.search.index_generation import bump_index_generation, read_bm25_generation
+
 logger = logging.getLogger(__name__)
 
 
 class IndexingService:
-    def __init__(self, vector_db, embedding_model):
+    def __init__(self, vector_db, embedding_model, bm25=None, dense_matrix=None, embedding_cache=None):
         self.vector_db = vector_db
         self.embedding_model = embedding_model
+        # 재인덱싱 시 내용이 바뀌지 않은 텍스트는 디스크 캐시의 벡터를 재사용
+        self.embedding_cache = embedding_cache or get_embedding_cache()
+        # ChromaDB 변경분을 BM25 인덱스 / 인메모리 Dense 행렬에 증분 반영
+        self.bm25 = bm25 or get_bm25_retriever()
+        self.dense_matrix = dense_matrix or get_dense_matrix_index()
         # 환경 변수에서 배치 크기 설정
         self.batch_size = int(os.getenv("INDEXING_BATCH_SIZE", "100"))
 
+    def _bump_generation(self, collection_name: str) -> None:
+        """다른 워커/스냅샷이 변경을 감지할 수 있도록 세대 번호 증가 (이 워커의 인덱스는 이미 반영됨)."""
+        affects_bm25 = collection_name in BM25_COLLECTIONS
+        self.dense_matrix.acknowledge_generation(bump_index_generation(affects_bm25=affects_bm25))
+        if affects_bm25:
+            self.bm25.acknowledge_generation(read_bm25_generation())
+
+    def _save_bm25_snapshot(self) -> None:
+        """증분 반영한 BM25 인덱스를 스냅샷으로 저장 (재시작/다른 워커가 오래된 스냅샷을 읽지 않도록)."""
+        try:
+            self.bm25.save_snapshot(self.vector_db)
+        except Exception as e:
+            logger.warning(f"[WARN] BM25 스냅샷 저장 실패 (서비스는 계속): {e}")
+
     async def index_documents_batch(self, documents: List[Dict[str, Any]], collection_name: str) -> int:
         """문서를 배치로 나누어 인덱싱"""
         if not documents:
@@ -39,16 +63,20 @@ class IndexingService:
                 batch_ids = [doc["id"] for doc in batch_docs]
                 batch_metadatas = [doc["metadata"] for doc in batch_docs]
 
-                # 배치별 임베딩 생성 (최적화된 임베딩 모델 사용)
-                embeddings = await self.embedding_model.get_embeddings(batch_texts)
+                # 배치별 임베딩 생성 (캐시에 없는 새/변경 텍스트만 모델 호출)
+                embeddings = await self.embedding_cache.embed(self.embedding_model, batch_texts)
 
-                # 벡터 DB에 배치 삽입
-                collection.add(
+                # 벡터 DB에 배치 삽입 (같은 id 는 교체)
+                collection.upsert(
                     documents=batch_texts,
                     embeddings=embeddings,
                     metadatas=batch_metadatas,
                     ids=batch_ids
                 )
+                self.bm25.upsert_documents(collection_name, batch_ids, batch_texts, batch_metadatas)
+                self.dense_matrix.upsert_documents(
+                    collection_name, batch_ids, embeddings, batch_texts, batch_metadatas
+                )
 
                 processed_docs += batch_size_actual
                 progress = (processed_docs / total_docs) * 100
@@ -62,6 +90,9 @@ class IndexingService:
                 # 실패한 배치는 건너뛰고 계속 진행
                 continue
 
+        if processed_docs:
+            self._bump_generation(collection_name)
+
         logger.info(f"[OK] {collection_name} 인덱싱 완료: {processed_docs}개 문서")
         return processed_docs
 
@@ -117,32 +148,6 @@ class IndexingService:
             logger.error(f"카드 체크 데이터 인덱싱 실패: {e}")
             return {"status": "error", "message": str(e)}
 
-    async def index_pdf_documents(self) -> Dict[str, Any]:
-        """PDF 문서들을 인덱싱"""
-        try:
-            from app.infrastructure.loaders.pdf_loader import load_pdf_documents
-            
-            # PDF 데이터 로드
-            pdf_data = load_pdf_documents()
-            if not pdf_data:
-                return {"status": "no_data", "message": "PDF 파일이 없습니다."}
-            
-            # 문서 변환 (이미 전처리된 상태)
-            documents = self.embedding_model.prepare_documents_for_indexing(pdf_data, "pdf_documents")
-            
-            # 배치 인덱싱
-            indexed_count = await self.index_documents_batch(documents, "pdf_documents")
-            
-            return {
-                "status": "success",
-                "message": "PDF 문서 인덱싱 완료",
-                "indexed_count": indexed_count
-            }
-            
-        except Exception as e:
-            logger.error(f"PDF 문서 인덱싱 실패: {e}")
-            return {"status": "error", "message": f"인덱싱 실패: {str(e)}"}
-
     async def index_all_data(self) -> Dict[str, Any]:
         """모든 데이터를 병렬로 인덱싱"""
         logger.info("[START] 전체 데이터 인덱싱 시작...")
@@ -151,11 +156,12 @@ class IndexingService:
         tasks = [
             self.index_korean_word_problems(),
             self.index_card_check_data(),
-            self.index_pdf_documents()  # PDF 인덱싱 추가
+            self.index_pdf_documents(save_snapshot=False)  # PDF 인덱싱 추가
         ]
 
         # 병렬 실행
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        self._save_bm25_snapshot()
 
         successful_collections = 0
         total_collections = len(tasks)
@@ -190,6 +196,11 @@ class IndexingService:
             if collection:
                 # 컬렉션 삭제
                 self.vector_db.client.delete_collection(collection_name)
+                self.bm25.delete_collection(collection_name)
+                self.dense_matrix.delete_collection(collection_name)
+                self._bump_generation(collection_name)
+                if collection_name in BM25_COLLECTIONS:
+                    self._save_bm25_snapshot()
                 logger.info(f"[OK] {collection_name} 컬렉션 삭제 완료")
                 return {
                     "status": "success",
@@ -207,8 +218,8 @@ class IndexingService:
                 "message": f"컬렉션 삭제 중 오류 발생: {str(e)}"
             }
 
-    async def index_pdf_documents(self) -> Dict[str, Any]:
-        """PDF 문서들을 인덱싱"""
+    async def index_pdf_documents(self, save_snapshot: bool = True) -> Dict[str, Any]:
+        """PDF 문서들을 인덱싱 (save_snapshot: 끝나면 BM25 스냅샷 저장, index_all_data 는 마지막에 한 번만)"""
         try:
             from app.infrastructure.loaders.pdf_loader import load_pdf_documents
 
@@ -222,6 +233,8 @@ class IndexingService:
 
             # 배치 인덱싱
             indexed_count = await self.index_documents_batch(documents, "pdf_documents")
+            if indexed_count and save_snapshot:
+                self._save_bm25_snapshot()
 
             return {
                 "status": "success",
@@ -3,11 +3,14 @@
 2. 환경 변수 지원: .env 파일을 통한 설정 오버라이드
 3. 컬렉션별 메타데이터: 각 컬렉션의 특성에 맞는 설정
 4. 검색 설정: 유사도 임계값, 기본 검색 개수 등
+5. HNSW 파라미터: 컬렉션별 construction_ef / M / search_ef (hnsw_params.json, scripts/tune_hnsw.py 가 갱신)
 """
 
+import json
 import os
 
 from pathlib import Path
+from typing import Any, Dict
 
 
 class VectorDBConfig:
@@ -51,6 +54,11 @@ class VectorDBConfig:
         "similarity_threshold": 0.7
     }
 
+    # HNSW 설정 (값이 없으면 ChromaDB 기본값과 같은 DEFAULT_HNSW_PARAMS)
+    HNSW_SPACE = "cosine"
+    DEFAULT_HNSW_PARAMS = {"construction_ef": 100, "M": 16, "search_ef": 100}
+    DEFAULT_HNSW_PARAMS_FILE = str(Path(__file__).with_name("hnsw_params.json"))
+
     @classmethod
     def get_persist_directory(cls):
         """저장 디렉토리를 반환합니다."""
@@ -74,4 +82,54 @@ class VectorDBConfig:
     @classmethod
     def get_search_config(cls):
         """검색 설정을 반환합니다."""
-        return cls.SEARCH_CONFIG
\ No newline at end of file
+        return cls.SEARCH_CONFIG
+
+    @classmethod
+    def get_hnsw_params_path(cls) -> str:
+        """HNSW 파라미터 파일 경로를 반환합니다."""
+        return os.getenv("HNSW_PARAMS_FILE", cls.DEFAULT_HNSW_PARAMS_FILE)
+
+    @classmethod
+    def load_hnsw_config(cls) -> Dict[str, Any]:
+        """HNSW 파라미터 파일 전체를 반환합니다. 없으면 빈 설정."""
+        try:
+            with open(cls.get_hnsw_params_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"default": {}, "collections": {}}
+
+    @classmethod
+    def get_hnsw_params(cls, collection_name: str) -> Dict[str, int]:
+        """컬렉션의 HNSW 파라미터 (기본값 ← 파일 default ← 파일 컬렉션별 값)."""
+        config = cls.load_hnsw_config()
+        params = dict(cls.DEFAULT_HNSW_PARAMS)
+        params.update(config.get("default") or {})
+        params.update((config.get("collections") or {}).get(collection_name) or {})
+        return {key: int(params[key]) for key in cls.DEFAULT_HNSW_PARAMS}
+
+    @classmethod
+    def get_hnsw_metadata(cls, collection_name: str) -> Dict[str, Any]:
+        """컬렉션 생성 시 넘길 ChromaDB hnsw:* 메타데이터를 반환합니다."""
+        params = cls.get_hnsw_params(collection_name)
+        return {
+            "hnsw:space": cls.HNSW_SPACE,
+            "hnsw:construction_ef": params["construction_ef"],
+            "hnsw:M": params["M"],
+            "hnsw:search_ef": params["search_ef"],
+        }
+
+    @classmethod
+    def save_hnsw_params(cls, collection_params: Dict[str, Dict[str, Any]]) -> str:
+        """컬렉션별 HNSW 파라미터를 파일에 병합 저장합니다. 저장 경로를 반환합니다."""
+        path = cls.get_hnsw_params_path()
+        config = cls.load_hnsw_config()
+        collections = config.setdefault("collections", {})
+        for name, params in collection_params.items():
+            collections[name] = {**collections.get(name, {}), **params}
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,130 @@
+"""
+HNSW 파라미터 오프라인 튜너
+
+실제 컬렉션의 임베딩을 임시(in-memory) ChromaDB 컬렉션에 (M, construction_ef) 조합별로 다시 만들고,
+search_ef 를 바꿔 가며 정확한 brute-force 코사인 top-k 대비 recall@k 와 질의 지연(p50/p99)을 잰다.
+
+- 질의 벡터: 가상 질문 컬렉션(<name>_questions)이 있으면 그 임베딩(실제 질문에 가까움), 없으면 문서 임베딩 샘플
+- 선택 기준: recall@k ≥ target_recall 인 조합 중 p99 가 가장 낮은 것 (없으면 recall 최대)
+
+실행은 scripts/tune_hnsw.py 참고.
+"""
+
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+DEFAULT_GRID = {
+    "M": (8, 16, 32),
+    "construction_ef": (64, 100, 200),
+    "search_ef": (10, 20, 40, 100, 200),
+}
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """brute-force 코사인 top-k 행 번호 (질의 수, k)."""
+    k = min(k, len(vectors))
+    similarities = _normalize(queries) @ _normalize(vectors).T
+    top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(similarities, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(approx: Sequence[Iterable[int]], exact: np.ndarray) -> float:
+    """질의별 |approx ∩ exact| / k 의 평균."""
+    if len(exact) == 0:
+        return 1.0
+    hits = sum(len(set(found) & set(truth.tolist())) for found, truth in zip(approx, exact))
+    return hits / exact.size
+
+
+def choose_params(results: List[Dict[str, Any]], target_recall: float) -> Dict[str, Any]:
+    """recall 목표를 만족하는 조합 중 p99 → p50 → M 이 가장 작은 것을 고른다."""
+    passing = [r for r in results if r["recall"] >= target_recall]
+    if passing:
+        return min(passing, key=lambda r: (r["p99_ms"], r["p50_ms"], r["M"], r["construction_ef"]))
+    return max(results, key=lambda r: (r["recall"], -r["p99_ms"]))
+
+
+def _add_in_batches(collection, vectors: np.ndarray, batch_size: int) -> None:
+    for start in range(0, len(vectors), batch_size):
+        chunk = vectors[start : start + batch_size]
+        collection.add(
+            ids=[str(row) for row in range(start, start + len(chunk))],
+            embeddings=chunk.tolist(),
+        )
+
+
+def sweep(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    grid: Dict[str, Sequence[int]] | None = None,
+    client=None,
+) -> List[Dict[str, Any]]:
+    """그리드 전체를 측정해 [{"M", "construction_ef", "search_ef", "recall", "p50_ms", "p99_ms"}] 를 반환한다."""
+    import chromadb
+
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    client = client or chromadb.EphemeralClient()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(vectors))
+    exact = exact_top_k(vectors, queries, k)
+    batch_size = client.get_max_batch_size()
+
+    results = []
+    for m in grid["M"]:
+        for construction_ef in grid["construction_ef"]:
+            name = f"hnsw-tune-{uuid.uuid4().hex[:12]}"
+            collection = client.create_collection(
+                name,
+                metadata={
+                    "hnsw:space": "cosine",
+                    "hnsw:M": int(m),
+                    "hnsw:construction_ef": int(construction_ef),
+                },
+            )
+            try:
+                _add_in_batches(collection, vectors, batch_size)
+                for search_ef in grid["search_ef"]:
+                    collection.modify(configuration={"hnsw": {"ef_search": int(search_ef)}})
+
+                    latencies, found = [], []
+                    for query in queries:
+                        started = time.perf_counter()
+                        res = collection.query(
+                            query_embeddings=[query.tolist()], n_results=k, include=[]
+                        )
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        found.append([int(doc_id) for doc_id in res["ids"][0]])
+
+                    results.append(
+                        {
+                            "M": int(m),
+                            "construction_ef": int(construction_ef),
+                            "search_ef": int(search_ef),
+                            "recall": round(recall_at_k(found, exact), 4),
+                            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+                        }
+                    )
+            finally:
+                client.delete_collection(name)
+    return results
+
+
+def sample_queries(vectors: np.ndarray, n_queries: int, seed: int = 0) -> np.ndarray:
+    """질의 벡터 n_queries 개를 비복원 추출한다 (전체보다 많으면 전체)."""
+    if len(vectors) <= n_queries:
+        return vectors
+    rng = np.random.default_rng(seed)
+    return vectors[rng.choice(len(vectors), size=n_queries, replace=False)]
@@ -1,6 +1,7 @@
 import chromadb
 from chromadb.config import Settings
 from dotenv import load_dotenv
+from app.infrastructure.db.vector.config.vector_db_config import VectorDBConfig
 from app.common.logging.logging_config import get_logger
 
 load_dotenv()
@@ -32,13 +33,13 @@ class VectorDatabase:
         """필요한 컬렉션들을 초기화합니다."""
         collections_config = {
             "korean_word_problems": {
-                "metadata": {"type": "educational", "language": "korean", "hnsw:space": "cosine"}
+                "metadata": {"type": "educational", "language": "korean"}
             },
             "card_check": {
-                "metadata": {"type": "educational", "language": "korean", "hnsw:space": "cosine"}
+                "metadata": {"type": "educational", "language": "korean"}
             },
             "pdf_documents": {
-                "metadata": {"type": "document", "language": "korean", "source": "pdf", "hnsw:space": "cosine"}
+                "metadata": {"type": "document", "language": "korean", "source": "pdf"}
             }
         }
 
@@ -46,8 +47,9 @@ class VectorDatabase:
             try:
                 collection = self.client.get_or_create_collection(
                     name=collection_name,
-                    metadata=config["metadata"]
+                    metadata={**config["metadata"], **VectorDBConfig.get_hnsw_metadata(collection_name)}
                 )
+                sync_hnsw_search_ef(collection, collection_name)
                 self.collections[collection_name] = collection
                 logger.info(f"[OK] 컬렉션 '{collection_name}' 초기화 완료")
             except Exception as e:
@@ -79,6 +81,39 @@ class VectorDatabase:
             }
         return None
 
+def sync_hnsw_search_ef(collection, collection_name: str) -> None:
+    """
+    이미 존재하는 컬렉션에 설정된 search_ef 를 반영합니다.
+
+    get_or_create_collection 은 기존 컬렉션의 메타데이터를 바꾸지 않는다.
+    search_ef 는 실행 중 변경 가능하지만 construction_ef / M 은 컬렉션을 다시 만들어야 적용된다.
+    """
+    params = VectorDBConfig.get_hnsw_params(collection_name)
+    try:
+        current = (collection.configuration or {}).get("hnsw") or {}
+    except Exception:
+        return
+
+    if current.get("ef_search") not in (None, params["search_ef"]):
+        try:
+            collection.modify(configuration={"hnsw": {"ef_search": params["search_ef"]}})
+            logger.info(
+                f"[OK] [{collection_name}] search_ef {current.get('ef_search')} → {params['search_ef']}"
+            )
+        except Exception as e:
+            logger.warning(f"[WARN] [{collection_name}] search_ef 변경 실패: {e}")
+
+    if (current.get("max_neighbors"), current.get("ef_construction")) not in (
+        (None, None),
+        (params["M"], params["construction_ef"]),
+    ):
+        logger.info(
+            f"[INFO] [{collection_name}] 설정된 M={params['M']}, construction_ef={params['construction_ef']} 는 "
+            f"컬렉션 재생성 후 적용됩니다 (현재 M={current.get('max_neighbors')}, "
+            f"construction_ef={current.get('ef_construction')})"
+        )
+
+
 # 전역 벡터 DB 인스턴스
 vector_db = None
 
@@ -0,0 +1,207 @@
+"""
+디스크 임베딩 캐시 (내용 주소 기반)
+
+/admin/rebuild-vector-index, /admin/indexing/pdf 는 바뀌지 않은 카드/문제/PDF 청크까지 매번 다시 임베딩한다.
+(모델 네임스페이스, sha256(텍스트)) → 벡터를 SQLite 에 저장해 두고
+새로 생겼거나 내용이 바뀐 텍스트만 모델에 보낸다.
+
+- 네임스페이스: EmbeddingModel.cache_namespace (공급자 + 모델명 + EMBEDDING_MODEL_VERSION)
+  → 모델을 바꾸면 이전 벡터는 자연히 쓰이지 않는다
+- 모델 차원과 다른 벡터는 저장하지 않는다 (다른 벡터 공간이 섞이지 않도록)
+- WAL 모드라 여러 워커가 같은 파일을 읽고 쓸 수 있다
+- 벡터는 quantized_store 형식으로 저장한다 (EMBEDDING_CACHE_DTYPE: float32 기본 | float16 | int8).
+  float32 가 아니면 저장 네임스페이스에 "|<dtype>" 이 붙어 형식이 다른 행끼리 섞이지 않는다.
+  양자화한 캐시 값이 그대로 재인덱싱에 쓰이므로 재현율을 확인한 뒤 켠다 (scripts/benchmark_quantization.py)
+
+설정: EMBEDDING_CACHE_ENABLED (기본 1), EMBEDDING_CACHE_PATH (기본 ./embedding_cache/embeddings.sqlite3)
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.common.logging.logging_config import get_logger
+from app.infrastructure.search.quantized_store import QUANTIZATION_MODES, decode_vector, encode_vector
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = "./embedding_cache/embeddings.sqlite3"
+# SQLite 바인딩 변수 한도(기본 999)보다 작게 나눠 조회
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str | None = None, enabled: bool | None = None, dtype: str | None = None):
+        if enabled is None:
+            enabled = os.getenv("EMBEDDING_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+        if dtype is None:
+            dtype = os.getenv("EMBEDDING_CACHE_DTYPE", "float32").lower()
+        if dtype not in QUANTIZATION_MODES:
+            raise ValueError(f"EMBEDDING_CACHE_DTYPE 는 {QUANTIZATION_MODES} 중 하나여야 합니다: {dtype}")
+        self.dtype = dtype
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+        if self.enabled:
+            try:
+                self._conn = self._connect()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"[WARN] 임베딩 캐시 열기 실패 → 캐시 없이 진행: {e}")
+                self.enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                namespace TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (namespace, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.commit()
+        return conn
+
+    def _storage_namespace(self, namespace: str) -> str:
+        return namespace if self.dtype == "float32" else f"{namespace}|{self.dtype}"
+
+    def get_many(self, namespace: str, texts: Sequence[str]) -> List[List[float] | None]:
+        """텍스트별 캐시된 벡터 (없으면 None). 조회에 실패하면 전부 None (모두 다시 임베딩)."""
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+        namespace = self._storage_namespace(namespace)
+
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        try:
+            with self._lock:
+                for start in range(0, len(unique), _LOOKUP_CHUNK):
+                    chunk = unique[start : start + _LOOKUP_CHUNK]
+                    rows = self._conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings "
+                        f"WHERE namespace = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                        [namespace, *chunk],
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[bytes(key)] = decode_vector(bytes(blob), self.dtype).tolist()
+        except sqlite3.Error as e:
+            logger.warning(f"[WARN] 임베딩 캐시 조회 실패 → 전부 다시 임베딩: {e}")
+            self.misses += len(texts)
+            return [None] * len(texts)
+
+        results = [found.get(key) for key in hashes]
+        hits = sum(vector is not None for vector in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(
+        self,
+        namespace: str,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        dim: int | None = None,
+    ) -> int:
+        """벡터를 저장한다. dim 을 주면 차원이 다른 벡터는 건너뛴다. 저장한 개수를 반환."""
+        if not self.enabled:
+            return 0
+        namespace = self._storage_namespace(namespace)
+        rows = []
+        for text, vector in zip(texts, vectors):
+            array = np.asarray(vector, dtype=np.float32)
+            if not array.size or (dim is not None and array.size != dim):
+                continue
+            rows.append((namespace, text_hash(text), array.size, encode_vector(array, self.dtype)))
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (namespace, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[WARN] 임베딩 캐시 저장 실패: {e}")
+            return 0
+        return len(rows)
+
+    async def embed(self, embedding_model, texts: List[str]) -> List[List[float]]:
+        """
+        캐시에 없는 텍스트만 embedding_model.get_embeddings 로 임베딩하고 결과를 캐시에 저장한다.
+        모델에 cache_namespace 가 없으면 (테스트용 가짜 모델 등) 캐시 없이 그대로 호출한다.
+        SQLite 조회/저장은 기본 스레드 풀에서 실행한다 (수천 건 인덱싱 중에도 이벤트 루프를 막지 않도록).
+        """
+        namespace = getattr(embedding_model, "cache_namespace", None)
+        if not self.enabled or not namespace or not texts:
+            return await embedding_model.get_embeddings(texts)
+
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(None, self.get_many, namespace, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            fresh = await embedding_model.get_embeddings(missing)
+            dim = getattr(embedding_model, "embedding_dimension", None)
+            await loop.run_in_executor(None, lambda: self.put_many(namespace, missing, fresh, dim=dim))
+            by_text = dict(zip(missing, fresh))
+            vectors = [vector if vector is not None else by_text[text] for text, vector in zip(texts, vectors)]
+
+        logger.debug(f"임베딩 캐시: {len(texts) - len(missing)}/{len(texts)}개 재사용")
+        return vectors
+
+    def stats(self) -> Dict[str, object]:
+        """적중/미스 집계와 항목 수. 항목 수는 전체 COUNT 라 이벤트 루프 밖(스레드 풀)에서 호출한다."""
+        lookups = self.hits + self.misses
+        stats = {
+            "enabled": self.enabled,
+            "path": self.path,
+            "dtype": self.dtype,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if self.enabled:
+            try:
+                with self._lock:
+                    stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning(f"[WARN] 임베딩 캐시 항목 수 조회 실패: {e}")
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self.enabled = False
+
+
+# 전역 인스턴스
+_embedding_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
@@ -1,19 +1,62 @@
 import os
 import asyncio
+import random
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 from app.common.logging.logging_config import get_logger
+from app.infrastructure.embedding.length_batching import fixed_batches, get_token_budget, plan_length_batches
+from app.infrastructure.embedding.micro_batcher import EmbeddingMicroBatcher
+from app.infrastructure.embedding.onnx_backend import OnnxBackendError, get_local_backend, load_onnx_encoder
+from app.infrastructure.embedding.query_embedding_cache import get_query_embedding_cache
+from app.infrastructure.embedding.rate_limiter import estimate_tokens, get_openai_rate_limiter
+from app.infrastructure.embedding.sidecar import EmbeddingSidecarClient
+from app.infrastructure.search.search_scope import scope_metadata
 
 load_dotenv()
 
 logger = get_logger(__name__)
 
 try:
-    from openai import AsyncOpenAI
+    from openai import (
+        APIConnectionError,
+        APITimeoutError,
+        AsyncOpenAI,
+        InternalServerError,
+        RateLimitError,
+    )
+
+    _RETRYABLE_OPENAI_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
 except ModuleNotFoundError:
     AsyncOpenAI = None
+    _RETRYABLE_OPENAI_ERRORS = ()
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+OPENAI_EMBEDDING_DIMENSION = 1536
+
+# 재시도 백오프: base * 2^attempt 상한 안에서 full jitter
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+
+class EmbeddingError(RuntimeError):
+    """임베딩 공급자 호출이 재시도 후에도 실패함."""
+
+
+def _retry_after(error: Exception) -> float | None:
+    """429 응답의 Retry-After 헤더 (초)."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
 
 
 class EmbeddingModel:
@@ -32,6 +75,13 @@ class EmbeddingModel:
         # 환경 변수에서 배치 크기와 워커 수 설정
         self.batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "50"))
         self.max_workers = int(os.getenv("MAX_WORKERS", "4"))
+        # 로컬 모델: 길이순 배치의 패딩 포함 토큰 예산 (0 이면 batch_size 고정 배치)
+        self.token_budget = get_token_budget()
+
+        # OpenAI: 동시에 보낼 배치 수와 배치당 최대 재시도 횟수 (전송 속도는 RPM/TPM 리미터가 조절)
+        self.openai_concurrency = max(1, int(os.getenv("OPENAI_EMBEDDING_CONCURRENCY", "4")))
+        self.openai_max_retries = max(0, int(os.getenv("OPENAI_EMBEDDING_MAX_RETRIES", "5")))
+        self.rate_limiter = get_openai_rate_limiter()
 
         # ThreadPoolExecutor 초기화
         self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
@@ -40,15 +90,66 @@ class EmbeddingModel:
         embedding_provider = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
 
         self.model = None
+        self.sidecar = None
+        # 로컬 추론 백엔드: torch | onnx | onnx-int8 (EMBEDDING_LOCAL_BACKEND, EMBEDDING_ONNX_QUANTIZE)
+        self.local_backend = get_local_backend()
         if embedding_provider == "local" or not self.openai_api_key or AsyncOpenAI is None:
-            self.model = SentenceTransformer(model_name)
             self.use_openai = False
-            logger.info(f"[MODEL] 로컬 임베딩 모델 사용: {model_name}")
+            sidecar_socket = os.getenv("EMBEDDING_SIDECAR_SOCKET")
+            if sidecar_socket:
+                # 워커마다 모델을 올리지 않고 공용 사이드카에 위임.
+                # 백엔드를 함께 보내 사이드카가 다른 백엔드면 거절하게 한다 (cache_namespace 가 실제 벡터와 맞도록)
+                self.sidecar = EmbeddingSidecarClient(sidecar_socket, model_name, backend=self.local_backend)
+                logger.info(f"[MODEL] 임베딩 사이드카 사용: {sidecar_socket} ({model_name}, {self.local_backend})")
+            else:
+                self.model = self._load_local_model()
+                logger.info(f"[MODEL] 로컬 임베딩 모델 사용: {model_name} ({self.local_backend})")
         else:
-            self.client = AsyncOpenAI(api_key=self.openai_api_key)
+            # 재시도는 _create_openai_embeddings 가 레이트 리미터와 함께 관리 (SDK 자체 재시도 끔)
+            self.client = AsyncOpenAI(api_key=self.openai_api_key, max_retries=0)
             self.use_openai = True
             logger.info("[AUTH] OpenAI 임베딩 모델 사용 (비동기)")
 
+        # 같은 질문 반복 시 모델/API 호출 없이 반환 (EMBEDDING_LRU_SIZE=0 이면 비활성화)
+        self.query_cache = get_query_embedding_cache()
+
+        # 동시에 들어온 단일 질의 임베딩을 배치 하나로 모은다 (EMBEDDING_MICRO_BATCH=0 이면 비활성화)
+        self.micro_batcher = None
+        if os.getenv("EMBEDDING_MICRO_BATCH", "1").lower() in ("1", "true", "yes"):
+            self.micro_batcher = EmbeddingMicroBatcher(self._get_query_embeddings)
+
+    def _load_local_model(self):
+        """로컬 인코더 로드. ONNX 모델을 쓸 수 없으면 PyTorch 로 진행한다 (같은 벡터 공간)."""
+        if self.local_backend != "torch":
+            try:
+                return load_onnx_encoder(self.model_name, self.local_backend)
+            except OnnxBackendError as e:
+                logger.warning(f"[WARN] ONNX 백엔드 사용 불가 → PyTorch 로 진행: {e}")
+                self.local_backend = "torch"
+        return SentenceTransformer(self.model_name)
+
+    @property
+    def cache_namespace(self) -> str:
+        """
+        임베딩 캐시 네임스페이스 (공급자 + 모델명 + 버전).
+        같은 이름으로 모델 가중치를 바꿨다면 EMBEDDING_MODEL_VERSION 을 올려 이전 캐시를 무효화한다.
+        ONNX 백엔드 벡터는 PyTorch 벡터와 미세하게 다르므로 (int8 은 더) 백엔드도 네임스페이스에 넣는다.
+        """
+        version = os.getenv("EMBEDDING_MODEL_VERSION", "1")
+        if self.use_openai:
+            return f"openai:{OPENAI_EMBEDDING_MODEL}@{version}"
+        if self.local_backend != "torch":
+            return f"local:{self.model_name}+{self.local_backend}@{version}"
+        return f"local:{self.model_name}@{version}"
+
+    @property
+    def embedding_dimension(self) -> int | None:
+        if self.use_openai:
+            return OPENAI_EMBEDDING_DIMENSION
+        if self.sidecar is not None:
+            return self.sidecar.dimension
+        return self.model.get_sentence_embedding_dimension() if self.model is not None else None
+
     async def get_embedding(self, text: str) -> List[float]:
         """
         단일 텍스트를 임베딩합니다.
@@ -59,15 +160,26 @@ class EmbeddingModel:
         Returns:
             임베딩 벡터
         """
-        embeddings = await self.get_embeddings([text])
+        # 캐시 적중이면 마이크로 배치 대기 없이 바로 반환
+        cached = self.query_cache.get(self.cache_namespace, text)
+        if cached is not None:
+            return cached
+        if self.micro_batcher is not None:
+            return await self.micro_batcher.embed(text)
+        embeddings = await self.get_embeddings([text], cache_queries=True)
         return embeddings[0] if embeddings else []
 
-    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+    async def _get_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self.get_embeddings(texts, cache_queries=True)
+
+    async def get_embeddings(self, texts: List[str], cache_queries: bool = False) -> List[List[float]]:
         """
         여러 텍스트를 배치로 나누어 임베딩합니다.
 
         Args:
             texts: 임베딩할 텍스트 리스트
+            cache_queries: 새로 임베딩한 벡터를 질의 LRU 에 넣을지 (검색 질의만 True).
+                인덱싱처럼 대량 호출이 LRU 를 채우면 자주 쓰이는 질의가 밀려나므로 기본은 조회만 한다.
 
         Returns:
             임베딩 벡터 리스트
@@ -75,63 +187,117 @@ class EmbeddingModel:
         if not texts:
             return []
 
+        namespace = self.cache_namespace
+        embeddings = self.query_cache.get_many(namespace, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, embeddings) if vector is None))
+        if not missing:
+            return embeddings
+
         if self.use_openai:
-            return await self._get_openai_embeddings_batch(texts)
+            fresh = await self._get_openai_embeddings_batch(missing)
         else:
-            return await self._get_local_embeddings_batch(texts)
+            fresh = await self._get_local_embeddings_batch(missing)
 
-    async def _get_openai_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """OpenAI API 배치 처리"""
-        all_embeddings = []
-
-        # 텍스트를 배치로 나누어 처리
-        for i in range(0, len(texts), self.batch_size):
-            batch_texts = texts[i:i + self.batch_size]
+        by_text = dict(zip(missing, fresh))
+        if cache_queries:
+            # 차원이 모델과 다른 벡터는 이 네임스페이스에 캐시하지 않는다 (벡터 공간이 섞이지 않도록)
+            dimension = self.embedding_dimension
+            for text, vector in by_text.items():
+                if dimension is None or len(vector) == dimension:
+                    self.query_cache.put(namespace, text, vector)
+        return [vector if vector is not None else by_text[text] for text, vector in zip(texts, embeddings)]
 
+    async def _get_openai_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        OpenAI API 배치 처리.
+        배치를 최대 openai_concurrency 개까지 동시에 보내고, 전송 속도는 RPM/TPM 토큰 버킷이 조절한다.
+        재시도 후에도 실패하면 EmbeddingError (다른 차원의 로컬 벡터로 대체하지 않는다).
+        """
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.openai_concurrency)
+        done = 0
+
+        async def run(batch_no: int, batch_texts: List[str]) -> List[List[float]]:
+            nonlocal done
+            async with semaphore:
+                await self.rate_limiter.acquire(estimate_tokens(batch_texts))
+                embeddings = await self._create_openai_embeddings(batch_texts, batch_no)
+            done += len(batch_texts)
+            logger.debug(f"OpenAI 임베딩 진행률: {done}/{len(texts)}")
+            return embeddings
+
+        tasks = [asyncio.ensure_future(run(no, batch)) for no, batch in enumerate(batches, 1)]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # 한 배치라도 실패하면 나머지 요청도 중단 (부분 결과로 인덱싱하지 않음)
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+
+    async def _create_openai_embeddings(self, batch_texts: List[str], batch_no: int) -> List[List[float]]:
+        """배치 1개 요청. 429/5xx/타임아웃/연결 오류는 지수 백오프(+지터)로 재시도한다."""
+        for attempt in range(self.openai_max_retries + 1):
             try:
                 response = await self.client.embeddings.create(
-                    model="text-embedding-ada-002",
+                    model=OPENAI_EMBEDDING_MODEL,
                     input=batch_texts
                 )
-                batch_embeddings = [data.embedding for data in response.data]
-                all_embeddings.extend(batch_embeddings)
-
-                # API 호출 간격 조절 (rate limit 방지)
-                if i + self.batch_size < len(texts):
-                    await asyncio.sleep(0.1)
-
-                logger.debug(f"OpenAI 임베딩 진행률: {min(i + self.batch_size, len(texts))}/{len(texts)}")
-
+                return [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
+            except _RETRYABLE_OPENAI_ERRORS as e:
+                if attempt == self.openai_max_retries:
+                    raise EmbeddingError(
+                        f"OpenAI 임베딩 실패 (배치 {batch_no}, {attempt + 1}회 시도): {e}"
+                    ) from e
+                delay = _backoff_delay(attempt, _retry_after(e))
+                logger.warning(
+                    f"[WARN] OpenAI 임베딩 재시도 (배치 {batch_no}, {attempt + 1}회 실패, "
+                    f"{delay:.2f}s 후): {e}"
+                )
+                await asyncio.sleep(delay)
             except Exception as e:
-                logger.error(f"OpenAI 배치 임베딩 실패 (배치 {i // self.batch_size + 1}): {e}")
-                # 폴백으로 로컬 모델 사용
-                fallback_embeddings = await self._get_local_embeddings_batch(batch_texts)
-                all_embeddings.extend(fallback_embeddings)
-
-        return all_embeddings
+                # 인증 오류, 잘못된 요청 등은 재시도해도 같은 결과
+                raise EmbeddingError(f"OpenAI 임베딩 실패 (배치 {batch_no}): {e}") from e
 
     async def _get_local_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """로컬 모델 배치 처리 (ThreadPoolExecutor 사용)"""
-        if self.model is None:
+        """
+        로컬 모델 배치 처리 (ThreadPoolExecutor 사용, 사이드카 모드면 사이드카에 전송).
+        길이가 비슷한 텍스트끼리 토큰 예산 안에서 묶어 인코딩하고 결과는 입력 순서로 되돌린다.
+        """
+        if self.sidecar is None and self.model is None:
             logger.info(f"[MODEL] 로컬 모델 지연 로드: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
+            self.model = self._load_local_model()
         loop = asyncio.get_event_loop()
 
         async def process_batch(batch_texts):
+            if self.sidecar is not None:
+                return (await self.sidecar.embed(batch_texts)).tolist()
+            # 배치를 이미 나눴으므로 sentence-transformers 가 다시 쪼개지 않게 batch_size 를 맞춘다
             return await loop.run_in_executor(
                 self.executor,
-                lambda: self.model.encode(batch_texts, show_progress_bar=False).tolist()
+                lambda: self.model.encode(
+                    batch_texts, batch_size=len(batch_texts), show_progress_bar=False
+                ).tolist()
             )
 
-        all_embeddings = []
+        if self.token_budget:
+            batches = plan_length_batches(
+                texts, self.token_budget, max_length=getattr(self.model, "max_seq_length", None)
+            )
+        else:
+            batches = fixed_batches(len(texts), self.batch_size)
 
-        # 텍스트를 배치로 나누어 처리
-        for i in range(0, len(texts), self.batch_size):
-            batch_texts = texts[i:i + self.batch_size]
-            batch_embeddings = await process_batch(batch_texts)
-            all_embeddings.extend(batch_embeddings)
+        all_embeddings: List[List[float] | None] = [None] * len(texts)
+        done = 0
+        for batch in batches:
+            batch_embeddings = await process_batch([texts[i] for i in batch])
+            for i, embedding in zip(batch, batch_embeddings):
+                all_embeddings[i] = embedding
 
-            logger.debug(f"로컬 임베딩 진행률: {min(i + self.batch_size, len(texts))}/{len(texts)}")
+            done += len(batch)
+            logger.debug(f"로컬 임베딩 진행률: {done}/{len(texts)} (배치 {len(batch)}개)")
 
         return all_embeddings
 
@@ -167,7 +333,13 @@ class EmbeddingModel:
                         "number": str(question['number']),
                         "sentence": question['sentence'],
                         "answer": question['answer'],
-                        "collection": collection_type
+                        "collection": collection_type,
+                        # 범위 검색 키 (SearchScope)
+                        **scope_metadata(
+                            lesson_id=question.get('lesson_id'),
+                            concept_key=question.get('concept_key'),
+                            document_type="question",
+                        ),
                     }
                 })
 
@@ -180,7 +352,8 @@ class EmbeddingModel:
                         "type": "option_card",
                         "card_index": str(i),
                         "content": card,
-                        "collection": collection_type
+                        "collection": collection_type,
+                        **scope_metadata(document_type="option_card"),
                     }
                 })
 
@@ -200,17 +373,23 @@ class EmbeddingModel:
                         "word": card['word'],
                         "meaning": card['meaning'],
                         "examples": ", ".join(card.get('examples', [])),
-                        "collection": collection_type
+                        "collection": collection_type,
+                        **scope_metadata(
+                            lesson_id=card.get('lesson_id'),
+                            concept_key=card.get('concept_key'),
+                            document_type="card",
+                        ),
                     }
                 })
 
         elif collection_type == "pdf_documents":  # 신규 추가
-            # PDF 문서 데이터는 이미 전처리된 상태로 들어옴
+            # PDF 문서 데이터는 이미 전처리된 상태로 들어옴. 차시/개념 키는 없다
+            # (개념 범위 검색에서는 SCOPE_EXEMPT_FIELDS 로 면제) → 문서 유형만 범위 키로 맞춘다
             for doc in data:
                 documents.append({
                     "id": doc["id"],
                     "text": doc["text"],
-                    "metadata": doc["metadata"]
+                    "metadata": {**doc["metadata"], **scope_metadata(document_type="official_grammar_rule")}
                 })
 
         return documents
@@ -0,0 +1,72 @@
+"""
+길이 버킷 배칭 (로컬 sentence-transformer 인코딩)
+
+입력 순서대로 EMBEDDING_BATCH_SIZE 개씩 자르면 짧은 카드 텍스트가 800자 PDF 청크와 같은 배치에 들어가
+가장 긴 시퀀스 길이까지 패딩된다. 텍스트를 길이순으로 정렬해 비슷한 길이끼리 묶고,
+배치 크기는 고정 개수 대신 패딩 포함 토큰 예산(가장 긴 길이 × 개수)으로 정한다.
+결과는 호출자가 원래 순서로 되돌린다 (plan_length_batches 가 원래 인덱스를 돌려줌).
+
+- 길이 추정: 문자 수 + 2 ([CLS]/[SEP]), 모델 max_seq_length 로 자름 (잘린 뒤 길이로 패딩되므로)
+  토크나이저를 한 번 더 돌리지 않는 근사치이며 정렬과 예산 계산에만 쓴다
+- 긴 배치부터 처리 (메모리 부족이면 첫 배치에서 바로 드러나도록, sentence-transformers 와 같은 순서)
+
+설정: EMBEDDING_TOKEN_BUDGET (기본 8192, 0 이면 입력 순서 고정 크기 배치 = 이전 동작)
+"""
+
+import os
+from typing import Callable, List, Sequence
+
+DEFAULT_TOKEN_BUDGET = 8192
+# 아주 짧은 텍스트만 모였을 때 배치가 끝없이 커지지 않도록
+MAX_BUCKET_ITEMS = 256
+_SPECIAL_TOKENS = 2
+
+
+def get_token_budget() -> int:
+    return max(0, int(os.getenv("EMBEDDING_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET))))
+
+
+def estimate_length(text: str, max_length: int | None = None) -> int:
+    length = len(text) + _SPECIAL_TOKENS
+    return min(length, max_length) if max_length else length
+
+
+def fixed_batches(count: int, batch_size: int) -> List[List[int]]:
+    """입력 순서 그대로 batch_size 개씩 (버킷 비활성화 시 / 벤치마크 기준선)."""
+    batch_size = max(1, batch_size)
+    return [list(range(start, min(start + batch_size, count))) for start in range(0, count, batch_size)]
+
+
+def plan_length_batches(
+    texts: Sequence[str],
+    token_budget: int,
+    max_items: int = MAX_BUCKET_ITEMS,
+    max_length: int | None = None,
+    length_fn: Callable[[str, int | None], int] = estimate_length,
+) -> List[List[int]]:
+    """
+    texts 의 인덱스를 길이순 배치로 나눈다.
+    배치마다 (가장 긴 길이 × 개수) ≤ token_budget, 개수 ≤ max_items.
+    예산보다 긴 텍스트 하나는 단독 배치가 된다.
+    """
+    lengths = [length_fn(text, max_length) for text in texts]
+    order = sorted(range(len(texts)), key=lambda i: -lengths[i])
+    max_items = max(1, max_items)
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        # 내림차순이므로 배치의 가장 긴 길이는 첫 원소
+        longest = lengths[current[0]] if current else lengths[i]
+        if current and (longest * (len(current) + 1) > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padded_tokens(batches: Sequence[Sequence[int]], lengths: Sequence[int]) -> int:
+    """배치 계획대로 인코딩할 때 패딩을 포함해 모델이 처리하는 토큰 수."""
+    return sum(max(lengths[i] for i in batch) * len(batch) for batch in batches if batch)
@@ -0,0 +1,127 @@
+"""
+임베딩 요청 마이크로 배칭
+
+채팅 턴마다 질의 하나를 get_embedding 으로 임베딩하므로, 여러 학생이 동시에 질문하면
+batch=1 forward 가 스레드풀에 여러 개 쌓인다. 동시에 들어온 요청을 모아 한 번의 배치로 임베딩한다.
+
+- 배치가 max_batch_size 에 도달하면 즉시, 아니면 첫 요청 후 max_wait_ms 가 지나면 flush
+  (단일 요청 지연 증가는 최대 max_wait_ms)
+- 같은 배치 안의 동일 텍스트는 한 번만 임베딩
+- 대기열은 이벤트 루프별로 따로 둔다 (future 는 생성한 루프에서만 완료할 수 있음)
+- 배치 임베딩이 실패하면 해당 배치의 모든 호출자에게 같은 예외를 전달 (배치 태스크가 취소되면 호출자도 취소)
+"""
+
+import asyncio
+import os
+import weakref
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from app.common.logging.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+EncodeBatch = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class _LoopQueue:
+    __slots__ = ("pending", "timer", "tasks")
+
+    def __init__(self):
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self.timer: asyncio.TimerHandle | None = None
+        # 실행 중인 flush 태스크 (GC 로 사라지지 않도록 참조 유지)
+        self.tasks: Set[asyncio.Task] = set()
+
+
+class EmbeddingMicroBatcher:
+    def __init__(
+        self,
+        encode_batch: EncodeBatch,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+    ):
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv("EMBEDDING_MICRO_BATCH_SIZE", "32"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("EMBEDDING_MICRO_BATCH_WAIT_MS", "5"))
+
+        self._encode_batch = encode_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopQueue]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.requests = 0
+        self.batches = 0
+        self.encoded_texts = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """text 를 다음 배치에 넣고 결과를 기다린다."""
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = _LoopQueue()
+
+        future = loop.create_future()
+        queue.pending.append((text, future))
+        self.requests += 1
+
+        if len(queue.pending) >= self.max_batch_size:
+            self._flush(loop, queue)
+        elif queue.timer is None:
+            queue.timer = loop.call_later(self.max_wait, self._flush, loop, queue)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, queue: _LoopQueue) -> None:
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+
+        while queue.pending:
+            batch = queue.pending[: self.max_batch_size]
+            del queue.pending[: self.max_batch_size]
+            task = loop.create_task(self._run(batch))
+            queue.tasks.add(task)
+            task.add_done_callback(queue.tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # 이미 취소된 호출자는 빼고, 같은 텍스트는 한 번만 임베딩
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        unique: Dict[str, int] = {}
+        for text, _ in batch:
+            unique.setdefault(text, len(unique))
+
+        self.batches += 1
+        self.encoded_texts += len(unique)
+        try:
+            vectors = await self._encode_batch(list(unique))
+            if len(vectors) != len(unique):
+                raise RuntimeError(f"임베딩 개수 불일치: 요청 {len(unique)}개, 응답 {len(vectors)}개")
+        except Exception as e:
+            logger.error(f"[ERROR] 마이크로 배치 임베딩 실패 ({len(unique)}개): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # flush 태스크가 취소되면 (루프 종료 등) 호출자가 영원히 기다리지 않도록 같이 취소
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[unique[text]])
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "requests": self.requests,
+            "batches": self.batches,
+            "encoded_texts": self.encoded_texts,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
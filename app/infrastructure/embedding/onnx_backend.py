@@ -0,0 +1,221 @@
+"""
+로컬 임베딩 ONNX Runtime 백엔드 (CPU 전용 노드)
+
+EMBEDDING_PROVIDER=local 에서는 PyTorch forward 가 질의 지연과 인덱싱 시간을 대부분 차지한다.
+SentenceTransformer 전체(transformer + pooling + normalize)를 ONNX 그래프 하나로 내보내고
+(선택적으로 int8 동적 양자화) ONNX Runtime 으로 실행한다.
+OnnxSentenceEncoder 는 SentenceTransformer 와 같은 encode / get_sentence_embedding_dimension / max_seq_length
+를 제공하므로 EmbeddingModel, 길이 버킷 배칭, 사이드카가 그대로 쓴다.
+
+내보내기 + 코사인 일치 검사 + 처리량 비교 (onnx 패키지 필요):
+    python scripts/export_onnx_embedder.py --model jhgan/ko-sroberta-multitask
+
+설정:
+- EMBEDDING_LOCAL_BACKEND: torch (기본) | onnx
+- EMBEDDING_ONNX_QUANTIZE: 1 이면 int8 모델(model_int8.onnx) 사용 (기본 0, 일치 검사 후 켠다)
+- EMBEDDING_ONNX_DIR: 내보낸 모델 루트 (기본 ./onnx_models, 모델별 하위 디렉터리)
+- EMBEDDING_ONNX_THREADS: intra-op 스레드 수 (기본 0 = ONNX Runtime 기본값(물리 코어 수)).
+  uvicorn 워커를 여러 개 띄우면 코어 수 / 워커 수로 낮춘다 (사이드카는 기본값 그대로)
+"""
+
+import json
+import os
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.common.logging.logging_config import get_logger
+
+try:
+    import onnxruntime as ort
+except ModuleNotFoundError:
+    ort = None
+
+logger = get_logger(__name__)
+
+DEFAULT_ONNX_ROOT = "./onnx_models"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+CONFIG_FILE = "embedder_config.json"
+OUTPUT_NAME = "sentence_embedding"
+
+
+class OnnxBackendError(RuntimeError):
+    """ONNX 백엔드를 쓸 수 없음 (패키지 없음, 내보낸 모델 없음, 내보내기 실패)."""
+
+
+def get_local_backend() -> str:
+    """캐시 네임스페이스에 들어가는 로컬 백엔드 이름: torch | onnx | onnx-int8."""
+    backend = os.getenv("EMBEDDING_LOCAL_BACKEND", "torch").lower()
+    if backend != "onnx":
+        return "torch"
+    quantized = os.getenv("EMBEDDING_ONNX_QUANTIZE", "0").lower() in ("1", "true", "yes")
+    return "onnx-int8" if quantized else "onnx"
+
+
+def default_onnx_dir(model_name: str) -> str:
+    root = os.getenv("EMBEDDING_ONNX_DIR", DEFAULT_ONNX_ROOT)
+    return os.path.join(root, model_name.replace("/", "__"))
+
+
+# ----------------------------------------------------------------------
+# 내보내기
+# ----------------------------------------------------------------------
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True, opset: int = 17, model=None) -> Dict[str, str]:
+    """
+    SentenceTransformer 를 ONNX 로 내보낸다 (입력: 토크나이저 출력, 출력: sentence_embedding).
+    quantize 면 가중치 int8 동적 양자화 모델도 만든다. 만든 파일 경로를 반환.
+    model: 이미 올린 SentenceTransformer (없으면 model_name 으로 로드)
+    """
+    try:
+        import onnx  # noqa: F401  (torch.onnx.export 와 quantize_dynamic 이 사용)
+        import torch
+    except ModuleNotFoundError as e:
+        raise OnnxBackendError(f"ONNX 내보내기에 필요한 패키지가 없습니다 (pip install onnx): {e}") from e
+
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name, device="cpu")
+    model = model.to("cpu").eval()
+
+    # 추론 때와 같은 방식으로 토큰화한 입력 (OnnxSentenceEncoder.encode 참고)
+    sample = dict(
+        model.tokenizer(
+            ["내보내기용 예시 문장입니다.", "되 돼"],
+            padding=True,
+            truncation=True,
+            max_length=model.max_seq_length,
+            return_tensors="pt",
+        )
+    )
+    input_names = list(sample)
+
+    class _SentenceEmbedding(torch.nn.Module):
+        def __init__(self, sentence_transformer):
+            super().__init__()
+            self.sentence_transformer = sentence_transformer
+
+        def forward(self, *inputs):
+            return self.sentence_transformer(dict(zip(input_names, inputs)))[OUTPUT_NAME]
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {"model": os.path.join(output_dir, MODEL_FILE)}
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes[OUTPUT_NAME] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _SentenceEmbedding(model),
+            tuple(sample[name] for name in input_names),
+            paths["model"],
+            input_names=input_names,
+            output_names=[OUTPUT_NAME],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    model.tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "model_name": model_name,
+                "input_names": input_names,
+                "max_seq_length": model.max_seq_length,
+                "dimension": model.get_sentence_embedding_dimension(),
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        paths["quantized"] = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+        quantize_dynamic(paths["model"], paths["quantized"], weight_type=QuantType.QInt8)
+
+    logger.info(f"[OK] ONNX 내보내기 완료: {output_dir} ({', '.join(paths)})")
+    return paths
+
+
+# ----------------------------------------------------------------------
+# 추론
+# ----------------------------------------------------------------------
+
+
+class OnnxSentenceEncoder:
+    def __init__(self, model_dir: str, quantized: bool = False, intra_op_threads: int | None = None):
+        if ort is None:
+            raise OnnxBackendError("onnxruntime 패키지가 없습니다 (pip install onnxruntime)")
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        config_path = os.path.join(model_dir, CONFIG_FILE)
+        if not os.path.exists(model_path) or not os.path.exists(config_path):
+            raise OnnxBackendError(
+                f"내보낸 ONNX 모델이 없습니다: {model_path} (scripts/export_onnx_embedder.py 로 먼저 내보내기)"
+            )
+        if intra_op_threads is None:
+            intra_op_threads = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+
+        with open(config_path, encoding="utf-8") as f:
+            config = json.load(f)
+        self.model_name = config["model_name"]
+        self.input_names: List[str] = config["input_names"]
+        self.max_seq_length: int = config["max_seq_length"]
+        self.dimension: int = config["dimension"]
+        self.quantized = quantized
+
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(0, intra_op_threads)
+        # 배치 하나를 모든 스레드로 처리 (요청 간 병렬화는 마이크로 배처/사이드카가 담당)
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        """SentenceTransformer.encode 와 같은 (n, dim) float32 배열. show_progress_bar 는 호환용."""
+        texts = list(texts)
+        outputs = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            features = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feed = {name: features[name].astype(np.int64) for name in self.input_names}
+            outputs.append(self.session.run([OUTPUT_NAME], feed)[0].astype(np.float32))
+        if not outputs:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.concatenate(outputs)
+
+
+def load_onnx_encoder(model_name: str, backend: str | None = None) -> OnnxSentenceEncoder:
+    backend = backend or get_local_backend()
+    return OnnxSentenceEncoder(default_onnx_dir(model_name), quantized=backend == "onnx-int8")
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """행별 코사인 유사도 요약 (PyTorch 벡터 vs ONNX 벡터 일치 검사)."""
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    if reference.shape != candidate.shape:
+        raise ValueError(f"벡터 모양이 다릅니다: {reference.shape} vs {candidate.shape}")
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosines = np.sum(reference * candidate, axis=1) / np.maximum(norms, 1e-12)
+    return {
+        "min": float(cosines.min()),
+        "mean": float(cosines.mean()),
+        "p01": float(np.percentile(cosines, 1)),
+    }
@@ -0,0 +1,145 @@
+"""
+질의 임베딩 인메모리 LRU
+
+레거시 /chat/ 과 /agent/chat RAG 턴은 같은 짧은 질문을 매번 다시 임베딩한다 (OpenAI 면 네트워크 왕복까지).
+EmbeddingModel 내부에서 (모델 네임스페이스, 정규화된 텍스트) → 벡터를 기억해 두므로
+HybridSearchService 등 호출자는 바꿀 필요가 없다.
+
+- 정규화: NFC + 공백 하나로 + 앞뒤 공백 제거 (대소문자/문장부호는 임베딩에 영향을 주므로 유지)
+- 벡터는 quantized_store 형식의 bytes 로 보관하고 꺼낼 때 리스트로 복원한다
+  EMBEDDING_LRU_DTYPE: float32 (기본, float 리스트 대비 메모리 약 1/8) | float16 (1/2 더) | int8 (약 1/4 더)
+- 검색 질의(get_embedding, 마이크로 배치, search_many)만 넣는다. 인덱싱 같은 대량 get_embeddings 는 조회만 한다
+- 크기(EMBEDDING_LRU_SIZE, 0 이면 비활성화) 와 선택적 TTL(EMBEDDING_LRU_TTL_SECONDS, 0 이면 없음)
+- 워커 프로세스마다 따로 가진다
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from app.infrastructure.search.quantized_store import QUANTIZATION_MODES, decode_vector, encode_vector
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        dtype: str | None = None,
+    ):
+        if max_entries is None:
+            max_entries = int(os.getenv("EMBEDDING_LRU_SIZE", "4096"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("EMBEDDING_LRU_TTL_SECONDS", "0"))
+        if dtype is None:
+            dtype = os.getenv("EMBEDDING_LRU_DTYPE", "float32").lower()
+        if dtype not in QUANTIZATION_MODES:
+            raise ValueError(f"EMBEDDING_LRU_DTYPE 는 {QUANTIZATION_MODES} 중 하나여야 합니다: {dtype}")
+
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self.dtype = dtype
+        self.enabled = self.max_entries > 0
+        self._clock = clock
+
+        # (네임스페이스, 정규화 텍스트) → (만료 시각 또는 None, 양자화 벡터). 뒤쪽이 최근 사용
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float | None, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _entry_bytes(key: Tuple[str, str], payload: bytes) -> int:
+        return len(payload) + sys.getsizeof(key[1])
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, payload = self._entries.pop(key)
+        self._nbytes -= self._entry_bytes(key, payload)
+
+    def get(self, namespace: str, text: str) -> List[float] | None:
+        if not self.enabled:
+            return None
+        key = (namespace, normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = entry[1]
+        return decode_vector(payload, self.dtype).tolist()
+
+    def get_many(self, namespace: str, texts: Sequence[str]) -> List[List[float] | None]:
+        return [self.get(namespace, text) for text in texts]
+
+    def put(self, namespace: str, text: str, vector: Sequence[float]) -> None:
+        if not self.enabled:
+            return
+        key = (namespace, normalize_text(text))
+        payload = encode_vector(vector, self.dtype)
+        expires = self._clock() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires, payload)
+            self._nbytes += self._entry_bytes(key, payload)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def put_many(self, namespace: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        for text, vector in zip(texts, vectors):
+            self.put(namespace, text, vector)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "dtype": self.dtype,
+                "memory_bytes": self._nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# 전역 인스턴스 (키에 모델 네임스페이스가 들어가므로 모델 인스턴스끼리 공유해도 안전)
+_query_embedding_cache: QueryEmbeddingCache | None = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        _query_embedding_cache = QueryEmbeddingCache()
+    return _query_embedding_cache
@@ -0,0 +1,139 @@
+"""
+OpenAI 임베딩 요청용 토큰 버킷 레이트 리미터
+
+분당 요청 수(RPM)와 분당 토큰 수(TPM) 두 버킷을 함께 본다. 배치를 보내기 전에 acquire(토큰 수)를
+호출하면 두 버킷 모두 여유가 생길 때까지 기다린 뒤 차감한다.
+- 버킷 용량 = 분당 한도 (처음 1분은 한도만큼 버스트 허용), 초당 한도/60 씩 연속 충전
+- 한 번에 용량보다 큰 요청은 용량으로 잘라 무한 대기를 막는다
+- 이벤트 루프에 묶인 객체(asyncio.Lock 등)를 쓰지 않으므로 워커 스레드/루프가 달라도 공유할 수 있다
+
+설정: OPENAI_EMBEDDING_RPM (기본 3000), OPENAI_EMBEDDING_TPM (기본 1000000)
+
+토큰 수는 tiktoken cl100k_base 로 센다. BPE 파일은 처음 한 번 내려받아 TIKTOKEN_CACHE_DIR
+(기본 ./tiktoken_cache) 에 두므로 startup 에서 warm_up_token_estimator() 로 루프 밖에서 미리 올린다.
+올리기 전이거나 실패하면(오프라인 등) 글자 수 근사치를 쓴다 — 요청 경로에서는 파일을 받지 않는다.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Sequence
+
+from app.common.logging.logging_config import get_logger
+
+try:
+    import tiktoken
+except ModuleNotFoundError:
+    tiktoken = None
+
+logger = get_logger(__name__)
+
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+DEFAULT_TIKTOKEN_CACHE_DIR = "./tiktoken_cache"
+
+
+class _Bucket:
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv("OPENAI_EMBEDDING_RPM", "3000"))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv("OPENAI_EMBEDDING_TPM", "1000000"))
+
+        self._clock = clock
+        self._sleep = sleep
+        now = clock()
+        self._requests = _Bucket(requests_per_minute, now)
+        self._tokens = _Bucket(tokens_per_minute, now)
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """요청 1건 + tokens 토큰을 쓸 수 있을 때까지 기다린 뒤 차감한다."""
+        tokens = min(float(tokens), self._tokens.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._requests.refill(now)
+                self._tokens.refill(now)
+                wait = max(self._requests.wait_time(1.0), self._tokens.wait_time(tokens))
+                if wait <= 0:
+                    self._requests.level -= 1.0
+                    self._tokens.level -= tokens
+                    return
+            self.waited_seconds += wait
+            await self._sleep(wait)
+
+
+# load_token_encoding() 이 채운다. None 이면 근사치 사용
+_token_encoding = None
+
+
+def load_token_encoding():
+    """cl100k_base 를 올린다 (캐시 파일이 없으면 내려받으므로 이벤트 루프 밖에서 호출). 실패하면 None."""
+    global _token_encoding
+    if _token_encoding is not None or tiktoken is None:
+        return _token_encoding
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", DEFAULT_TIKTOKEN_CACHE_DIR)
+    try:
+        _token_encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # 오프라인 등으로 BPE 파일을 받을 수 없으면 근사치 사용
+        logger.warning(f"[WARN] tiktoken 인코딩 로드 실패 → 토큰 수 근사치 사용: {e}")
+    return _token_encoding
+
+
+async def warm_up_token_estimator() -> bool:
+    """startup 용: 기본 스레드 풀에서 load_token_encoding() 을 실행한다. 정확한 토큰 수를 쓰게 되면 True."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, load_token_encoding) is not None
+
+
+def estimate_tokens(texts: Sequence[str]) -> int:
+    """
+    배치의 토큰 수 추정 (레이트 리미터 차감용).
+    인코딩이 올라와 있으면 cl100k_base 로 세고, 아니면 한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰으로 근사한다.
+    """
+    encoding = _token_encoding
+    if encoding is not None:
+        return sum(len(encoding.encode(text)) for text in texts)
+    total = 0
+    for text in texts:
+        hangul = len(_HANGUL_RE.findall(text))
+        total += hangul + (len(text) - hangul + 3) // 4
+    return max(total, len(texts))
+
+
+# 전역 인스턴스 (워커 프로세스 하나가 한도를 공유)
+_openai_rate_limiter: TokenBucketLimiter | None = None
+
+
+def get_openai_rate_limiter() -> TokenBucketLimiter:
+    global _openai_rate_limiter
+    if _openai_rate_limiter is None:
+        _openai_rate_limiter = TokenBucketLimiter()
+    return _openai_rate_limiter
@@ -0,0 +1,276 @@
+"""
+임베딩 사이드카 (uvicorn 워커 공용 로컬 임베딩 서버)
+
+EMBEDDING_PROVIDER=local 이면 워커마다 SentenceTransformer 와 스레드풀을 따로 올려 메모리가 워커 수만큼 늘고
+코어를 서로 빼앗는다. 사이드카 프로세스가 모델을 한 번만 올리고, 모든 워커의 요청을 마이크로 배치로 묶어
+forward 를 한 번에 하나씩 실행한다 (torch 내부 스레드가 코어를 모두 사용).
+여러 워커의 텍스트가 섞인 마이크로 배치는 forward 전에 길이 버킷(length_batching)으로 다시 나눈다
+(워커가 길이별로 나눠 보낸 배치도 텍스트 단위로 합쳐지므로 패딩을 줄이는 일은 사이드카가 맡는다).
+
+실행:
+    python -m app.infrastructure.embedding.sidecar --socket /tmp/embedding-sidecar.sock
+워커 설정:
+    EMBEDDING_PROVIDER=local EMBEDDING_SIDECAR_SOCKET=/tmp/embedding-sidecar.sock
+
+프로토콜 (Unix 도메인 소켓, 연결당 요청/응답 반복):
+- 요청: uint32(BE) 길이 + UTF-8 JSON {"model": 모델명, "backend": torch|onnx|onnx-int8, "texts": [...]}
+- 응답: uint32 n + uint32 dim + n*dim 개 float32(LE) 원시 바이트
+- 오류: uint32 0xFFFFFFFF + uint32 길이 + UTF-8 메시지
+모델명이나 백엔드가 사이드카와 다르면 오류를 돌려준다 (다른 벡터 공간이 섞이지 않도록).
+워커의 캐시 네임스페이스에는 워커 설정의 백엔드가 들어가므로, 사이드카가 실제로 다른 백엔드로 만든 벡터를
+그 이름으로 캐시하지 않게 한다. backend 가 없는 요청은 torch 로 본다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
+
+import numpy as np
+
+from app.common.logging.logging_config import get_logger
+from app.infrastructure.embedding.length_batching import get_token_budget, plan_length_batches
+from app.infrastructure.embedding.micro_batcher import EmbeddingMicroBatcher
+
+logger = get_logger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/embedding-sidecar.sock"
+_LENGTH = struct.Struct(">I")
+_HEADER = struct.Struct(">II")
+_ERROR = 0xFFFFFFFF
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class SidecarError(RuntimeError):
+    """사이드카 연결 실패 또는 사이드카가 돌려준 오류."""
+
+
+# ----------------------------------------------------------------------
+# 프로토콜
+# ----------------------------------------------------------------------
+
+
+def pack_request(model: str, texts: Sequence[str], backend: str = "torch") -> bytes:
+    payload = json.dumps(
+        {"model": model, "backend": backend, "texts": list(texts)}, ensure_ascii=False
+    ).encode("utf-8")
+    return _LENGTH.pack(len(payload)) + payload
+
+
+async def read_request(reader: asyncio.StreamReader) -> dict:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if length > MAX_REQUEST_BYTES:
+        raise ValueError(f"요청이 너무 큽니다: {length} bytes")
+    return json.loads((await reader.readexactly(length)).decode("utf-8"))
+
+
+def pack_vectors(vectors: np.ndarray) -> bytes:
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    n, dim = vectors.shape
+    return _HEADER.pack(n, dim) + vectors.tobytes()
+
+
+def pack_error(message: str) -> bytes:
+    data = message.encode("utf-8")
+    return _HEADER.pack(_ERROR, len(data)) + data
+
+
+async def read_response(reader: asyncio.StreamReader) -> np.ndarray:
+    n, second = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if n == _ERROR:
+        raise SidecarError((await reader.readexactly(second)).decode("utf-8"))
+    data = await reader.readexactly(n * second * 4)
+    return np.frombuffer(data, dtype="<f4").reshape(n, second)
+
+
+# ----------------------------------------------------------------------
+# 서버
+# ----------------------------------------------------------------------
+
+
+class EmbeddingSidecarServer:
+    def __init__(
+        self,
+        model,
+        model_name: str,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+        backend: str = "torch",
+        token_budget: int | None = None,
+    ):
+        """
+        model: encode(texts, batch_size=..., show_progress_bar=False) → (n, dim) 배열 을 제공하는
+               SentenceTransformer 호환 객체.
+        backend: model 을 실행하는 백엔드 (torch | onnx | onnx-int8)
+        token_budget: 길이 버킷의 패딩 포함 토큰 예산 (None 이면 EMBEDDING_TOKEN_BUDGET, 0 이면 버킷 없이 한 번에)
+        """
+        self.model = model
+        self.model_name = model_name
+        self.backend = backend
+        self.token_budget = get_token_budget() if token_budget is None else max(0, token_budget)
+        self.socket_path = socket_path
+        # forward 는 한 번에 하나 (배치 내부 병렬화는 torch 가 담당)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-sidecar")
+        self.batcher = EmbeddingMicroBatcher(self._encode_batch, max_batch_size, max_wait_ms)
+        self._server: asyncio.AbstractServer | None = None
+
+    async def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._encode_bucketed, texts)
+
+    def _encode_bucketed(self, texts: List[str]) -> np.ndarray:
+        """길이 버킷별로 forward 하고 결과를 입력 순서로 되돌린다."""
+        if self.token_budget:
+            batches = plan_length_batches(
+                texts, self.token_budget, max_length=getattr(self.model, "max_seq_length", None)
+            )
+        else:
+            batches = [list(range(len(texts)))]
+
+        vectors: np.ndarray | None = None
+        for batch in batches:
+            # 버킷을 이미 나눴으므로 sentence-transformers 가 다시 쪼개지 않게 batch_size 를 맞춘다
+            encoded = np.asarray(
+                self.model.encode([texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False),
+                dtype=np.float32,
+            )
+            if vectors is None:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            vectors[batch] = encoded
+        return vectors
+
+    async def _embed(self, request: dict) -> bytes:
+        model = request.get("model")
+        if model and model != self.model_name:
+            return pack_error(f"모델 불일치: 요청 {model}, 사이드카 {self.model_name}")
+        backend = request.get("backend") or "torch"
+        if backend != self.backend:
+            return pack_error(f"백엔드 불일치: 요청 {backend}, 사이드카 {self.backend}")
+        texts = request.get("texts") or []
+        if not texts:
+            return pack_vectors(np.zeros((0, 0), dtype=np.float32))
+        # 텍스트 단위로 배치에 넣어 다른 워커의 요청과 함께 forward
+        rows = await asyncio.gather(*(self.batcher.embed(text) for text in texts))
+        return pack_vectors(np.stack(rows))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    response = await self._embed(request)
+                except Exception as e:
+                    logger.error(f"[ERROR] 사이드카 임베딩 실패: {e}")
+                    response = pack_error(str(e))
+                writer.write(response)
+                await writer.drain()
+        except (ValueError, ConnectionError) as e:
+            logger.warning(f"[WARN] 사이드카 연결 종료: {e}")
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            # 이전 프로세스가 남긴 소켓 파일
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"[OK] 임베딩 사이드카 시작: {self.socket_path} ({self.model_name}, {self.backend})")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=False)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+
+# ----------------------------------------------------------------------
+# 클라이언트
+# ----------------------------------------------------------------------
+
+
+class EmbeddingSidecarClient:
+    """
+    요청마다 연결을 새로 연다 (Unix 소켓 연결 비용은 수십 µs).
+    이벤트 루프/스레드에 묶인 상태가 없어 어느 워커 루프에서 호출해도 된다.
+    """
+
+    def __init__(self, socket_path: str, model_name: str, timeout: float | None = None, backend: str = "torch"):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.backend = backend
+        self.timeout = timeout if timeout is not None else float(os.getenv("EMBEDDING_SIDECAR_TIMEOUT", "30"))
+        # 첫 응답에서 알게 되는 임베딩 차원
+        self.dimension: int | None = None
+
+    async def _request(self, texts: Sequence[str]) -> np.ndarray:
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write(pack_request(self.model_name, texts, self.backend))
+            await writer.drain()
+            return await read_response(reader)
+        finally:
+            writer.close()
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        try:
+            vectors = await asyncio.wait_for(self._request(texts), self.timeout)
+        except SidecarError:
+            raise
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            raise SidecarError(f"임베딩 사이드카 호출 실패 ({self.socket_path}): {e!r}") from e
+        if len(vectors) != len(texts):
+            raise SidecarError(f"임베딩 개수 불일치: 요청 {len(texts)}개, 응답 {len(vectors)}개")
+        self.dimension = vectors.shape[1]
+        return vectors
+
+
+def main():
+    from app.infrastructure.embedding.onnx_backend import get_local_backend, load_onnx_encoder
+
+    parser = argparse.ArgumentParser(description="워커 공용 로컬 임베딩 사이드카")
+    parser.add_argument("--socket", default=os.getenv("EMBEDDING_SIDECAR_SOCKET", DEFAULT_SOCKET_PATH))
+    parser.add_argument("--model", default="jhgan/ko-sroberta-multitask", help="워커의 EmbeddingModel 과 같은 모델")
+    parser.add_argument(
+        "--backend",
+        choices=["torch", "onnx", "onnx-int8"],
+        default=get_local_backend(),
+        help="워커와 같은 백엔드 (기본: EMBEDDING_LOCAL_BACKEND / EMBEDDING_ONNX_QUANTIZE)",
+    )
+    args = parser.parse_args()
+
+    logger.info(f"[MODEL] 사이드카 모델 로드: {args.model} ({args.backend})")
+    if args.backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(args.model)
+    else:
+        model = load_onnx_encoder(args.model, args.backend)
+    server = EmbeddingSidecarServer(model, args.model, args.socket, backend=args.backend)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from app.infrastructure.db.mongo.mongo_client import get_mongo_client
 from app.common.config.loader.config_loader import load_rag_config
 from app.common.logging.logging_config import get_logger
+from app.domains.progress.util.util import resolve_concept_key
+from app.infrastructure.search.search_scope import normalize_lesson_id
 
 logger = get_logger(__name__)
 
@@ -23,13 +25,19 @@ def get_card_check_data():
         # 각 차시별 데이터 처리
         for doc in docs:
             cards = doc.get("cards", [])
+            raw_lesson_id = doc.get("lesson_id") or doc.get("lessonId")
+            lesson_id = normalize_lesson_id(raw_lesson_id) if raw_lesson_id else None
             
             # 각 카드 데이터 처리
             for idx, card in enumerate(cards, 1):
+                word1, word2 = card.get('word1', ''), card.get('word2', '')
                 result.append({
-                    "word": f"{card.get('word1', '')}/{card.get('word2', '')}",
+                    "word": f"{word1}/{word2}",
                     "meaning": f"{card.get('meaning1', '')} | {card.get('meaning2', '')}",
-                    "examples": card.get('examples1', []) + card.get('examples2', [])
+                    "examples": card.get('examples1', []) + card.get('examples2', []),
+                    # 범위 검색용 (차시 / 개념)
+                    "lesson_id": lesson_id,
+                    "concept_key": _card_concept_key(word1, word2),
                 })
 
         logger.info(f"[OK] 카드 체크 데이터 로드 완료: {len(result)}개 카드")
@@ -41,6 +49,14 @@ def get_card_check_data():
         return []
 
 
+def _card_concept_key(word1: str, word2: str) -> str:
+    """카드 쌍의 개념 키. 매핑에 없는 쌍은 "word1/word2" 를 그대로 사용 (content_hierarchy concept_keys 형식)."""
+    concept_key = resolve_concept_key(word1, word2)
+    if concept_key == word1.strip():
+        return f"{word1}/{word2}"
+    return concept_key
+
+
 # 간단 테스트
 if __name__ == "__main__":
     from pprint import pprint
@@ -6,6 +6,9 @@
 
 검색 시 쿼리가 '가상 질문 벡터'와 매칭되면 원본 문서 내용을 LLM에 전달한다.
 → 구어체 질문 ↔ 정의 형태 문서의 비대칭 검색 문제 해결
+
+질문 행에는 원본 참조(original_id, collection)만 저장한다. 원본 본문은 검색 시
+de-dup 이후 공용 문서 테이블(BM25)에서 한 번에 조회한다 (HybridSearchService 참고).
 """
 
 import asyncio
@@ -14,6 +17,10 @@ import chromadb
 from dotenv import load_dotenv
 import os
 
+from app.infrastructure.db.vector.config.vector_db_config import VectorDBConfig
+from app.infrastructure.search.index_generation import bump_index_generation
+from app.infrastructure.search.search_scope import SCOPE_FIELDS
+from app.infrastructure.embedding.embedding_cache import EmbeddingCache, get_embedding_cache
 from app.infrastructure.embedding.embedding_model import EmbeddingModel
 from app.common.logging.logging_config import get_logger
 
@@ -36,6 +43,11 @@ def is_question_collection_ready(collection_name: str) -> bool:
     """해당 _questions 컬렉션의 생성이 완료되었는지 반환"""
     return collection_name in _ready_question_collections
 
+
+def mark_question_collection_ready(collection_name: str) -> None:
+    """_questions 컬렉션을 검색 대상으로 표시 (이미 채워진 컬렉션을 생성 단계 없이 쓸 때)"""
+    _ready_question_collections.add(collection_name)
+
 SYSTEM_PROMPT = """너는 초등학생 대상 한국어 맞춤법 교육 챗봇의 검색 시스템을 개선하는 전문가야.
 주어진 교육 자료에 대해 초등학생이 실제로 물어볼 법한 자연스러운 구어체 질문을 만들어줘.
 질문은 짧고 구체적으로, 줄바꿈으로 구분해서 딱 {n}개만 출력해."""
@@ -79,6 +91,7 @@ async def build_hypothetical_questions(
     chroma_client: chromadb.PersistentClient,
     embedding_model: EmbeddingModel,
     collection_names: List[str] | None = None,
+    embedding_cache: EmbeddingCache | None = None,
 ) -> None:
     """
     지정된 컬렉션의 모든 문서에 대해 가상 질문을 생성하고
@@ -94,6 +107,7 @@ async def build_hypothetical_questions(
         return
 
     openai_client = AsyncOpenAI(api_key=api_key)
+    embedding_cache = embedding_cache or get_embedding_cache()
     targets = collection_names or ["card_check", "korean_word_problems", "pdf_documents"]
 
     for coll_name in targets:
@@ -108,7 +122,7 @@ async def build_hypothetical_questions(
         # 가상 질문 컬렉션 (없으면 생성)
         q_col = chroma_client.get_or_create_collection(
             q_coll_name,
-            metadata={"hnsw:space": "cosine"},
+            metadata=VectorDBConfig.get_hnsw_metadata(q_coll_name),
         )
 
         # 이미 생성된 original_id 목록
@@ -146,14 +160,21 @@ async def build_hypothetical_questions(
                 continue
 
             # 질문 임베딩 후 저장
-            embeddings = await embedding_model.get_embeddings(questions)
+            embeddings = await embedding_cache.embed(embedding_model, questions)
             q_ids = [f"hq_{doc_id}_{i}" for i in range(len(questions))]
+            # 범위 검색(where 필터)이 가상 질문에도 걸리도록 원본의 범위 키를 복사
+            scope_keys = {
+                field: (metadata or {})[field]
+                for field in SCOPE_FIELDS
+                if (metadata or {}).get(field) is not None
+            }
             q_metas = [
                 {
+                    # 원본 본문은 복사하지 않고 참조만 (질문 3개 × 본문 중복 저장 방지)
                     "original_id": doc_id,
-                    "original_text": document,
                     "collection": coll_name,
                     "question_index": i,
+                    **scope_keys,
                 }
                 for i in range(len(questions))
             ]
@@ -173,6 +194,10 @@ async def build_hypothetical_questions(
             await asyncio.sleep(0.3)
 
         _ready_question_collections.add(q_coll_name)
+        if new_count:
+            # 검색 결과가 달라지므로 캐시가 변경을 알 수 있게 세대 번호 증가
+            # (질문 컬렉션은 BM25 대상이 아니므로 BM25 스냅샷은 그대로 유효)
+            bump_index_generation(affects_bm25=False)
         logger.info(
             f"[OK] [{coll_name}] 가상 질문 생성 완료: "
             f"{new_count}개 추가 (총 {q_col.count()}개) → 검색 활성화"
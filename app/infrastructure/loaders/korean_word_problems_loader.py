@@ -1,6 +1,8 @@
 from app.infrastructure.db.mongo.mongo_client import get_mongo_client
 from app.common.config.loader.config_loader import load_rag_config
 from app.common.logging.logging_config import get_logger
+from app.domains.progress.util.util import resolve_concept_key
+from app.infrastructure.search.search_scope import normalize_lesson_id
 
 logger = get_logger(__name__)
 
@@ -24,7 +26,7 @@ def get_korean_word_problems():
 
         # 각 차시별 데이터 처리
         for doc in docs:
-            lesson_id = _normalize_lesson_id(doc.get("lesson_id") or doc.get("lessonId", "0"))
+            lesson_id = normalize_lesson_id(doc.get("lesson_id") or doc.get("lessonId", "0"))
             option_cards = doc.get("option_cards", [])
             questions = doc.get("questions", [])
             
@@ -32,11 +34,15 @@ def get_korean_word_problems():
             for idx, q in enumerate(questions, 1):
                 # 차시별로 고유한 ID 생성 (예: lesson_1_q1, lesson_2_q1, ...)
                 question_id = f"{lesson_id}_q{idx}"
+                answer = q.get("answer", "")
                 all_questions.append({
                     "id": question_id,  # 고유 ID 추가
                     "number": idx,
                     "sentence": q.get("sentence", ""),
-                    "answer": q.get("answer", "")
+                    "answer": answer,
+                    # 범위 검색용 (차시 / 개념)
+                    "lesson_id": lesson_id,
+                    "concept_key": resolve_concept_key(answer) if answer else None,
                 })
             
             all_option_cards.extend(option_cards)
@@ -53,16 +59,6 @@ def get_korean_word_problems():
         return {}
 
 
-def _normalize_lesson_id(raw_lesson_id) -> str:
-    value = str(raw_lesson_id)
-    if value.startswith("lesson_"):
-        return value
-    if value.startswith("lesson"):
-        suffix = value.replace("lesson", "", 1)
-        return f"lesson_{suffix}"
-    return f"lesson_{value}"
-
-
 # 간단 테스트
 if __name__ == "__main__":
     from pprint import pprint
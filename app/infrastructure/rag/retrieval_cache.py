@@ -0,0 +1,149 @@
+"""
+검색 결과 캐시
+
+같은 반 학생들이 몇 분 사이에 거의 같은 질문("되 돼 차이가 뭐야?")을 반복하므로
+RagRetriever.search 앞단에서 (정규화된 질의, 컬렉션, top_k, 범위, 인덱스 세대) 단위로 결과를 재사용한다.
+
+- 인덱스 세대 번호가 키에 들어가므로 IndexingService 가 세대를 올리면 이전 항목은 다시 조회되지 않는다
+  (남은 항목은 LRU / TTL 로 자연히 밀려난다)
+- 크기(RAG_CACHE_MAX_ENTRIES) 와 TTL(RAG_CACHE_TTL_SECONDS) 로 제한
+- 워커 프로세스마다 따로 가진다 (세대 번호 파일로만 무효화를 공유)
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from app.infrastructure.search.index_generation import read_index_generation
+from app.infrastructure.search.search_scope import SearchScope
+
+_WHITESPACE = re.compile(r"\s+")
+# 문장 끝 문장부호/이모티콘성 기호는 검색 결과에 영향이 없으므로 키에서 뺀다
+_TRAILING_PUNCTUATION = re.compile(r"[\s?？!！.。~…]+$")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 질의 정규화 (NFC, 소문자, 공백 하나로, 끝 문장부호 제거)."""
+    text = unicodedata.normalize("NFC", query).lower()
+    text = _TRAILING_PUNCTUATION.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _scope_key(scope: SearchScope | None) -> Tuple:
+    if scope is None:
+        return ()
+    return tuple((field, tuple(sorted(values))) for field, values in scope.filters().items())
+
+
+class RetrievalCache:
+    """크기/TTL 제한 LRU. 키에 인덱스 세대를 포함한다."""
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        enabled: bool | None = None,
+        generation_reader: Callable[[], int] = read_index_generation,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if enabled is None:
+            enabled = os.getenv("RAG_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+        if max_entries is None:
+            max_entries = int(os.getenv("RAG_CACHE_MAX_ENTRIES", "1024"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("RAG_CACHE_TTL_SECONDS", "300"))
+
+        self.enabled = enabled and max_entries > 0 and ttl_seconds > 0
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._read_generation = generation_reader
+        self._clock = clock
+
+        # 키 → (만료 시각, 값). 뒤쪽이 최근 사용
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(
+        self,
+        query: str,
+        collection_name: str | None,
+        top_k: int,
+        scope: SearchScope | None = None,
+        generation: int | None = None,
+    ) -> Tuple:
+        """generation 을 생략하면 세대 번호 파일을 읽는다 (일괄 조회 시 한 번 읽어 넘긴다)."""
+        return (
+            normalize_query(query),
+            collection_name or "",
+            top_k,
+            _scope_key(scope),
+            self.current_generation() if generation is None else generation,
+        )
+
+    def current_generation(self) -> int:
+        # 비활성화 상태에서는 키를 쓰지 않으므로 파일을 읽지 않는다
+        return self._read_generation() if self.enabled else 0
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# 전역 인스턴스
+_retrieval_cache: RetrievalCache | None = None
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        _retrieval_cache = RetrievalCache()
+    return _retrieval_cache
@@ -1,25 +1,85 @@
 from typing import Any, Dict, List, Optional
 
+from app.infrastructure.rag.retrieval_cache import RetrievalCache, get_retrieval_cache
 from app.infrastructure.rag.schemas import RagDocument
 from app.infrastructure.search.hybrid_search import get_hybrid_search_service
+from app.infrastructure.search.search_scope import SearchScope
 
 
 class RagRetriever:
-    def __init__(self, hybrid_search=None):
+    def __init__(self, hybrid_search=None, cache: Optional[RetrievalCache] = None):
         self.hybrid_search = hybrid_search or get_hybrid_search_service()
+        # 같은 질의 반복 시 임베딩/컬렉션 쿼리/BM25/RRF 를 건너뛴다 (인덱스 세대가 바뀌면 무효)
+        self.cache = cache if cache is not None else get_retrieval_cache()
 
     async def search(
         self,
         query: str,
         collection_name: Optional[str] = None,
         top_k: int = 5,
+        scope: Optional[SearchScope] = None,
     ) -> List[RagDocument]:
+        key = self.cache.make_key(query, collection_name, top_k, scope)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self._copy(cached)
+
+        degraded: List[str] = []
         raw_results = await self.hybrid_search.search(
             query=query,
             collection_name=collection_name,
             top_k=top_k,
+            scope=scope,
+            degraded=degraded,
         )
-        return [self._to_document(item) for item in raw_results]
+        documents = [self._to_document(item) for item in raw_results]
+        # 컬렉션 타임아웃/실패 등으로 불완전한 결과는 캐시하지 않는다 (다음 요청에서 다시 검색)
+        if not degraded:
+            self.cache.put(key, documents)
+        return self._copy(documents)
+
+    async def search_many(
+        self,
+        queries: List[str],
+        collection_name: Optional[str] = None,
+        top_k: int = 5,
+        scope: Optional[SearchScope] = None,
+    ) -> List[List[RagDocument]]:
+        queries = list(queries)
+        generation = self.cache.current_generation()
+        keys = [
+            self.cache.make_key(query, collection_name, top_k, scope, generation)
+            for query in queries
+        ]
+        results: List[Optional[List[RagDocument]]] = [self.cache.get(key) for key in keys]
+
+        # 캐시에 없는 질의만 한 번에 검색 (같은 키가 여러 번 나오면 한 번만)
+        missing: Dict[Any, int] = {}
+        for index, (key, cached) in enumerate(zip(keys, results)):
+            if cached is None and key not in missing:
+                missing[key] = index
+        if missing:
+            degraded: List[str] = []
+            raw_results = await self.hybrid_search.search_many(
+                queries=[queries[index] for index in missing.values()],
+                collection_name=collection_name,
+                top_k=top_k,
+                scope=scope,
+                degraded=degraded,
+            )
+            fetched = {}
+            for key, items in zip(missing, raw_results):
+                fetched[key] = [self._to_document(item) for item in items]
+                if not degraded:
+                    self.cache.put(key, fetched[key])
+            results = [cached if cached is not None else fetched[key] for key, cached in zip(keys, results)]
+
+        return [self._copy(documents) for documents in results]
+
+    @staticmethod
+    def _copy(documents: List[RagDocument]) -> List[RagDocument]:
+        # 캐시된 객체를 호출자가 수정해도 다른 요청에 새지 않도록
+        return [doc.model_copy(deep=True) for doc in documents]
 
     def _to_document(self, item: Dict[str, Any]) -> RagDocument:
         metadata = item.get("metadata") or {}
@@ -2,6 +2,7 @@ from typing import Optional
 
 from app.infrastructure.rag.retriever import RagRetriever
 from app.infrastructure.rag.schemas import RagDocument, RagSearchResult
+from app.infrastructure.search.search_scope import SearchScope
 
 
 class RagService:
@@ -14,11 +15,28 @@ class RagService:
         query: str,
         collection_name: Optional[str] = None,
         top_k: int = 5,
+        scope: Optional[SearchScope] = None,
     ) -> RagSearchResult:
-        documents = await self.retriever.search(query, collection_name, top_k)
+        documents = await self.retriever.search(query, collection_name, top_k, scope=scope)
         context = self.build_context(documents)
         return RagSearchResult(query=query, documents=documents, context=context)
 
+    async def search_many(
+        self,
+        queries: list[str],
+        collection_name: Optional[str] = None,
+        top_k: int = 5,
+        scope: Optional[SearchScope] = None,
+    ) -> list[RagSearchResult]:
+        queries = list(queries)
+        documents_per_query = await self.retriever.search_many(
+            queries, collection_name, top_k, scope=scope
+        )
+        return [
+            RagSearchResult(query=query, documents=documents, context=self.build_context(documents))
+            for query, documents in zip(queries, documents_per_query)
+        ]
+
     async def answer(
         self,
         query: str,
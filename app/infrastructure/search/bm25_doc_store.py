@@ -0,0 +1,296 @@
+"""
+BM25 문서 테이블 (row 번호 → doc_id / 컬렉션 / 본문 / 메타데이터)
+
+행마다 str / dict 객체를 두지 않고 연속 버퍼에 모아 워커 RSS 와 빌드 시간을 줄인다.
+- 컬렉션: 이름을 intern 한 작은 int 배열 (uint8) + 컬렉션별 연속 row 구간 목록
+  (extend 한 번이 한 컬렉션의 연속 row 이므로 구간 수는 적다. 질의 경로는 배열 전체 대신 구간만 본다)
+- 본문:   UTF-8 버퍼 하나 + 오프셋 배열 (int64)
+- 메타데이터: JSON 직렬화 버퍼 + 오프셋 배열. 검색 결과로 반환되는 행만 디코딩
+- doc_id: 리스트 (id → row 매핑 dict 와 같은 str 객체를 공유)
+- 범위 역색인: lesson_id / concept_key / document_type 값 → row 배열 (범위 검색 시 채점 전에 row 를 고른다)
+
+row 번호는 BM25Index 와 같으며 삭제해도 재사용하지 않는다 (tombstone).
+삭제된 행의 본문은 save() 때 제외되므로 스냅샷 로드/재빌드 시 메모리가 회수된다.
+스냅샷에서 로드한 버퍼는 memmap(읽기 전용)이고, 증분 추가가 들어오면 그때 메모리로 복사한다.
+"""
+
+import json
+import os
+from array import array
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.infrastructure.search.search_scope import SCOPE_FIELDS
+
+DOC_STORE_FILE = "doc_store.json"
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_BUFFERS = ("collections", "text", "text_offsets", "meta", "meta_offsets")
+
+
+def _to_numpy(buffer, dtype) -> np.ndarray:
+    """array/bytearray 는 bytes 로 복사해 변환한다 (버퍼 뷰가 남아 있으면 이후 extend 가 실패한다)."""
+    if isinstance(buffer, np.ndarray):
+        return np.asarray(buffer, dtype=dtype)
+    return np.frombuffer(bytes(buffer), dtype=dtype)
+
+
+def _extend_offsets(offsets: array, chunks: List[bytes]) -> None:
+    end = offsets[-1]
+    for chunk in chunks:
+        end += len(chunk)
+        offsets.append(end)
+
+
+def _any_in_ranges(ranges: List[Tuple[int, int]], rows: np.ndarray) -> bool:
+    """정렬된 [start, end) 구간 중 하나에 rows 가 하나라도 들어가는지."""
+    if not ranges or not len(rows):
+        return False
+    bounds = np.asarray(ranges, dtype=np.int64)
+    slot = np.searchsorted(bounds[:, 0], rows, side="right") - 1
+    inside = slot >= 0
+    return bool(np.any(rows[inside] < bounds[slot[inside], 1]))
+
+
+def _nbytes(buffer) -> int:
+    if isinstance(buffer, np.ndarray):
+        return buffer.nbytes
+    return len(buffer) * getattr(buffer, "itemsize", 1)
+
+
+class BM25DocStore:
+    def __init__(self):
+        self._doc_ids: List[str] = []
+        self._collection_names: List[str] = []
+        self._collection_index: Dict[str, int] = {}
+        # 컬렉션 → 정렬된 [start, end) row 구간 (인접 구간은 합친다)
+        self._collection_ranges: Dict[str, List[Tuple[int, int]]] = {}
+        self._cleared: set[int] = set()
+        self._scope_rows: Dict[str, Dict[str, array]] = {field: {} for field in SCOPE_FIELDS}
+
+        self._collections = array("B")
+        self._text = bytearray()
+        self._text_offsets = array("q", [0])
+        self._meta = bytearray()
+        self._meta_offsets = array("q", [0])
+        self._writable = True
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """버퍼 메모리 (doc_id 리스트 제외)."""
+        return sum(_nbytes(getattr(self, f"_{name}")) for name in _BUFFERS)
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+
+    def _collection_id(self, name: str) -> int:
+        cid = self._collection_index.get(name)
+        if cid is None:
+            cid = len(self._collection_names)
+            if cid > 255:
+                raise ValueError("BM25DocStore: 컬렉션은 최대 256개까지 지원합니다")
+            self._collection_names.append(name)
+            self._collection_index[name] = cid
+        return cid
+
+    def _make_writable(self) -> None:
+        # memmap 으로 로드한 버퍼는 첫 추가 시점에 메모리로 복사
+        if self._writable:
+            return
+        self._collections = array("B", np.asarray(self._collections).tobytes())
+        self._text = bytearray(np.asarray(self._text).tobytes())
+        self._meta = bytearray(np.asarray(self._meta).tobytes())
+        text_offsets, meta_offsets = array("q"), array("q")
+        text_offsets.frombytes(np.asarray(self._text_offsets, dtype=np.int64).tobytes())
+        meta_offsets.frombytes(np.asarray(self._meta_offsets, dtype=np.int64).tobytes())
+        self._text_offsets, self._meta_offsets = text_offsets, meta_offsets
+        self._writable = True
+
+    def extend(
+        self,
+        doc_ids: Sequence[str],
+        collection: str,
+        documents: Sequence[str],
+        metadatas: Iterable[Dict[str, Any] | None] | None = None,
+    ) -> None:
+        """한 컬렉션의 문서들을 뒤에 추가한다. 추가된 행 번호는 len() 이전 값부터 연속."""
+        self._make_writable()
+        cid = self._collection_id(collection)
+        if metadatas is None:
+            metadatas = [None] * len(doc_ids)
+        metadatas = list(metadatas)
+
+        start = len(self)
+        for row, meta in enumerate(metadatas, start):
+            if not meta:
+                continue
+            for field, rows_by_value in self._scope_rows.items():
+                value = meta.get(field)
+                if value is not None:
+                    rows_by_value.setdefault(str(value), array("q")).append(row)
+
+        texts = [doc.encode("utf-8") for doc in documents]
+        metas = [_encode_json(meta).encode("utf-8") if meta else b"" for meta in metadatas]
+
+        # 버퍼 → 오프셋 → 컬렉션 → doc_id 순으로 추가 (읽기 쪽은 len() 미만 행만 접근)
+        self._text += b"".join(texts)
+        self._meta += b"".join(metas)
+        _extend_offsets(self._text_offsets, texts)
+        _extend_offsets(self._meta_offsets, metas)
+        self._collections.extend([cid] * len(doc_ids))
+        self._doc_ids.extend(doc_ids)
+        self._add_range(collection, start, len(self))
+
+    def _add_range(self, collection: str, start: int, end: int) -> None:
+        if end <= start:
+            return
+        ranges = self._collection_ranges.setdefault(collection, [])
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+
+    def clear(self, rows: Iterable[int]) -> None:
+        """삭제된 행 (본문/메타데이터는 빈 값으로 보이고, 다음 save() 때 버퍼에서 빠진다)."""
+        self._cleared.update(rows)
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+
+    def doc_id(self, row: int) -> str:
+        return self._doc_ids[row]
+
+    @property
+    def doc_ids(self) -> List[str]:
+        return self._doc_ids
+
+    def collection(self, row: int) -> str:
+        return self._collection_names[self._collections[row]]
+
+    def document(self, row: int) -> str:
+        if row in self._cleared:
+            return ""
+        start, end = self._text_offsets[row], self._text_offsets[row + 1]
+        return bytes(self._text[start:end]).decode("utf-8")
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """검색 결과로 반환할 때만 JSON 을 디코딩한다."""
+        if row in self._cleared:
+            return {}
+        start, end = self._meta_offsets[row], self._meta_offsets[row + 1]
+        if start == end:
+            return {}
+        return json.loads(bytes(self._meta[start:end]).decode("utf-8"))
+
+    def rows_matching(self, filters: Dict[str, Sequence[str]]) -> np.ndarray:
+        """범위 필터(필드 간 AND, 값 간 OR)에 맞는 row 번호 (정렬됨, 삭제된 행 포함)."""
+        matched: np.ndarray | None = None
+        for field, values in filters.items():
+            rows_by_value = self._scope_rows.get(field, {})
+            chunks = [_to_numpy(rows_by_value[v], np.int64) for v in values if v in rows_by_value]
+            rows = np.unique(np.concatenate(chunks)) if chunks else np.zeros(0, dtype=np.int64)
+            matched = rows if matched is None else np.intersect1d(matched, rows, assume_unique=True)
+            if not len(matched):
+                break
+        return matched if matched is not None else np.arange(len(self), dtype=np.int64)
+
+    def collections_of(self, rows: np.ndarray) -> List[str]:
+        """row 들이 속한 컬렉션 이름 (중복 제거, 컬렉션 등록 순서). 비용은 row 수 × log(구간 수)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return [
+            name
+            for name in self._collection_names
+            if _any_in_ranges(self._collection_ranges.get(name, []), rows)
+        ]
+
+    def rows_in_collection(self, collection: str) -> np.ndarray:
+        ranges = self._collection_ranges.get(collection)
+        if not ranges:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end, dtype=np.int64) for start, end in ranges])
+
+    # ------------------------------------------------------------------
+    # 스냅샷
+    # ------------------------------------------------------------------
+
+    def _compacted(self, buffer, offsets) -> tuple[np.ndarray, np.ndarray]:
+        """삭제된 행을 길이 0 으로 만든 (버퍼, 오프셋)."""
+        data = _to_numpy(buffer, np.uint8)
+        offsets = _to_numpy(offsets, np.int64)[: len(self) + 1]
+        if not self._cleared:
+            return data[: offsets[-1]], offsets
+
+        lengths = np.diff(offsets)
+        keep = np.ones(len(self), dtype=bool)
+        keep[list(self._cleared)] = False
+        pieces = [data[offsets[row] : offsets[row + 1]] for row in np.flatnonzero(keep & (lengths > 0))]
+        new_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.where(keep, lengths, 0), out=new_offsets[1:])
+        compacted = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.uint8)
+        return compacted, new_offsets
+
+    def save(self, directory: str) -> None:
+        text, text_offsets = self._compacted(self._text, self._text_offsets)
+        meta, meta_offsets = self._compacted(self._meta, self._meta_offsets)
+        arrays = {
+            "collections": _to_numpy(self._collections, np.uint8)[: len(self)],
+            "text": text,
+            "text_offsets": text_offsets,
+            "meta": meta,
+            "meta_offsets": meta_offsets,
+        }
+        for name, data in arrays.items():
+            np.save(os.path.join(directory, f"docs.{name}.npy"), data)
+        with open(os.path.join(directory, DOC_STORE_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "doc_ids": self._doc_ids,
+                    "collection_names": self._collection_names,
+                    "scope_rows": {
+                        field: {
+                            value: [row for row in rows if row not in self._cleared]
+                            for value, rows in rows_by_value.items()
+                        }
+                        for field, rows_by_value in self._scope_rows.items()
+                    },
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str | None = "r") -> "BM25DocStore":
+        store = cls()
+        with open(os.path.join(directory, DOC_STORE_FILE), encoding="utf-8") as f:
+            header = json.load(f)
+        store._doc_ids = header["doc_ids"]
+        store._collection_names = header["collection_names"]
+        store._collection_index = {name: i for i, name in enumerate(store._collection_names)}
+        for field, rows_by_value in header.get("scope_rows", {}).items():
+            store._scope_rows[field] = {
+                value: array("q", rows) for value, rows in rows_by_value.items()
+            }
+
+        for name in _BUFFERS:
+            path = os.path.join(directory, f"docs.{name}.npy")
+            try:
+                data = np.load(path, mmap_mode=mmap_mode)
+            except ValueError:
+                # 빈 배열은 mmap 할 수 없다
+                data = np.load(path)
+            setattr(store, f"_{name}", data)
+        store._writable = False
+
+        # 로드 때 한 번만 컬렉션 배열을 훑어 구간 목록을 만든다
+        collections = np.asarray(store._collections[: len(store)])
+        if len(collections):
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(collections)) + 1])
+            ends = np.concatenate([starts[1:], [len(collections)]])
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                store._add_range(store._collection_names[collections[start]], start, end)
+        return store
@@ -0,0 +1,484 @@
+"""
+역색인(Inverted Index) 기반 BM25 엔진
+
+rank_bm25.BM25Okapi 와 같은 점수를 내지만, 질의 토큰이 등장하는 문서(postings)만 순회한다.
+- postings: CSR 형식 (indptr / doc_ids / term_freqs) NumPy 배열
+- idf, 문서 길이 정규화 값은 변경이 있을 때만 다시 계산
+- top-k 선택은 argpartition 사용 (전체 argsort 없음)
+
+증분 갱신:
+- add_documents: 새 문서를 작은 세그먼트로 추가 (기존 postings 재구축 없음)
+- delete_documents: row 를 tombstone 처리하고 df 만 차감
+- merge_segments: 샤드별로 세그먼트를 하나로 합치며 삭제된 postings 제거 (재토큰화 없음)
+
+샤드:
+- 세그먼트는 샤드(컬렉션) 단위로 나뉘며, 어휘/idf/평균 문서 길이는 전체 샤드가 공유한다
+- shards 를 지정한 검색은 해당 샤드의 postings 만 순회한다 (점수는 전역 검색과 동일)
+
+스냅샷:
+- save: 단일 세그먼트로 병합 후 배열을 .npy 로 저장
+- load: numpy memmap 으로 열어 워커들이 OS page cache 를 공유
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Collection, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+# BM25Okapi 기본 파라미터와 동일
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+DEFAULT_EPSILON = 0.25
+
+INDEX_META_FILE = "index.json"
+DEFAULT_SHARD = "default"
+
+
+class _Segment:
+    """불변 postings 세그먼트. doc 값은 인덱스 전역 row 번호이며 term 별로 오름차순이다."""
+
+    __slots__ = ("indptr", "docs", "tfs", "shard")
+
+    def __init__(self, indptr: np.ndarray, docs: np.ndarray, tfs: np.ndarray, shard: str):
+        self.indptr = indptr
+        self.docs = docs
+        self.tfs = tfs
+        self.shard = shard
+
+    def postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray] | None:
+        # 세그먼트 생성 이후 추가된 어휘는 이 세그먼트에 없음
+        if term_id + 1 >= len(self.indptr):
+            return None
+        start, end = self.indptr[term_id], self.indptr[term_id + 1]
+        if start == end:
+            return None
+        return self.docs[start:end], self.tfs[start:end]
+
+    def term_ids(self) -> np.ndarray:
+        """postings 각 원소의 term_id (indptr 전개)."""
+        return np.repeat(
+            np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr)
+        )
+
+
+def _build_segment(
+    term_ids: np.ndarray, doc_rows: np.ndarray, tfs: np.ndarray, vocab_size: int, shard: str
+) -> _Segment:
+    # term_id 기준 안정 정렬 → 각 postings 안에서 doc row 오름차순 유지
+    order = np.argsort(term_ids, kind="stable")
+    indptr = np.zeros(vocab_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=vocab_size), out=indptr[1:])
+    return _Segment(
+        indptr,
+        doc_rows[order].astype(np.int32, copy=False),
+        tfs[order].astype(np.int32, copy=False),
+        shard,
+    )
+
+
+class BM25Index:
+    """세그먼트 단위로 증분 갱신 가능한 BM25 역색인."""
+
+    def __init__(
+        self,
+        tokenized_docs: Sequence[Sequence[str]] = (),
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        epsilon: float = DEFAULT_EPSILON,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.vocab: Dict[str, int] = {}
+        self.segments: List[_Segment] = []
+        self.doc_freqs = np.zeros(0, dtype=np.int64)
+        self.doc_len = np.zeros(0, dtype=np.int64)
+        self.live = np.zeros(0, dtype=bool)
+
+        self._live_count = 0
+        self._total_len = 0
+        self._lock = threading.Lock()
+
+        # 통계(idf, 문서 길이 정규화)는 변경 후 첫 질의에서 다시 계산
+        self._dirty = True
+        self.idf = np.zeros(0, dtype=np.float64)
+        self.avgdl = 0.0
+        self.doc_norm = np.zeros(0, dtype=np.float64)
+
+        if tokenized_docs:
+            self.add_documents(tokenized_docs)
+
+    @property
+    def corpus_size(self) -> int:
+        """살아 있는(삭제되지 않은) 문서 수."""
+        return self._live_count
+
+    @property
+    def n_rows(self) -> int:
+        """tombstone 을 포함한 전체 row 수."""
+        return len(self.doc_len)
+
+    @property
+    def shards(self) -> List[str]:
+        """세그먼트가 존재하는 샤드 목록 (추가 순서)."""
+        return list(dict.fromkeys(segment.shard for segment in self.segments))
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+
+    def add_documents(
+        self, tokenized_docs: Sequence[Sequence[str]], shard: str = DEFAULT_SHARD
+    ) -> np.ndarray:
+        """토큰 문자열 문서를 추가한다. (어휘 id 는 최초 등장 순서로 부여)"""
+        vocab = self.vocab
+        return self.add_encoded_documents(
+            [[vocab.setdefault(token, len(vocab)) for token in tokens] for tokens in tokenized_docs],
+            shard=shard,
+        )
+
+    def add_encoded_documents(
+        self, encoded_docs: Sequence[Sequence[int]], shard: str = DEFAULT_SHARD
+    ) -> np.ndarray:
+        """
+        이미 self.vocab 으로 intern 된 term id 문서를 샤드의 새 세그먼트로 추가하고
+        부여된 row 번호들을 반환한다.
+        """
+        base = self.n_rows
+        n_docs = len(encoded_docs)
+        if not n_docs:
+            return np.arange(base, base)
+
+        term_ids: List[int] = []
+        doc_rows: List[int] = []
+        term_freqs: List[int] = []
+        doc_len = np.zeros(n_docs, dtype=np.int64)
+
+        for offset, doc_term_ids in enumerate(encoded_docs):
+            doc_len[offset] = len(doc_term_ids)
+            frequencies: Dict[int, int] = {}
+            for term_id in doc_term_ids:
+                frequencies[term_id] = frequencies.get(term_id, 0) + 1
+            for term_id, freq in frequencies.items():
+                term_ids.append(term_id)
+                doc_rows.append(base + offset)
+                term_freqs.append(freq)
+
+        term_arr = np.asarray(term_ids, dtype=np.int64)
+        segment = _build_segment(
+            term_arr,
+            np.asarray(doc_rows, dtype=np.int64),
+            np.asarray(term_freqs, dtype=np.int64),
+            len(self.vocab),
+            shard,
+        )
+
+        with self._lock:
+            doc_freqs = np.zeros(len(self.vocab), dtype=np.int64)
+            doc_freqs[: len(self.doc_freqs)] = self.doc_freqs
+            doc_freqs += np.bincount(term_arr, minlength=len(self.vocab))
+            self.doc_freqs = doc_freqs
+
+            self.doc_len = np.concatenate([self.doc_len, doc_len])
+            self.live = np.concatenate([self.live, np.ones(n_docs, dtype=bool)])
+            self.segments = self.segments + [segment]
+            self._live_count += n_docs
+            self._total_len += int(doc_len.sum())
+            self._dirty = True
+
+        return np.arange(base, base + n_docs)
+
+    def delete_documents(self, rows: Sequence[int]) -> int:
+        """row 들을 tombstone 처리한다. postings 는 다음 merge 에서 제거된다."""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return 0
+
+        with self._lock:
+            rows = rows[self.live[rows]]
+            if not len(rows):
+                return 0
+
+            for segment in self.segments:
+                hit = np.isin(segment.docs, rows)
+                if hit.any():
+                    np.subtract.at(self.doc_freqs, segment.term_ids()[hit], 1)
+
+            live = self.live.copy()
+            live[rows] = False
+            self.live = live
+            self._live_count -= len(rows)
+            self._total_len -= int(self.doc_len[rows].sum())
+            self._dirty = True
+
+        return len(rows)
+
+    def merge_segments(self) -> bool:
+        """
+        샤드별로 세그먼트를 하나로 합치고 삭제된 postings 를 제거한다.
+        백그라운드 스레드에서 호출해도 되며, 병합 중 추가된 세그먼트는 유지된다.
+        """
+        with self._lock:
+            snapshot = self.segments
+            live = self.live
+
+        groups: Dict[str, List[_Segment]] = {}
+        for segment in snapshot:
+            groups.setdefault(segment.shard, []).append(segment)
+
+        merged: List[_Segment] = []
+        changed = False
+        for shard, group in groups.items():
+            if len(group) == 1 and live[group[0].docs].all():
+                merged.append(group[0])
+                continue
+
+            terms = np.concatenate([seg.term_ids() for seg in group])
+            docs = np.concatenate([seg.docs for seg in group]).astype(np.int64)
+            tfs = np.concatenate([seg.tfs for seg in group])
+            keep = live[docs]
+            merged.append(
+                _build_segment(terms[keep], docs[keep], tfs[keep], len(self.vocab), shard)
+            )
+            changed = True
+
+        if not changed:
+            return False
+
+        with self._lock:
+            current = self.segments
+            if current[: len(snapshot)] != snapshot:
+                return False
+            self.segments = merged + current[len(snapshot):]
+
+        return True
+
+    # ------------------------------------------------------------------
+    # 스냅샷
+    # ------------------------------------------------------------------
+
+    def save(self, directory: str) -> None:
+        """인덱스를 디렉토리에 저장한다. 저장 전 샤드별 세그먼트를 하나로 병합한다."""
+        self.merge_segments()
+        while len(self.segments) > len(self.shards):
+            self.merge_segments()
+        self._refresh_stats()
+
+        arrays = {}
+        for shard_index, segment in enumerate(self.segments):
+            arrays[f"shard{shard_index}.indptr"] = segment.indptr
+            arrays[f"shard{shard_index}.postings_docs"] = segment.docs
+            arrays[f"shard{shard_index}.postings_tfs"] = segment.tfs
+        arrays.update({
+            "doc_freqs": self.doc_freqs,
+            "doc_len": self.doc_len,
+            "live": self.live,
+            "idf": self.idf,
+            "doc_norm": self.doc_norm,
+        })
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+
+        meta = {
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "avgdl": self.avgdl,
+            "live_count": self._live_count,
+            "total_len": self._total_len,
+            "shards": [segment.shard for segment in self.segments],
+            "vocab": list(self.vocab),  # dict 삽입 순서 == term_id 순서
+        }
+        with open(os.path.join(directory, INDEX_META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str | None = "r") -> "BM25Index":
+        """
+        save() 로 저장한 인덱스를 연다.
+        postings / 문서 길이 / idf 는 memmap(읽기 전용)으로, 갱신되는 배열만 메모리로 복사한다.
+        """
+        with open(os.path.join(directory, INDEX_META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        def _load(name: str, mode: str | None = mmap_mode) -> np.ndarray:
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+
+        index = cls(k1=meta["k1"], b=meta["b"], epsilon=meta["epsilon"])
+        index.vocab = {term: term_id for term_id, term in enumerate(meta["vocab"])}
+        index.segments = [
+            _Segment(
+                _load(f"shard{shard_index}.indptr"),
+                _load(f"shard{shard_index}.postings_docs"),
+                _load(f"shard{shard_index}.postings_tfs"),
+                shard,
+            )
+            for shard_index, shard in enumerate(meta["shards"])
+        ]
+        # delete_documents 가 제자리 갱신하는 배열은 복사본 사용
+        index.doc_freqs = _load("doc_freqs", None)
+        index.live = _load("live", None)
+        index.doc_len = _load("doc_len")
+        index.idf = _load("idf")
+        index.doc_norm = _load("doc_norm")
+        index.avgdl = meta["avgdl"]
+        index._live_count = meta["live_count"]
+        index._total_len = meta["total_len"]
+        index._dirty = False
+        return index
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+
+    def _refresh_stats(self) -> None:
+        if not self._dirty:
+            return
+        with self._lock:
+            self.idf = self._calc_idf(self.doc_freqs)
+            self.avgdl = self._total_len / self._live_count if self._live_count else 0.0
+            self.doc_norm = self._calc_doc_norm()
+            self._dirty = False
+
+    def _calc_idf(self, doc_freqs: np.ndarray) -> np.ndarray:
+        """BM25Okapi._calc_idf 와 동일한 식 (음수 idf 는 epsilon * 평균 idf 로 대체)."""
+        idf = np.zeros(len(doc_freqs), dtype=np.float64)
+
+        idf_sum = 0.0
+        n_terms = 0
+        negative = []
+        for term_id, freq in enumerate(doc_freqs.tolist()):
+            # 살아 있는 문서에 더 이상 등장하지 않는 어휘는 제외
+            if freq == 0:
+                continue
+            value = math.log(self._live_count - freq + 0.5) - math.log(freq + 0.5)
+            idf[term_id] = value
+            idf_sum += value
+            n_terms += 1
+            if value < 0:
+                negative.append(term_id)
+
+        if n_terms:
+            idf[negative] = self.epsilon * (idf_sum / n_terms)
+        return idf
+
+    def _calc_doc_norm(self) -> np.ndarray:
+        """문서별 k1 * (1 - b + b * |d| / avgdl) 사전 계산."""
+        if not self.avgdl:
+            return np.zeros(self.n_rows, dtype=np.float64)
+        return self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl)
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def _postings(
+        self,
+        term_id: int,
+        shards: Collection[str] | None = None,
+        row_mask: np.ndarray | None = None,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(지정한 샤드의) 세그먼트에서 살아 있는 (row_mask 가 True 인) postings 만 반환한다."""
+        for segment in self.segments:
+            if shards is not None and segment.shard not in shards:
+                continue
+            postings = segment.postings(term_id)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            alive = self.live[docs]
+            if row_mask is not None:
+                alive = alive & row_mask[docs]
+            if not alive.all():
+                docs, tfs = docs[alive], tfs[alive]
+            if len(docs):
+                yield docs, tfs
+
+    def _term_scores(self, term_id: int, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        return self.idf[term_id] * (
+            tfs * (self.k1 + 1) / (tfs + self.doc_norm[docs])
+        )
+
+    def encode_query(self, tokens: Sequence[str]) -> List[int]:
+        """토큰 문자열 → term id (어휘에 없는 토큰은 점수 기여가 없으므로 제외)."""
+        return [self.vocab[token] for token in tokens if token in self.vocab]
+
+    def get_scores(
+        self, tokens: Sequence[str], shards: Collection[str] | None = None
+    ) -> np.ndarray:
+        """전체 row 점수 배열 (BM25Okapi.get_scores 호환, 검증/디버그용)."""
+        self._refresh_stats()
+        scores = np.zeros(self.n_rows)
+        for term_id in self.encode_query(tokens):
+            for docs, tfs in self._postings(term_id, shards):
+                scores[docs] += self._term_scores(term_id, docs, tfs)
+        return scores
+
+    def get_batch_scores(self, tokens: Sequence[str], doc_indices: Sequence[int]) -> np.ndarray:
+        """지정한 row 들에 대해서만 점수를 계산한다."""
+        return self.get_batch_scores_ids(self.encode_query(tokens), doc_indices)
+
+    def get_batch_scores_ids(
+        self, term_ids: Sequence[int], doc_indices: Sequence[int]
+    ) -> np.ndarray:
+        """지정한 row 들에 대해서만 점수를 계산한다 (postings 이진 탐색)."""
+        self._refresh_stats()
+        doc_indices = np.asarray(doc_indices, dtype=np.int64)
+        scores = np.zeros(len(doc_indices))
+        for term_id in term_ids:
+            for docs, tfs in self._postings(term_id):
+                pos = np.minimum(np.searchsorted(docs, doc_indices), len(docs) - 1)
+                hit = docs[pos] == doc_indices
+                if hit.any():
+                    scores[hit] += self._term_scores(term_id, doc_indices[hit], tfs[pos[hit]])
+        return scores
+
+    def top_k(
+        self, tokens: Sequence[str], k: int, shards: Collection[str] | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """토큰 문자열 질의로 top_k_ids 를 호출한다."""
+        return self.top_k_ids(self.encode_query(tokens), k, shards)
+
+    def top_k_ids(
+        self,
+        term_ids: Sequence[int],
+        k: int,
+        shards: Collection[str] | None = None,
+        row_mask: np.ndarray | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의 term 이 등장하는 문서만 점수화해 상위 k개를 반환한다.
+        shards 를 지정하면 해당 샤드의 postings 만 순회한다 (None 이면 전체).
+        row_mask(길이 n_rows 의 bool 배열)를 주면 True 인 row 만 채점한다 (범위 검색).
+
+        Returns:
+            (row 번호 배열, 점수 배열) — 점수 내림차순, 점수 > 0 인 문서만
+        """
+        self._refresh_stats()
+        doc_chunks = []
+        score_chunks = []
+        for term_id in term_ids:
+            for docs, tfs in self._postings(term_id, shards, row_mask):
+                doc_chunks.append(docs)
+                score_chunks.append(self._term_scores(term_id, docs, tfs))
+
+        if not doc_chunks or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        # 토큰 순서대로 누적 (bincount 는 등장 순서대로 더하므로 get_scores 와 동일한 합산 순서)
+        touched, inverse = np.unique(np.concatenate(doc_chunks), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_chunks), minlength=len(touched))
+
+        positive = scores > 0
+        touched, scores = touched[positive], scores[positive]
+
+        if len(scores) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            touched, scores = touched[part], scores[part]
+
+        order = np.argsort(-scores, kind="stable")
+        return touched[order], scores[order]
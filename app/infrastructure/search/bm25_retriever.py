@@ -1,119 +1,372 @@
-import re
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Tuple, Dict, Any
-from app.common.logging.logging_config import get_logger
-
-logger = get_logger(__name__)
 
-try:
-    from rank_bm25 import BM25Okapi
-except ModuleNotFoundError:
-    BM25Okapi = None
+import numpy as np
 
+from app.infrastructure.search.bm25_doc_store import BM25DocStore
+from app.infrastructure.search.bm25_index import BM25Index
+from app.infrastructure.search.bm25_snapshot import (
+    load_doc_store,
+    read_snapshot_manifest,
+    write_snapshot,
+)
+from app.infrastructure.search.index_generation import read_bm25_generation
+from app.infrastructure.search.search_scope import SCOPE_EXEMPT_FIELDS, SearchScope
+from app.infrastructure.search.tokenizer import KoreanTokenizer
+from app.common.logging.logging_config import get_logger
 
-def _tokenize_korean(text: str) -> List[str]:
-    """
-    한국어 텍스트를 토큰화한다.
-    - 공백 기준 어절 분리
-    - 한국어 글자 단위 바이그램 추가 (형태소 변형 커버)
-      예) "되다" → ["되다", "되다", "되", "다"]
-          "되와" → ["되와", "되", "와"]
-    """
-    # 특수문자 제거 후 어절 분리
-    clean = re.sub(r"[^\w가-힣a-zA-Z0-9]", " ", text)
-    words = [w for w in clean.split() if w]
+logger = get_logger(__name__)
 
-    tokens = list(words)
+# BM25 인덱스 대상 컬렉션 (가상 질문 컬렉션은 제외)
+BM25_COLLECTIONS = ["card_check", "korean_word_problems", "pdf_documents"]
 
-    # 한국어 단어에 대해 글자 바이그램 추가
-    for word in words:
-        korean_chars = re.sub(r"[^가-힣]", "", word)
-        if len(korean_chars) >= 2:
-            for i in range(len(korean_chars) - 1):
-                tokens.append(korean_chars[i : i + 2])
-        # 단일 글자도 추가 (받침 없는 조사 붙은 형태 처리)
-        for ch in korean_chars:
-            tokens.append(ch)
 
-    return tokens
+def _collection_counts(vector_db) -> Dict[str, int]:
+    counts = {}
+    for coll_name in BM25_COLLECTIONS:
+        collection = vector_db.get_collection(coll_name)
+        counts[coll_name] = collection.count() if collection else 0
+    return counts
 
 
 class BM25Retriever:
     """
     ChromaDB 전체 문서를 대상으로 BM25 키워드 검색을 수행한다.
-    서버 시작 시 모든 컬렉션의 문서를 로드해 인메모리 인덱스를 구축한다.
+    서버 시작 시 모든 컬렉션의 문서를 로드해 인메모리 인덱스를 구축하고,
+    이후 인덱싱 파이프라인의 추가/수정/삭제는 증분 세그먼트로 반영한다.
+    증분 반영은 요청을 처리한 워커에서만 일어나므로, 다른 워커는 BM25 세대 번호가 바뀐 것을 보고
+    백그라운드에서 스냅샷을 다시 로드(없거나 stale 이면 재구축)한다. 그동안은 기존 인덱스로 검색한다.
     """
 
     def __init__(self):
-        self._bm25: BM25Okapi | None = None
-        self._corpus: List[str] = []
-        self._doc_ids: List[str] = []
-        self._collections: List[str] = []
-        self._metadatas: List[Dict[str, Any]] = []
+        self._bm25: BM25Index | None = None
+        self._tokenizer: KoreanTokenizer | None = None
+        # row 번호 → doc_id / 컬렉션 / 본문 / 메타데이터 (BM25Index 와 같은 row 번호)
+        self._docs = BM25DocStore()
+        self._id_to_index: Dict[str, int] = {}
 
-    def build_index(self, vector_db) -> None:
-        """ChromaDB 전체 컬렉션에서 문서를 로드해 BM25 인덱스를 구축한다."""
-        if BM25Okapi is None:
-            logger.warning("[WARN] BM25 인덱스: rank_bm25 패키지가 없어 비활성화합니다")
-            return
+        # 세그먼트 수가 한도를 넘으면 백그라운드에서 병합
+        self.max_segments = int(os.getenv("BM25_MAX_SEGMENTS", "8"))
+        self._merge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bm25-merge")
+        self._merge_future: Future | None = None
 
-        self._corpus = []
-        self._doc_ids = []
-        self._collections = []
-        self._metadatas = []
+        # 다른 워커의 인덱싱 감지 (build_index / load_snapshot 시점 BM25 세대 번호와 비교)
+        self.generation_check_interval = float(os.getenv("BM25_GENERATION_CHECK_SECONDS", "1.0"))
+        self._clock = time.monotonic
+        self._vector_db = None
+        self._generation: int | None = None
+        self._checked_at = float("-inf")
+        self._stale = False
+        self._reload_thread: threading.Thread | None = None
 
-        collection_names = ["card_check", "korean_word_problems", "pdf_documents"]
+    def build_index(self, vector_db) -> None:
+        """ChromaDB 전체 컬렉션에서 문서를 로드해 BM25 인덱스를 구축한다."""
+        # 읽기 전에 세대를 기록 (구축 중에 바뀐 변경은 다음 확인에서 다시 감지)
+        generation = read_bm25_generation()
+        docs = BM25DocStore()
 
-        for coll_name in collection_names:
+        # 컬렉션별 샤드로 구축 (어휘/idf 등 통계는 전체 샤드가 공유)
+        index = BM25Index()
+        tokenizer = KoreanTokenizer(index.vocab)
+        for coll_name in BM25_COLLECTIONS:
             collection = vector_db.get_collection(coll_name)
             if not collection or collection.count() == 0:
                 continue
 
             result = collection.get(include=["documents", "metadatas"])
-            for doc_id, doc, meta in zip(
-                result["ids"], result["documents"], result["metadatas"]
-            ):
-                self._corpus.append(doc)
-                self._doc_ids.append(doc_id)
-                self._collections.append(coll_name)
-                self._metadatas.append(meta or {})
-
-        if not self._corpus:
+            index.add_encoded_documents(
+                [tokenizer.encode(doc) for doc in result["documents"]], shard=coll_name
+            )
+            docs.extend(result["ids"], coll_name, result["documents"], result["metadatas"])
+
+        self._docs = docs
+        self._id_to_index = {doc_id: i for i, doc_id in enumerate(docs.doc_ids)}
+        self._mark_loaded(vector_db, generation)
+        if not len(docs):
+            self._set_index(None)
             logger.warning("[WARN] BM25 인덱스: 문서 없음")
             return
 
-        tokenized = [_tokenize_korean(doc) for doc in self._corpus]
-        self._bm25 = BM25Okapi(tokenized)
-        logger.info(f"[OK] BM25 인덱스 구축 완료: {len(self._corpus)}개 문서")
+        self._set_index(index)
+        logger.info(
+            f"[OK] BM25 인덱스 구축 완료: {len(docs)}개 문서 "
+            f"(문서 테이블 {docs.nbytes / 1024 / 1024:.1f}MB)"
+        )
+
+    def _set_index(self, index: BM25Index | None) -> None:
+        # 토크나이저는 인덱스의 어휘 사전을 공유한다
+        self._bm25 = index
+        self._tokenizer = KoreanTokenizer(index.vocab) if index is not None else None
+
+    def _mark_loaded(self, vector_db, generation: int) -> None:
+        self._vector_db = vector_db
+        self._generation = generation
+        self._stale = False
+
+    def _is_current(self) -> bool:
+        """BM25 세대 번호가 로드 때와 같은지 확인한다 (파일 읽기는 check 간격마다 한 번). 다르면 재로드 시작."""
+        if self._generation is None:
+            return True
+        now = self._clock()
+        if now - self._checked_at >= self.generation_check_interval:
+            self._checked_at = now
+            generation = read_bm25_generation()
+            if generation != self._generation:
+                if not self._stale:
+                    logger.info(f"[INFO] BM25 인덱스 stale (generation {self._generation} → {generation})")
+                self._stale = True
+                # 이미 재로드 중이면 무시, 실패했으면 다시 시도
+                self._start_reload()
+        return not self._stale
+
+    def _start_reload(self) -> None:
+        if self._vector_db is None or (self._reload_thread is not None and self._reload_thread.is_alive()):
+            return
+        self._reload_thread = threading.Thread(target=self._reload, name="bm25-reload", daemon=True)
+        self._reload_thread.start()
+
+    def _reload(self) -> None:
+        try:
+            if not self.load_snapshot(self._vector_db):
+                self.build_index(self._vector_db)
+        except Exception as e:
+            # stale 상태 유지 → 그동안은 기존 인덱스로 검색하고 다음 확인 때 다시 시도
+            logger.warning(f"[WARN] BM25 인덱스 재로드 실패: {e}")
+
+    def acknowledge_generation(self, generation: int) -> None:
+        """
+        이 워커가 직접 증분 반영한 뒤 BM25 세대 번호를 올렸을 때 호출한다.
+        마지막으로 본 세대에서 한 칸만 올랐으면 (다른 워커의 변경이 없으면) 자기 변경으로 재로드하지 않는다.
+        """
+        if not self._stale and self._generation is not None and generation == self._generation + 1:
+            self._generation = generation
+
+    def save_snapshot(self, vector_db) -> str | None:
+        """현재 인덱스를 디스크 스냅샷으로 저장한다 (BM25 세대 번호/컬렉션 문서 수 기록)."""
+        if self._bm25 is None:
+            return None
+
+        manifest = {
+            "bm25_generation": read_bm25_generation(),
+            "collection_counts": _collection_counts(vector_db),
+            "n_docs": self._bm25.corpus_size,
+        }
+        path = write_snapshot(self._bm25, self._docs, manifest)
+        logger.info(f"[OK] BM25 스냅샷 저장 완료: {path}")
+        return path
+
+    def load_snapshot(self, vector_db) -> bool:
+        """
+        최신 스냅샷을 memmap 으로 로드한다.
+        BM25 세대 번호나 BM25 대상 컬렉션 문서 수가 다르면 stale 로 보고 False 를 반환한다.
+        (가상 질문 생성처럼 BM25 대상이 아닌 컬렉션 변경은 스냅샷을 무효화하지 않는다)
+        """
+        found = read_snapshot_manifest()
+        if found is None:
+            return False
+
+        path, manifest = found
+        generation = read_bm25_generation()
+        counts = _collection_counts(vector_db)
+        if manifest.get("bm25_generation") != generation or manifest.get("collection_counts") != counts:
+            logger.info(
+                f"[INFO] BM25 스냅샷 stale (generation {manifest.get('bm25_generation')} → {generation}, "
+                f"counts {manifest.get('collection_counts')} → {counts})"
+            )
+            return False
+
+        index = BM25Index.load(path)
+        docs = load_doc_store(path)
+
+        self._set_index(index)
+        self._docs = docs
+        self._id_to_index = {
+            doc_id: row for row, doc_id in enumerate(docs.doc_ids) if index.live[row]
+        }
+        self._mark_loaded(vector_db, generation)
+        logger.info(f"[OK] BM25 스냅샷 로드 완료: {index.corpus_size}개 문서 ({path})")
+        return True
 
     def search(
-        self, query: str, n_results: int = 20
+        self,
+        query: str,
+        n_results: int = 20,
+        collection_names: List[str] | None = None,
+        scope: SearchScope | None = None,
     ) -> List[Tuple[str, str, str, float, Dict]]:
         """
         BM25 검색 수행.
 
+        Args:
+            collection_names: 검색할 컬렉션(샤드) 목록. None 이면 전체 컬렉션.
+            scope: 검색 범위. 메타데이터 역색인으로 row 를 먼저 고르고,
+                   해당 row 가 있는 샤드의 postings 만 채점한다.
+
         Returns:
             (doc_id, document, collection_name, bm25_score, metadata) 리스트
         """
-        if self._bm25 is None or not self._corpus:
+        self._is_current()
+        if self._bm25 is None or not self._bm25.corpus_size:
             return []
 
-        tokens = _tokenize_korean(query)
-        scores = self._bm25.get_scores(tokens)
+        shards, row_mask = collection_names, None
+        if scope is not None and not scope.is_empty():
+            rows = self._scoped_rows(scope)
+            rows = rows[rows < self._bm25.n_rows]
+            if not len(rows):
+                return []
+            scoped_shards = set(self._docs.collections_of(rows))
+            shards = [s for s in (collection_names or scoped_shards) if s in scoped_shards]
+            row_mask = np.zeros(self._bm25.n_rows, dtype=bool)
+            row_mask[rows] = True
+
+        term_ids = self._tokenizer.encode_query(query)
+        # 질의 토큰의 postings 만 순회 (점수 0 이하 문서는 제외된 상태로 반환)
+        top_indices, scores = self._bm25.top_k_ids(
+            term_ids, n_results, shards=shards, row_mask=row_mask
+        )
 
-        top_n = min(n_results, len(scores))
-        top_indices = scores.argsort()[::-1][:top_n]
+        return [self._hit(i, score) for i, score in zip(top_indices.tolist(), scores.tolist())]
 
-        return [
-            (
-                self._doc_ids[i],
-                self._corpus[i],
-                self._collections[i],
-                float(scores[i]),
-                self._metadatas[i],
+    def _scoped_rows(self, scope: SearchScope) -> np.ndarray:
+        """범위에 맞는 row. 면제 필드가 있는 컬렉션은 그 필드를 뺀 범위로 따로 고른다 (SCOPE_EXEMPT_FIELDS)."""
+        rows = self._docs.rows_matching(scope.filters())
+        for collection in SCOPE_EXEMPT_FIELDS:
+            relaxed = scope.for_collection(collection)
+            if relaxed is scope:
+                continue
+            exempt_rows = np.intersect1d(
+                self._docs.rows_matching(relaxed.filters()),
+                self._docs.rows_in_collection(collection),
+                assume_unique=True,
             )
-            for i in top_indices
-            if scores[i] > 0  # 점수 0 이하 제외
+            rows = np.union1d(rows, exempt_rows)
+        return rows
+
+    def _hit(self, row: int, score: float) -> Tuple[str, str, str, float, Dict]:
+        # 본문/메타데이터는 반환되는 행만 디코딩
+        docs = self._docs
+        return (
+            docs.doc_id(row),
+            docs.document(row),
+            docs.collection(row),
+            float(score),
+            docs.metadata(row),
+        )
+
+    def get_documents(self, doc_ids: List[str]) -> Dict[str, Tuple[str, Dict]]:
+        """
+        doc_id → (본문, 메타데이터). 인덱스에 있는 (삭제되지 않은) 문서만 반환한다.
+        가상 질문 검색 결과의 원본 문서를 일괄 조회할 때 사용 (문서 테이블을 공용 저장소로 사용).
+        """
+        found = {}
+        for doc_id in doc_ids:
+            row = self._id_to_index.get(doc_id)
+            if row is not None:
+                found[doc_id] = (self._docs.document(row), self._docs.metadata(row))
+        return found
+
+    def score_candidates(
+        self, query: str, doc_ids: List[str]
+    ) -> List[Tuple[str, str, str, float, Dict]]:
+        """
+        주어진 후보 doc_id 들에 대해서만 BM25 점수를 계산한다.
+        (Dense 후보군 재채점용 — 비용이 코퍼스 크기가 아닌 후보 수에 비례)
+        순위는 후보 안에서의 순위이므로 search() 의 코퍼스 전체 순위와 다를 수 있다.
+
+        Returns:
+            search()와 동일한 튜플 형식, 점수 내림차순
+        """
+        self._is_current()
+        if self._bm25 is None or not self._bm25.corpus_size:
+            return []
+
+        indices = [self._id_to_index[d] for d in doc_ids if d in self._id_to_index]
+        if not indices:
+            return []
+
+        term_ids = self._tokenizer.encode_query(query)
+        scores = self._bm25.get_batch_scores_ids(term_ids, indices)
+
+        ranked = sorted(zip(indices, scores), key=lambda x: x[1], reverse=True)
+        return [self._hit(i, score) for i, score in ranked if score > 0]
+
+    # ------------------------------------------------------------------
+    # 증분 갱신 (IndexingService 에서 호출)
+    # ------------------------------------------------------------------
+
+    def upsert_documents(
+        self,
+        collection_name: str,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]] | None = None,
+    ) -> int:
+        """
+        문서를 추가하거나 같은 doc_id 의 기존 문서를 교체한다.
+        새 문서만 토큰화하며 기존 postings 는 다시 만들지 않는다.
+        """
+        if collection_name not in BM25_COLLECTIONS or not ids:
+            return 0
+
+        if self._bm25 is None:
+            self._set_index(BM25Index())
+
+        self._remove_rows([self._id_to_index[d] for d in ids if d in self._id_to_index])
+
+        # 문서 테이블을 먼저 채운 뒤 인덱스에 추가 (검색은 인덱스에 있는 행만 조회)
+        self._docs.extend(ids, collection_name, documents, metadatas)
+        rows = self._bm25.add_encoded_documents(
+            [self._tokenizer.encode(doc) for doc in documents], shard=collection_name
+        )
+        for row, doc_id in zip(rows.tolist(), ids):
+            self._id_to_index[doc_id] = row
+
+        self._schedule_merge()
+        return len(ids)
+
+    def delete_documents(self, ids: List[str]) -> int:
+        """doc_id 목록을 인덱스에서 삭제한다."""
+        return self._remove_rows([self._id_to_index[d] for d in ids if d in self._id_to_index])
+
+    def delete_collection(self, collection_name: str) -> int:
+        """해당 컬렉션의 모든 문서를 인덱스에서 삭제한다."""
+        rows = [
+            row
+            for row in self._docs.rows_in_collection(collection_name).tolist()
+            if self._id_to_index.get(self._docs.doc_id(row)) == row
         ]
+        return self._remove_rows(rows)
+
+    def _remove_rows(self, rows: List[int]) -> int:
+        if self._bm25 is None or not rows:
+            return 0
+
+        removed = self._bm25.delete_documents(rows)
+        # row 번호는 유지 (tombstone). 본문은 다음 스냅샷 저장 때 버퍼에서 빠진다
+        for row in rows:
+            self._id_to_index.pop(self._docs.doc_id(row), None)
+        self._docs.clear(rows)
+
+        self._schedule_merge()
+        return removed
+
+    def _schedule_merge(self) -> None:
+        if self._bm25 is None or len(self._bm25.segments) <= self.max_segments:
+            return
+        if self._merge_future is not None and not self._merge_future.done():
+            return
+        self._merge_future = self._merge_executor.submit(self._merge_safely, self._bm25)
+
+    def _merge_safely(self, index: BM25Index) -> None:
+        try:
+            if index.merge_segments():
+                logger.info(f"[OK] BM25 세그먼트 병합 완료: {index.corpus_size}개 문서")
+        except Exception as e:
+            logger.warning(f"[WARN] BM25 세그먼트 병합 실패: {e}")
 
 
 # 전역 인스턴스
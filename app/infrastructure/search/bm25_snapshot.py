@@ -0,0 +1,102 @@
+"""
+BM25 인덱스 디스크 스냅샷
+
+구조:
+    {BM25_SNAPSHOT_DIR}/
+        CURRENT                 ← 최신 스냅샷 디렉토리명 (원자적 교체)
+        gen-000003-<pid>-<ts>/
+            manifest.json       ← 포맷 버전, 인덱스 세대 번호, 컬렉션별 문서 수
+            doc_store.json, docs.*.npy ← BM25DocStore.save() 결과 (doc_id / 컬렉션 / 본문 / 메타데이터)
+            index.json, *.npy   ← BM25Index.save() 결과 (memmap 으로 로드)
+
+각 스냅샷은 새 디렉토리에 쓴 뒤 CURRENT 만 교체하므로,
+이전 스냅샷을 memmap 으로 열고 있는 워커에 영향을 주지 않는다.
+"""
+
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, Tuple
+
+from app.infrastructure.search.bm25_doc_store import BM25DocStore
+from app.infrastructure.search.bm25_index import BM25Index
+from app.common.logging.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 4  # 2: 컬렉션별 샤드, 3: 버퍼 기반 문서 테이블, 4: 범위 역색인
+DEFAULT_SNAPSHOT_DIR = "./bm25_snapshot"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+KEEP_SNAPSHOTS = 2  # 최신 + 직전 1개 유지
+
+
+def get_snapshot_root() -> str:
+    """스냅샷 루트 디렉토리를 반환합니다."""
+    return os.getenv("BM25_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+
+
+def write_snapshot(
+    index: BM25Index,
+    doc_store: BM25DocStore,
+    manifest: Dict[str, Any],
+    root: str | None = None,
+) -> str:
+    """스냅샷을 새 디렉토리에 기록하고 CURRENT 를 교체한다. 생성된 경로를 반환한다."""
+    root = root or get_snapshot_root()
+    os.makedirs(root, exist_ok=True)
+
+    name = f"gen-{manifest['bm25_generation']:06d}-{os.getpid()}-{time.time_ns()}"
+    tmp_dir = os.path.join(root, f".{name}.tmp")
+    os.makedirs(tmp_dir)
+
+    index.save(tmp_dir)
+    doc_store.save(tmp_dir)
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"format_version": SNAPSHOT_FORMAT_VERSION, **manifest}, f, ensure_ascii=False)
+
+    final_dir = os.path.join(root, name)
+    os.rename(tmp_dir, final_dir)
+
+    pointer_tmp = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_FILE))
+
+    _prune_old_snapshots(root, current=name)
+    return final_dir
+
+
+def read_snapshot_manifest(root: str | None = None) -> Tuple[str, Dict[str, Any]] | None:
+    """CURRENT 스냅샷의 (경로, manifest) 를 반환한다. 없거나 포맷이 다르면 None."""
+    root = root or get_snapshot_root()
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            path = os.path.join(root, f.read().strip())
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        logger.info(f"[INFO] BM25 스냅샷 포맷 불일치 ({manifest.get('format_version')}) → 무시")
+        return None
+    return path, manifest
+
+
+def load_doc_store(path: str) -> BM25DocStore:
+    return BM25DocStore.load(path)
+
+
+def _prune_old_snapshots(root: str, current: str) -> None:
+    snapshots = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and entry.name.startswith("gen-")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    keep = {current} | {entry.name for entry in snapshots[:KEEP_SNAPSHOTS]}
+    for entry in snapshots:
+        if entry.name not in keep:
+            # 다른 워커가 memmap 으로 열고 있어도 Linux 에서는 inode 가 유지된다
+            shutil.rmtree(entry.path, ignore_errors=True)
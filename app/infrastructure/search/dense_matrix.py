@@ -0,0 +1,334 @@
+"""
+소규모 컬렉션용 인메모리 Dense 인덱스
+
+card_check / korean_word_problems 는 수백 개 벡터뿐이라 ChromaDB(SQLite + HNSW) 쿼리
+오버헤드가 실제 계산보다 크다. 이 컬렉션들은 시작 시 정규화된 float32 행렬 하나로 올려두고
+질의마다 행렬-벡터 곱 한 번 + argpartition 으로 top-k 를 구한다 (여러 질의는 행렬 곱 한 번).
+
+- 결과는 collection.query() 와 같은 형태({"ids": [[...]], "documents": [[...]], ...})로 반환하므로
+  HybridSearchService 의 후처리(가상 질문 치환, de-dup, RRF)는 그대로 사용된다.
+- distance 는 ChromaDB cosine space 와 같은 1 - cos(q, d).
+- IndexingService 가 해당 컬렉션에 upsert/삭제하면 행렬을 다시 만들어 교체한다.
+- 다른 워커가 인덱싱한 변경은 인덱스 세대 번호로 감지한다: load() 시점 세대와 현재 세대가 다르면
+  (DENSE_MATRIX_GENERATION_CHECK_SECONDS 간격으로 확인) 백그라운드로 다시 로드하고,
+  그동안 handles() 가 False 를 돌려 ChromaDB 를 직접 조회한다.
+
+활성화: DENSE_MATRIX_ENABLED=1 (대상 컬렉션은 DENSE_MATRIX_COLLECTIONS 로 변경 가능)
+메모리: DENSE_MATRIX_DTYPE=float16|int8 로 양자화 저장 (quantized_store 참고).
+        DENSE_MATRIX_RESCORE=N 이면 top-k * N 후보를 디스크(memmap)의 float32 원본으로 재채점
+"""
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.infrastructure.search.index_generation import read_index_generation
+from app.infrastructure.search.quantized_store import QUANTIZATION_MODES, QuantizedVectorStore
+from app.infrastructure.search.search_scope import SearchScope
+from app.common.logging.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DENSE_MATRIX_COLLECTIONS = "card_check,korean_word_problems"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _spill_to_memmap(vectors: np.ndarray, directory: str) -> np.ndarray:
+    """float32 원본을 디스크에 쓰고 읽기 전용 memmap 으로 연다 (재채점 전용, 힙 메모리 미사용)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"dense-{uuid.uuid4().hex}.npy")
+    np.save(path, np.ascontiguousarray(vectors, dtype=np.float32))
+    full = np.load(path, mmap_mode="r")
+    try:
+        # 열린 memmap 은 inode 가 유지되므로 파일명만 지워 정리 부담을 없앤다
+        os.unlink(path)
+    except OSError:
+        pass
+    return full
+
+
+class _CollectionMatrix:
+    """한 컬렉션의 불변 스냅샷. 갱신 시 새 객체를 만들어 통째로 교체한다."""
+
+    __slots__ = ("ids", "documents", "metadatas", "store", "row_of", "_scope_rows")
+
+    def __init__(
+        self, ids: List[str], documents: List[str], metadatas: List[Dict], store: QuantizedVectorStore
+    ):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        # 행은 모두 L2 정규화된 상태로 저장 (내적 = 코사인 유사도)
+        self.store = store
+        self.row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+        # 범위 필터 → row 배열 (스냅샷이 불변이므로 교체 전까지 재사용)
+        self._scope_rows: Dict[tuple, np.ndarray] = {}
+
+    def rows_in_scope(self, scope: SearchScope) -> np.ndarray:
+        filters = scope.filters()
+        key = tuple((field, tuple(values)) for field, values in filters.items())
+        rows = self._scope_rows.get(key)
+        if rows is None:
+            rows = np.array(
+                [row for row, meta in enumerate(self.metadatas) if scope.matches(meta)],
+                dtype=np.int64,
+            )
+            self._scope_rows[key] = rows
+        return rows
+
+
+class DenseMatrixIndex:
+    """
+    컬렉션명 → float32 행렬 매핑.
+    읽기는 락 없이 현재 스냅샷 참조만 가져가고, 쓰기는 새 스냅샷을 만든 뒤 교체한다.
+    """
+
+    def __init__(self, collection_names: Sequence[str] | None = None, enabled: bool | None = None):
+        if enabled is None:
+            enabled = os.getenv("DENSE_MATRIX_ENABLED", "0").lower() in ("1", "true", "yes")
+        if collection_names is None:
+            raw = os.getenv("DENSE_MATRIX_COLLECTIONS", DEFAULT_DENSE_MATRIX_COLLECTIONS)
+            collection_names = [name.strip() for name in raw.split(",") if name.strip()]
+
+        self.enabled = enabled
+        self.collection_names = tuple(collection_names)
+
+        self.dtype = os.getenv("DENSE_MATRIX_DTYPE", "float32").lower()
+        if self.dtype not in QUANTIZATION_MODES:
+            logger.warning(f"[WARN] 알 수 없는 DENSE_MATRIX_DTYPE '{self.dtype}' → float32 사용")
+            self.dtype = "float32"
+        self.rescore = int(os.getenv("DENSE_MATRIX_RESCORE", "0"))
+        self.rescore_dir = os.getenv(
+            "DENSE_MATRIX_RESCORE_DIR", os.path.join(tempfile.gettempdir(), "dense_matrix")
+        )
+        self._matrices: Dict[str, _CollectionMatrix] = {}
+        self._write_lock = threading.Lock()
+
+        # 다른 워커의 인덱싱 감지 (load() 시점 세대 번호와 비교)
+        self.generation_check_interval = float(os.getenv("DENSE_MATRIX_GENERATION_CHECK_SECONDS", "1.0"))
+        self._clock = time.monotonic
+        self._vector_db = None
+        self._generation: int | None = None
+        self._checked_at = float("-inf")
+        self._stale = False
+        self._reload_thread: threading.Thread | None = None
+
+    def _keeps_full_precision(self) -> bool:
+        return self.rescore > 1 and self.dtype != "float32"
+
+    def _make_store(self, normalized: np.ndarray) -> QuantizedVectorStore:
+        full = _spill_to_memmap(normalized, self.rescore_dir) if self._keeps_full_precision() else None
+        return QuantizedVectorStore.from_vectors(normalized, self.dtype, full_vectors=full)
+
+    def _make_snapshot(self, ids, documents, metadatas, embeddings) -> _CollectionMatrix:
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        return _CollectionMatrix(ids, documents, metadatas, self._make_store(_normalize_rows(matrix)))
+
+    def memory_usage(self) -> Dict[str, int]:
+        """컬렉션별 벡터 메모리 (bytes, 재채점용 memmap 제외)."""
+        return {name: snapshot.store.nbytes for name, snapshot in self._matrices.items()}
+
+    def handles(self, collection_name: str) -> bool:
+        """이 컬렉션을 행렬 인덱스로 검색할 수 있는지 여부 (다시 로드하는 중이면 False)."""
+        return self.enabled and collection_name in self._matrices and self._is_current()
+
+    def _is_current(self) -> bool:
+        """세대 번호가 load() 때와 같은지 확인한다 (파일 읽기는 check 간격마다 한 번)."""
+        if self._generation is None:
+            return True
+        now = self._clock()
+        if now - self._checked_at >= self.generation_check_interval:
+            self._checked_at = now
+            generation = read_index_generation()
+            if generation != self._generation:
+                if not self._stale:
+                    logger.info(f"[INFO] Dense 행렬 인덱스 stale (generation {self._generation} → {generation})")
+                self._stale = True
+                # 이미 재로드 중이면 무시, 실패했으면 다시 시도
+                self._start_reload()
+        return not self._stale
+
+    def _start_reload(self) -> None:
+        if self._vector_db is None or (self._reload_thread is not None and self._reload_thread.is_alive()):
+            return
+        self._reload_thread = threading.Thread(
+            target=self._reload, name="dense-matrix-reload", daemon=True
+        )
+        self._reload_thread.start()
+
+    def _reload(self) -> None:
+        try:
+            self.load(self._vector_db)
+        except Exception as e:
+            # stale 상태 유지 → 그동안은 ChromaDB 로 검색하고 다음 확인 때 다시 시도
+            logger.warning(f"[WARN] Dense 행렬 인덱스 재로드 실패: {e}")
+
+    def acknowledge_generation(self, generation: int) -> None:
+        """
+        이 워커가 upsert_documents / delete_collection 으로 직접 반영한 뒤 세대 번호를 올렸을 때 호출한다.
+        마지막으로 본 세대에서 한 칸만 올랐으면 (다른 워커의 변경이 없으면) 방금 갱신한 행렬을 버리고 재로드하지 않는다.
+        """
+        if not self._stale and self._generation is not None and generation == self._generation + 1:
+            self._generation = generation
+
+    def load(self, vector_db) -> Dict[str, int]:
+        """ChromaDB 에서 대상 컬렉션 전체를 읽어 행렬을 만든다. 컬렉션별 문서 수를 반환."""
+        if not self.enabled:
+            return {}
+
+        # 읽기 전에 세대를 기록 (로드 중에 바뀐 변경은 다음 확인에서 다시 감지)
+        generation = read_index_generation()
+        loaded = {}
+        for name in self.collection_names:
+            collection = vector_db.get_collection(name)
+            if not collection:
+                continue
+            data = collection.get(include=["embeddings", "documents", "metadatas"])
+            ids = list(data.get("ids") or [])
+            embeddings = data.get("embeddings")
+            if not ids or embeddings is None:
+                with self._write_lock:
+                    self._matrices.pop(name, None)
+                continue
+
+            snapshot = self._make_snapshot(
+                ids,
+                list(data.get("documents") or [""] * len(ids)),
+                [meta or {} for meta in (data.get("metadatas") or [None] * len(ids))],
+                embeddings,
+            )
+            with self._write_lock:
+                self._matrices[name] = snapshot
+            loaded[name] = len(ids)
+
+        self._vector_db = vector_db
+        self._generation = generation
+        self._stale = False
+        logger.info(
+            f"[OK] Dense 행렬 인덱스 로드 ({self.dtype}): {loaded}, "
+            f"{sum(self.memory_usage().values()) / 1024 / 1024:.1f}MB"
+        )
+        return loaded
+
+    def query(
+        self,
+        collection_name: str,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int,
+        scope: SearchScope | None = None,
+    ) -> Dict[str, Any] | None:
+        """
+        collection.query() 와 같은 형태로 질의별 top-n 을 반환한다. 비어 있으면 None.
+        scope 를 주면 ChromaDB where 필터처럼 범위 안의 행만 채점한다.
+        """
+        snapshot = self._matrices.get(collection_name)
+        if snapshot is None or not snapshot.ids:
+            return None
+
+        rows = None
+        if scope is not None and not scope.is_empty():
+            rows = snapshot.rows_in_scope(scope)
+            if not len(rows):
+                return None
+
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        queries = _normalize_rows(queries)
+
+        # (질의 수, 문서 수) 유사도 행렬을 행렬 곱 한 번으로 계산 후 질의별 argpartition
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for top, similarities in snapshot.store.top_k(
+            queries, n_results, rescore=self.rescore, rows=rows
+        ):
+            hits = top.tolist()
+            result["ids"].append([snapshot.ids[row] for row in hits])
+            result["documents"].append([snapshot.documents[row] for row in hits])
+            result["metadatas"].append([snapshot.metadatas[row] for row in hits])
+            result["distances"].append((1.0 - similarities).astype(float).tolist())
+        return result
+
+    def upsert_documents(
+        self,
+        collection_name: str,
+        ids: Sequence[str],
+        embeddings,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict] | None = None,
+    ) -> int:
+        """IndexingService 의 upsert 를 반영한다 (같은 id 는 교체). 반영한 문서 수를 반환."""
+        if not self.enabled or collection_name not in self.collection_names or not ids:
+            return 0
+
+        metadatas = metadatas or [{}] * len(ids)
+        new_vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+
+        with self._write_lock:
+            current = self._matrices.get(collection_name)
+            if current is None:
+                self._matrices[collection_name] = self._make_snapshot(
+                    list(ids), list(documents), [dict(m or {}) for m in metadatas], new_vectors
+                )
+                return len(ids)
+
+            out_ids = list(current.ids)
+            out_docs = list(current.documents)
+            out_metas = list(current.metadatas)
+            appended = []
+            replace_rows, replace_vecs = [], []
+            for i, doc_id in enumerate(ids):
+                row = current.row_of.get(doc_id)
+                if row is None:
+                    out_ids.append(doc_id)
+                    out_docs.append(documents[i])
+                    out_metas.append(dict(metadatas[i] or {}))
+                    appended.append(i)
+                else:
+                    out_docs[row] = documents[i]
+                    out_metas[row] = dict(metadatas[i] or {})
+                    replace_rows.append(row)
+                    replace_vecs.append(i)
+
+            # 기존 행은 다시 양자화하지 않고 코드 그대로 복사한다
+            full = None
+            if self._keeps_full_precision() and current.store.full_vectors is not None:
+                full = np.array(current.store.full_vectors, dtype=np.float32)
+                if replace_rows:
+                    full[replace_rows] = _normalize_rows(new_vectors[replace_vecs])
+                if appended:
+                    full = np.vstack([full, _normalize_rows(new_vectors[appended])])
+                full = _spill_to_memmap(full, self.rescore_dir)
+
+            store = current.store
+            if replace_rows:
+                store = store.replace_rows(
+                    replace_rows, _normalize_rows(new_vectors[replace_vecs]), full_vectors=full
+                )
+            if appended:
+                store = store.append(_normalize_rows(new_vectors[appended]), full_vectors=full)
+
+            self._matrices[collection_name] = _CollectionMatrix(out_ids, out_docs, out_metas, store)
+        return len(ids)
+
+    def delete_collection(self, collection_name: str) -> None:
+        with self._write_lock:
+            self._matrices.pop(collection_name, None)
+
+
+# 전역 인스턴스
+_dense_matrix_index: DenseMatrixIndex | None = None
+
+
+def get_dense_matrix_index() -> DenseMatrixIndex:
+    global _dense_matrix_index
+    if _dense_matrix_index is None:
+        _dense_matrix_index = DenseMatrixIndex()
+    return _dense_matrix_index
@@ -1,5 +1,13 @@
+import asyncio
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from app.infrastructure.search.bm25_retriever import get_bm25_retriever
+from app.infrastructure.search.dense_matrix import get_dense_matrix_index
+from app.infrastructure.search.search_scope import SearchScope
 from app.infrastructure.db.vector.vector_db import get_vector_db
 from app.infrastructure.embedding.embedding_model import get_embedding_model
 from app.infrastructure.loaders.hypothetical_questions_loader import is_question_collection_ready
@@ -10,6 +18,19 @@ logger = get_logger(__name__)
 # RRF 상수: 60이 표준값 (논문 기반)
 RRF_K = 60
 
+BASE_COLLECTIONS = ["korean_word_problems", "card_check", "pdf_documents"]
+QUESTION_COLLECTIONS = ["korean_word_problems_questions", "card_check_questions"]
+
+# Sparse 결합 방식 (HYBRID_FUSION_MODE, 기본 full)
+# - full: 전체 코퍼스 BM25 후 RRF (Dense 후보에 없는 BM25 결과는 최종 단계에서 버려짐)
+# - candidates: Dense 후보군에 대해서만 BM25 재채점 후 RRF. BM25 비용이 코퍼스가 아닌 후보 수에 비례하는 대신
+#   RRF 에 들어가는 BM25 순위가 후보 안에서의 순위라 full 과 순위가 달라질 수 있다
+#   (후보 밖 문서가 BM25 상위를 차지하던 질의에서 후보끼리의 BM25 차이가 과장됨). 재현율 비교 후 켠다
+FUSION_MODES = ("full", "candidates")
+
+# 후보 깊이 상한 (기존 고정값 fetch_n = top_k * 4)
+MAX_DEPTH_FACTOR = 4
+
 
 def _reciprocal_rank_fusion(
     dense_results: List[Dict],
@@ -38,7 +59,12 @@ def _reciprocal_rank_fusion(
         sparse_results
     ):
         scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
-        if doc_id not in doc_store:
+        item = doc_store.get(doc_id)
+        if item is not None and item["document"] is None:
+            # 가상 질문으로 올라온 Dense 결과: BM25 가 가진 원본 본문으로 채운다 (별도 조회 불필요)
+            item["document"] = document
+            item["metadata"] = {**metadata, **item["metadata"]}
+        elif item is None:
             doc_store[doc_id] = {
                 "id": doc_id,
                 "document": document,
@@ -65,73 +91,232 @@ class HybridSearchService:
     RRF 로 두 결과를 합산해 최종 top-k를 반환한다.
     """
 
-    def __init__(self):
-        self.vector_db = get_vector_db()
-        self.embedding_model = get_embedding_model()
-        self.bm25 = get_bm25_retriever()
+    def __init__(self, vector_db=None, embedding_model=None, bm25=None, dense_matrix=None):
+        self.vector_db = vector_db or get_vector_db()
+        self.embedding_model = embedding_model or get_embedding_model()
+        self.bm25 = bm25 or get_bm25_retriever()
+        # 소규모 컬렉션은 인메모리 float32 행렬로 검색 (DENSE_MATRIX_ENABLED)
+        self.dense_matrix = dense_matrix or get_dense_matrix_index()
+        self.fusion_mode = os.getenv("HYBRID_FUSION_MODE", "full").lower()
+        if self.fusion_mode not in FUSION_MODES:
+            logger.warning(f"[WARN] 알 수 없는 HYBRID_FUSION_MODE '{self.fusion_mode}' → full 사용")
+            self.fusion_mode = "full"
+
+        # 컬렉션별 Dense 쿼리는 전용 스레드풀에서 동시에 실행 (ChromaDB 쿼리는 동기 호출)
+        self.max_workers = int(os.getenv("HYBRID_SEARCH_MAX_WORKERS", "8"))
+        self.collection_timeout = float(os.getenv("HYBRID_SEARCH_COLLECTION_TIMEOUT", "2.0"))
+
+        # 적응형 후보 깊이: top_k * 초기 배수로 먼저 조회하고, 순위 간 거리 차이로 보아
+        # top-k 가 아직 확정되지 않았을 때만 top_k * MAX_DEPTH_FACTOR 로 넓혀 다시 조회
+        self.adaptive_depth = os.getenv("HYBRID_ADAPTIVE_DEPTH", "1").lower() in ("1", "true", "yes")
+        self.initial_depth_factor = float(os.getenv("HYBRID_INITIAL_DEPTH_FACTOR", "2"))
+        self.depth_gap = float(os.getenv("HYBRID_DEPTH_GAP", "0.05"))
+
+        # collection_name 없이 검색할 때의 대상 컬렉션 (평가 하네스에서 구성별로 바꿔 측정)
+        self.collections = BASE_COLLECTIONS + QUESTION_COLLECTIONS
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="hybrid-dense"
+        )
 
-    async def search(
+        # 타임아웃/실패로 스킵된 컬렉션 집계 (컬렉션명 → 횟수)
+        # widened: 후보 깊이를 넓혀 재조회한 컬렉션
+        # depths: 컬렉션별 최종 사용 깊이 분포 ("컬렉션명:깊이" → 횟수, MAX_DEPTH_FACTOR 조정용)
+        self.metrics: Dict[str, Counter] = {
+            "timeouts": Counter(),
+            "errors": Counter(),
+            "widened": Counter(),
+            "depths": Counter(),
+        }
+
+    def close(self) -> None:
+        """전용 스레드풀 종료 (구성별로 서비스를 만드는 평가 하네스/벤치마크, 앱 종료 시)."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _query_collection(
         self,
-        query: str,
-        collection_name: str | None = None,
-        top_k: int = 5,
-    ) -> List[Dict[str, Any]]:
+        coll_name: str,
+        query_embeddings: List[List[float]],
+        fetch_n: int,
+        scope: SearchScope | None = None,
+    ) -> Dict[str, Any] | None:
+        """단일 컬렉션 Dense 쿼리 (스레드풀에서 실행). 질의 여러 개를 한 번에 보낸다. 비어 있으면 None."""
+        collection = self.vector_db.get_collection(coll_name)
+        if not collection:
+            return None
+
+        count = collection.count()
+        if count == 0:
+            return None
+
+        kwargs = {}
+        where = scope.to_where() if scope is not None else None
+        if where:
+            # 범위 필터는 ChromaDB 검색 단계에서 적용 (top-N 을 가져온 뒤 거르지 않음)
+            kwargs["where"] = where
+
+        # 가상 질문 컬렉션은 질문 본문이 필요 없으므로 응답에서 뺀다 (원본 참조만 사용)
+        if coll_name.endswith("_questions"):
+            include = ["metadatas", "distances"]
+        else:
+            include = ["documents", "metadatas", "distances"]
+
+        return collection.query(
+            query_embeddings=query_embeddings,
+            n_results=min(fetch_n, count),
+            include=include,
+            **kwargs,
+        )
+
+    async def _query_collection_with_timeout(
+        self,
+        coll_name: str,
+        query_embeddings: List[List[float]],
+        fetch_n: int,
+        scope: SearchScope | None = None,
+        degraded: List[str] | None = None,
+    ) -> Dict[str, Any] | None:
         """
-        하이브리드 검색 수행.
+        타임아웃/예외 발생 시 해당 컬렉션만 스킵하고 metrics에 기록한다 (degraded 를 주면 사유도 추가).
+        행렬 인덱스 컬렉션도 같은 스레드풀과 타임아웃을 거친다 (큰 행렬 스캔이 이벤트 루프를 막지 않도록).
+        """
+        if self.dense_matrix.handles(coll_name):
+            query_fn = self.dense_matrix.query
+        else:
+            query_fn = self._query_collection
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    self.executor,
+                    query_fn,
+                    coll_name,
+                    query_embeddings,
+                    fetch_n,
+                    scope.for_collection(coll_name) if scope is not None else None,
+                ),
+                timeout=self.collection_timeout,
+            )
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"][coll_name] += 1
+            logger.warning(
+                f"[WARN] [{coll_name}] 검색 타임아웃 ({self.collection_timeout}s) → 스킵"
+            )
+            if degraded is not None:
+                degraded.append(f"timeout:{coll_name}")
+        except Exception as e:
+            self.metrics["errors"][coll_name] += 1
+            logger.warning(f"[WARN] [{coll_name}] 검색 실패 (스킵): {e}")
+            if degraded is not None:
+                degraded.append(f"error:{coll_name}")
+        return None
+
+    def _depth_range(self, top_k: int) -> tuple[int, int]:
+        """(초기 깊이, 최대 깊이)"""
+        max_depth = top_k * MAX_DEPTH_FACTOR
+        if not self.adaptive_depth:
+            return max_depth, max_depth
+        initial = math.ceil(top_k * self.initial_depth_factor)
+        return min(max(initial, top_k), max_depth), max_depth
+
+    def _is_settled(self, coll_name: str, res: Dict[str, Any], depth: int, top_k: int) -> bool:
+        """
+        모든 질의에 대해 이 깊이로 top-k 가 확정되었는지 판단한다.
 
-        Returns:
-            [{"id", "document", "collection", "distance", "rrf_score"}, ...]
+        - 결과가 depth 보다 적으면 컬렉션을 다 본 것
+        - 마지막 후보가 k 번째 후보보다 depth_gap 이상 멀면, 더 깊은 후보는 그보다도 멀다
+        - 가상 질문 컬렉션은 원본 문서 기준으로 k 개가 모여야 한다
         """
-        fetch_n = top_k * 4  # 후보군을 넉넉히 가져와 RRF 적용
+        is_question_coll = coll_name.endswith("_questions")
+        for ids, metas, dists in zip(res["ids"], res["metadatas"], res["distances"]):
+            if len(dists) < depth:
+                continue
 
-        # ── Dense 검색 ──────────────────────────────────────────────
-        query_embedding = await self.embedding_model.get_embedding(query)
+            if is_question_coll:
+                kth, seen = None, set()
+                for doc_id, meta, dist in zip(ids, metas, dists):
+                    seen.add((meta or {}).get("original_id", doc_id))
+                    if len(seen) == top_k:
+                        kth = dist
+                        break
+                if kth is None:
+                    return False
+            else:
+                kth = dists[min(top_k, len(dists)) - 1]
+
+            if dists[-1] - kth < self.depth_gap:
+                return False
+        return True
+
+    async def _query_collection_adaptive(
+        self,
+        coll_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        scope: SearchScope | None = None,
+        degraded: List[str] | None = None,
+    ) -> tuple[Dict[str, Any] | None, int]:
+        """초기 깊이로 조회 후 필요할 때만 최대 깊이로 재조회한다. (응답, 사용한 깊이)"""
+        depth, max_depth = self._depth_range(top_k)
+        res = await self._query_collection_with_timeout(
+            coll_name, query_embeddings, depth, scope, degraded
+        )
+        if res is None or depth >= max_depth or self._is_settled(coll_name, res, depth, top_k):
+            return res, depth
 
-        BASE_COLLECTIONS = ["korean_word_problems", "card_check", "pdf_documents"]
-        QUESTION_COLLECTIONS = ["korean_word_problems_questions", "card_check_questions"]
+        self.metrics["widened"][coll_name] += 1
+        widened = await self._query_collection_with_timeout(
+            coll_name, query_embeddings, max_depth, scope, degraded
+        )
+        if widened is None:
+            # 재조회 실패 시 초기 깊이 결과라도 사용
+            return res, depth
+        return widened, max_depth
 
+    def _target_collections(self, collection_name: str | None) -> List[str]:
         if collection_name:
             collections = [collection_name, f"{collection_name}_questions"]
         else:
-            collections = BASE_COLLECTIONS + QUESTION_COLLECTIONS
+            collections = self.collections
 
-        dense_results: List[Dict] = []
+        # 가상 질문 컬렉션은 생성 완료 전까지 스킵
+        targets = []
         for coll_name in collections:
-            # 가상 질문 컬렉션은 생성 완료 전까지 스킵
             if coll_name.endswith("_questions") and not is_question_collection_ready(coll_name):
                 logger.info(f"[WAIT] [{coll_name}] 아직 생성 중 → 이번 검색에서 제외")
                 continue
-
-            try:
-                collection = self.vector_db.get_collection(coll_name)
-                if not collection or collection.count() == 0:
-                    continue
-
-                n = min(fetch_n, collection.count())
-                res = collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=n,
-                    include=["documents", "metadatas", "distances"],
-                )
-            except Exception as e:
-                logger.warning(f"[WARN] [{coll_name}] 검색 실패 (스킵): {e}")
+            targets.append(coll_name)
+        return targets
+
+    @staticmethod
+    def _collect_dense_results(
+        targets: List[str], responses: List[Dict[str, Any] | None], row: int
+    ) -> List[Dict]:
+        """컬렉션별 응답에서 row 번째 질의의 결과만 모아 de-dup/정렬한다."""
+        dense_results: List[Dict] = []
+        for coll_name, res in zip(targets, responses):
+            if res is None:
                 continue
 
             is_question_coll = coll_name.endswith("_questions")
 
+            ids = res["ids"][row]
+            documents = res["documents"][row] if res.get("documents") else [None] * len(ids)
             for doc_id, doc, meta, dist in zip(
-                res["ids"][0],
-                res["documents"][0],
-                res["metadatas"][0],
-                res["distances"][0],
+                ids,
+                documents,
+                res["metadatas"][row],
+                res["distances"][row],
             ):
                 meta = meta or {}
                 # 가상 질문 컬렉션: 원본 문서로 교체하되 원본 컬렉션명으로 표기
-                if is_question_coll and meta.get("original_text"):
-                    effective_doc = meta["original_text"]
+                if is_question_coll and meta.get("original_id"):
+                    # 본문은 de-dup/RRF 이후 _resolve_question_sources 에서 일괄 조회
+                    # (구버전 행은 original_text 를 그대로 사용)
+                    effective_doc = meta.get("original_text")
                     effective_coll = meta.get("collection", coll_name.replace("_questions", ""))
                     # 원본 doc_id로 de-dup (같은 원본이 여러 질문으로 올라올 수 있음)
-                    effective_id = meta.get("original_id", doc_id)
+                    effective_id = meta["original_id"]
                 else:
                     effective_doc = doc
                     effective_coll = coll_name
@@ -157,25 +342,196 @@ class HybridSearchService:
 
         # 코사인 거리 기준 정렬 (낮을수록 유사)
         dense_results.sort(key=lambda x: x["distance"])
+        return dense_results
+
+    def _fetch_sources_from_chroma(self, ids_by_collection: Dict[str, List[str]]) -> Dict[str, tuple]:
+        """BM25 문서 테이블에 없는 원본을 컬렉션별 get 한 번씩으로 조회한다."""
+        found = {}
+        for coll_name, ids in ids_by_collection.items():
+            collection = self.vector_db.get_collection(coll_name)
+            if not collection:
+                continue
+            res = collection.get(ids=ids, include=["documents", "metadatas"])
+            for doc_id, doc, meta in zip(res["ids"], res["documents"], res["metadatas"]):
+                found[doc_id] = (doc, meta or {})
+        return found
+
+    async def _resolve_question_sources(
+        self, finals: List[List[Dict[str, Any]]], degraded: List[str] | None = None
+    ) -> None:
+        """
+        가상 질문으로 올라온 결과의 원본 본문/메타데이터를 채운다 (모든 질의의 최종 결과를 모아 한 번에).
+        원본이 삭제되었거나 조회에 실패해 찾을 수 없는 결과는 제거한다 (degraded 를 주면 사유도 추가).
+        """
+        pending = {
+            item["id"]: item["collection"]
+            for final in finals
+            for item in final
+            if item["document"] is None
+        }
+        if not pending:
+            return
+
+        found = self.bm25.get_documents(list(pending))
+        missing: Dict[str, List[str]] = {}
+        for doc_id, coll_name in pending.items():
+            if doc_id not in found:
+                missing.setdefault(coll_name, []).append(doc_id)
+        if missing:
+            loop = asyncio.get_running_loop()
+            try:
+                found.update(
+                    await asyncio.wait_for(
+                        loop.run_in_executor(
+                            self.executor, self._fetch_sources_from_chroma, missing
+                        ),
+                        timeout=self.collection_timeout,
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"[WARN] 가상 질문 원본 조회 실패: {e}")
+
+        for final in finals:
+            resolved = []
+            for item in final:
+                if item["document"] is None:
+                    if item["id"] not in found:
+                        if degraded is not None:
+                            degraded.append(f"unresolved:{item['id']}")
+                        continue
+                    document, source_meta = found[item["id"]]
+                    item["document"] = document
+                    item["metadata"] = {**source_meta, **item["metadata"]}
+                resolved.append(item)
+            final[:] = resolved
+
+    def _fuse(
+        self,
+        query: str,
+        dense_results: List[Dict],
+        collection_name: str | None,
+        top_k: int,
+        fetch_n: int,
+        mode: str,
+        scope: SearchScope | None = None,
+    ) -> tuple[List[Dict[str, Any]], List[tuple]]:
+        """BM25 결과와 RRF 결합 후 (최종 결과, sparse 결과) 를 반환한다."""
+        if mode == "candidates":
+            # Dense 후보군만 재채점 → collection/범위 필터는 Dense 단계에서 이미 적용됨
+            # (BM25 순위가 후보 안에서의 순위라 full 모드와 최종 순서가 다를 수 있다)
+            sparse_results = self.bm25.score_candidates(
+                query, [item["id"] for item in dense_results]
+            )
+        else:
+            # collection/범위 필터는 BM25 샤드·row 단위로 적용 (top-N 을 자른 뒤 거르지 않음)
+            sparse_results = self.bm25.search(
+                query,
+                n_results=fetch_n,
+                collection_names=[collection_name] if collection_name else None,
+                scope=scope,
+            )
 
-        # ── Sparse (BM25) 검색 ─────────────────────────────────────
-        sparse_results = self.bm25.search(query, n_results=fetch_n)
-
-        # collection 필터 적용
-        if collection_name:
-            sparse_results = [r for r in sparse_results if r[2] == collection_name]
-
-        # ── RRF 결합 ───────────────────────────────────────────────
         final = _reciprocal_rank_fusion(dense_results, sparse_results, top_k * 2)
 
         # BM25만으로 올라온 결과(cosine=1.0 → 유사도 0) 제거
         # distance=1.0은 _reciprocal_rank_fusion에서 BM25 전용 문서에 부여한 기본값
         dense_ids = {item["id"] for item in dense_results}
         final = [item for item in final if item["id"] in dense_ids][:top_k]
+        return final, sparse_results
+
+    async def _search_embedded(
+        self,
+        queries: List[str],
+        query_embeddings: List[List[float]],
+        collection_name: str | None,
+        top_k: int,
+        mode: str,
+        scope: SearchScope | None = None,
+        timings: Dict[str, float] | None = None,
+        degraded: List[str] | None = None,
+    ) -> tuple[List[tuple[List[Dict[str, Any]], List[Dict], List[tuple]]], Dict[str, int]]:
+        """
+        임베딩이 끝난 질의들을 컬렉션별 1회 쿼리로 검색한다 (깊이를 넓힐 때만 1회 추가).
+        ([질의별 (final, dense, sparse)], 컬렉션별 사용한 후보 깊이) 를 반환한다.
+        timings 를 주면 단계별 소요 시간(초)을 dense / fusion / resolve 키로 기록한다.
+        degraded 를 주면 결과가 불완전해진 사유 (건너뛴 컬렉션, 찾지 못한 원본) 를 추가한다.
+        """
+        timings = timings if timings is not None else {}
+        started = time.perf_counter()
+        targets = self._target_collections(collection_name)
+
+        # 컬렉션별 쿼리를 동시에 실행 → 지연 시간은 가장 느린 컬렉션 기준 (타임아웃 상한)
+        answered = await asyncio.gather(
+            *(
+                self._query_collection_adaptive(
+                    coll_name, query_embeddings, top_k, scope, degraded
+                )
+                for coll_name in targets
+            )
+        )
+        responses = [res for res, _ in answered]
+        depths = {coll_name: used for coll_name, (_, used) in zip(targets, answered)}
+        for coll_name, used in depths.items():
+            self.metrics["depths"][f"{coll_name}:{used}"] += 1
+
+        # BM25 후보 수도 Dense 에서 실제로 쓴 (가장 깊은) 깊이에 맞춘다
+        depth = max(depths.values(), default=self._depth_range(top_k)[0])
+        dense_done = time.perf_counter()
+        timings["dense"] = dense_done - started
+
+        outputs = []
+        for row, query in enumerate(queries):
+            dense_results = self._collect_dense_results(targets, responses, row)
+            final, sparse_results = self._fuse(
+                query, dense_results, collection_name, top_k, depth, mode, scope
+            )
+            outputs.append((final, dense_results, sparse_results))
+
+        fusion_done = time.perf_counter()
+        timings["fusion"] = fusion_done - dense_done
+
+        # 원본 본문은 최종 결과에 남은 것만 조회
+        await self._resolve_question_sources([final for final, _, _ in outputs], degraded)
+        timings["resolve"] = time.perf_counter() - fusion_done
+        return outputs, depths
+
+    async def search(
+        self,
+        query: str,
+        collection_name: str | None = None,
+        top_k: int = 5,
+        fusion_mode: str | None = None,
+        scope: SearchScope | None = None,
+        timings: Dict[str, float] | None = None,
+        degraded: List[str] | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        하이브리드 검색 수행.
+
+        Args:
+            fusion_mode: "full" 또는 "candidates" (None이면 HYBRID_FUSION_MODE 설정값)
+            scope: 차시/개념/문서 유형 범위 (ChromaDB where + BM25 row 필터). None이면 전체
+            timings: 주면 단계별 소요 시간(초)을 embed / dense / fusion / resolve 키로 채운다
+            degraded: 주면 결과가 불완전해진 사유를 채운다 ("timeout:<컬렉션>", "error:<컬렉션>",
+                      "unresolved:<doc_id>"). 비어 있지 않으면 결과를 캐시하면 안 된다
+
+        Returns:
+            [{"id", "document", "collection", "distance", "rrf_score"}, ...]
+        """
+        mode = fusion_mode or self.fusion_mode
+        timings = timings if timings is not None else {}
+        started = time.perf_counter()
+        query_embedding = await self.embedding_model.get_embedding(query)
+        timings["embed"] = time.perf_counter() - started
+
+        [(final, dense_results, sparse_results)], depths = await self._search_embedded(
+            [query], [query_embedding], collection_name, top_k, mode, scope, timings, degraded
+        )
 
         # 로그
+        scope_label = f", scope={scope.filters()}" if scope is not None and not scope.is_empty() else ""
         logger.info(
-            f"[HYBRID] 하이브리드 검색 완료: dense={len(dense_results)}개, "
+            f"[HYBRID] 하이브리드 검색 완료 ({mode}, depths={depths}{scope_label}): dense={len(dense_results)}개, "
             f"sparse={len(sparse_results)}개 → 최종 {len(final)}개"
         )
         for i, item in enumerate(final):
@@ -188,6 +544,38 @@ class HybridSearchService:
 
         return final
 
+    async def search_many(
+        self,
+        queries: List[str],
+        collection_name: str | None = None,
+        top_k: int = 5,
+        fusion_mode: str | None = None,
+        scope: SearchScope | None = None,
+        degraded: List[str] | None = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 질의를 한 번에 검색한다 (평가, FAQ 사전 계산, 가상 질문 점검용).
+
+        임베딩은 get_embeddings 한 번, 컬렉션별 ChromaDB 쿼리도 한 번 (query_embeddings 일괄 전달).
+        결과는 입력 순서대로 search() 와 같은 형태의 리스트를 반환한다.
+        scope 는 모든 질의에 같이 적용된다. degraded 는 search() 와 같다 (질의 전체에 대해 한 목록).
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+
+        mode = fusion_mode or self.fusion_mode
+        query_embeddings = await self.embedding_model.get_embeddings(queries, cache_queries=True)
+
+        outputs, depths = await self._search_embedded(
+            queries, query_embeddings, collection_name, top_k, mode, scope, degraded=degraded
+        )
+        logger.info(
+            f"[HYBRID] 일괄 검색 완료 ({mode}, depths={depths}): {len(queries)}개 질의, "
+            f"평균 최종 {sum(len(final) for final, _, _ in outputs) / len(queries):.1f}개"
+        )
+        return [final for final, _, _ in outputs]
+
 
 # 전역 인스턴스
 _hybrid_service: HybridSearchService | None = None
@@ -198,3 +586,11 @@ def get_hybrid_search_service() -> HybridSearchService:
     if _hybrid_service is None:
         _hybrid_service = HybridSearchService()
     return _hybrid_service
+
+
+def close_hybrid_search_service() -> None:
+    """전역 인스턴스가 있으면 스레드풀을 정리한다 (앱 종료 시)."""
+    global _hybrid_service
+    if _hybrid_service is not None:
+        _hybrid_service.close()
+        _hybrid_service = None
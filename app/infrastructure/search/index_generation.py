@@ -0,0 +1,69 @@
+"""
+검색 인덱스 세대(generation) 번호
+
+IndexingService 가 ChromaDB 컬렉션을 변경할 때마다 세대 번호를 올린다.
+워커 간 공유를 위해 파일에 저장한다.
+
+- 인덱스 세대: 검색 결과가 달라질 수 있는 모든 변경 (검색 결과 캐시, Dense 행렬 인덱스가 사용)
+- BM25 세대: BM25 대상 컬렉션(card_check, korean_word_problems, pdf_documents) 변경만 (BM25 스냅샷이 사용)
+  가상 질문 컬렉션처럼 BM25 에 없는 컬렉션만 바뀌었을 때 스냅샷을 다시 만들지 않도록 따로 둔다
+"""
+
+import os
+
+from app.common.logging.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_GENERATION_FILE = "./chroma_db/.index_generation"
+
+
+def get_generation_path() -> str:
+    """세대 번호 파일 경로를 반환합니다."""
+    return os.getenv("INDEX_GENERATION_FILE", DEFAULT_GENERATION_FILE)
+
+
+def get_bm25_generation_path() -> str:
+    """BM25 세대 번호 파일 경로 (인덱스 세대 파일 옆)."""
+    return f"{get_generation_path()}.bm25"
+
+
+def _read(path: str) -> int:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _bump(path: str) -> int:
+    generation = _read(path) + 1
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(generation))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"[WARN] 인덱스 세대 번호 기록 실패: {e}")
+    return generation
+
+
+def read_index_generation() -> int:
+    """현재 세대 번호 (파일이 없으면 0)."""
+    return _read(get_generation_path())
+
+
+def read_bm25_generation() -> int:
+    """현재 BM25 세대 번호 (파일이 없으면 0)."""
+    return _read(get_bm25_generation_path())
+
+
+def bump_index_generation(affects_bm25: bool = True) -> int:
+    """
+    세대 번호를 1 올리고 새 번호를 반환합니다.
+    affects_bm25=False 면 BM25 세대는 그대로 둔다 (BM25 대상이 아닌 컬렉션만 바뀐 경우).
+    """
+    if affects_bm25:
+        _bump(get_bm25_generation_path())
+    return _bump(get_generation_path())
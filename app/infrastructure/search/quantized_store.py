@@ -0,0 +1,176 @@
+"""
+양자화 벡터 저장소
+
+임베딩을 float32 대신 float16 또는 int8(벡터별 scale) 로 보관해 워커당 벡터 메모리를 줄인다.
+- float32: 그대로 (기준값)
+- float16: 2 bytes/dim, 코사인 오차 ~1e-3
+- int8:    1 bytes/dim + 벡터당 float32 scale 1개. x ≈ code * scale, scale = max|x| / 127
+
+내적은 청크 단위로 float32 로 풀어서 계산하므로 질의 시 임시 메모리는 CHUNK_ROWS 행 분량뿐이다.
+full_vectors(예: 디스크의 float32 memmap)를 주면 top-k 후보 k * rescore 개를 원래 정밀도로 재채점한다.
+
+저장소는 불변으로 다루며 replace_rows / append 는 새 저장소를 반환한다 (스냅샷 교체용).
+
+encode_vector / decode_vector 는 벡터 하나를 같은 방식으로 bytes 로 직렬화한다 (임베딩 캐시 저장 형식).
+- int8 은 float32 scale 4 bytes 뒤에 code dim bytes
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+QUANTIZATION_MODES = ("float32", "float16", "int8")
+CHUNK_ROWS = 4096
+INT8_MAX = 127
+
+
+def _quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, np.ndarray | None]:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if mode == "float32":
+        return np.ascontiguousarray(vectors), None
+    if mode == "float16":
+        return vectors.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / INT8_MAX if len(vectors) else np.zeros(0, np.float32)
+        scales = scales.astype(np.float32)
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).clip(-INT8_MAX, INT8_MAX).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"지원하지 않는 양자화 모드: {mode} (가능: {QUANTIZATION_MODES})")
+
+
+def encode_vector(vector, mode: str = "float32") -> bytes:
+    """벡터 하나를 mode 로 양자화한 bytes."""
+    codes, scales = _quantize(np.asarray(vector, dtype=np.float32).reshape(1, -1), mode)
+    if scales is None:
+        return codes.tobytes()
+    return scales.tobytes() + codes.tobytes()
+
+
+def decode_vector(payload: bytes, mode: str = "float32") -> np.ndarray:
+    """encode_vector 의 역변환 (float32 1차원 배열)."""
+    if mode == "float32":
+        return np.frombuffer(payload, dtype=np.float32).copy()
+    if mode == "float16":
+        return np.frombuffer(payload, dtype=np.float16).astype(np.float32)
+    if mode == "int8":
+        scale = np.frombuffer(payload, dtype=np.float32, count=1)[0]
+        return np.frombuffer(payload, dtype=np.int8, offset=4).astype(np.float32) * scale
+    raise ValueError(f"지원하지 않는 양자화 모드: {mode} (가능: {QUANTIZATION_MODES})")
+
+
+class QuantizedVectorStore:
+    """행 번호로 접근하는 (n, dim) 양자화 벡터 배열."""
+
+    __slots__ = ("codes", "scales", "mode", "full_vectors")
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray | None, mode: str, full_vectors=None):
+        self.codes = codes
+        self.scales = scales
+        self.mode = mode
+        # 재채점용 원본 정밀도 벡터 (np.memmap 등). 없으면 재채점하지 않는다.
+        self.full_vectors = full_vectors
+
+    @classmethod
+    def from_vectors(cls, vectors, mode: str = "int8", full_vectors=None) -> "QuantizedVectorStore":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(0 if vectors.size == 0 else 1, -1)
+        codes, scales = _quantize(vectors, mode)
+        return cls(codes, scales, mode, full_vectors)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1] if self.codes.ndim == 2 else 0
+
+    @property
+    def nbytes(self) -> int:
+        """양자화 벡터가 차지하는 메모리 (full_vectors 제외)."""
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def dequantize(self, rows: Sequence[int] | np.ndarray | None = None) -> np.ndarray:
+        """float32 로 복원한다 (rows 가 None 이면 전체)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        vectors = codes.astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales if rows is None else self.scales[rows]
+            vectors *= scales[:, None]
+        return vectors
+
+    def scores(self, queries, rows: np.ndarray | None = None) -> np.ndarray:
+        """(질의 수, n) 내적 행렬. 양자화된 값 기준의 근사치. rows 를 주면 (질의 수, len(rows))."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        if self.mode == "float32":
+            return queries @ (self.codes if rows is None else self.codes[rows]).T
+
+        n = len(self) if rows is None else len(rows)
+        out = np.empty((len(queries), n), dtype=np.float32)
+        for start in range(0, n, CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, n)
+            chunk = np.arange(start, end) if rows is None else rows[start:end]
+            out[:, start:end] = queries @ self.dequantize(chunk).T
+        return out
+
+    def top_k(
+        self, queries, k: int, rescore: int = 0, rows: Sequence[int] | np.ndarray | None = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        질의별 (행 번호, 내적) 을 내적 내림차순으로 반환한다.
+
+        rescore > 1 이고 full_vectors 가 있으면 k * rescore 개 후보를 원래 정밀도로 다시 계산해 k 개를 고른다.
+        rows 를 주면 그 행들만 채점한다 (범위 검색).
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        candidates = None if rows is None else np.unique(np.asarray(rows, dtype=np.int64))
+        n = len(self) if candidates is None else len(candidates)
+        k = min(k, n)
+        if k == 0:
+            return [(np.zeros(0, np.int64), np.zeros(0, np.float32)) for _ in queries]
+
+        use_rescore = rescore > 1 and self.full_vectors is not None and self.mode != "float32"
+        depth = min(n, k * rescore) if use_rescore else k
+
+        results = []
+        for query, row_scores in zip(queries, self.scores(queries, candidates)):
+            # top 은 후보 공간(candidates 기준) 위치
+            if depth < n:
+                top = np.argpartition(-row_scores, depth - 1)[:depth]
+            else:
+                top = np.arange(n)
+
+            if use_rescore:
+                top.sort()  # memmap 을 순서대로 읽도록
+                ids = top if candidates is None else candidates[top]
+                row_scores = np.asarray(self.full_vectors[ids], dtype=np.float32) @ query
+                order = np.argsort(-row_scores, kind="stable")[:k]
+                results.append((ids[order], row_scores[order]))
+            else:
+                order = top[np.argsort(-row_scores[top], kind="stable")][:k]
+                ids = order if candidates is None else candidates[order]
+                results.append((ids, row_scores[order]))
+        return results
+
+    def replace_rows(self, rows: Sequence[int], vectors, full_vectors=None) -> "QuantizedVectorStore":
+        """rows 위치를 새 벡터로 교체한 새 저장소."""
+        codes, scales = _quantize(np.asarray(vectors, dtype=np.float32).reshape(len(rows), -1), self.mode)
+        out_codes = self.codes.copy()
+        out_codes[list(rows)] = codes
+        out_scales = None
+        if self.scales is not None:
+            out_scales = self.scales.copy()
+            out_scales[list(rows)] = scales
+        return QuantizedVectorStore(out_codes, out_scales, self.mode, full_vectors)
+
+    def append(self, vectors, full_vectors=None) -> "QuantizedVectorStore":
+        """뒤에 벡터를 이어 붙인 새 저장소."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        codes, scales = _quantize(vectors, self.mode)
+        out_scales = None
+        if self.scales is not None:
+            out_scales = np.concatenate([self.scales, scales])
+        return QuantizedVectorStore(
+            np.concatenate([self.codes, codes]), out_scales, self.mode, full_vectors
+        )
@@ -0,0 +1,158 @@
+"""
+검색 품질 / 지연 평가 하네스
+
+라벨링된 한국어 질의 세트를 HybridSearchService.search 로 실행해 구성(fusion 방식, 후보 깊이,
+검색 컬렉션 등)별로 recall@k, MRR, 단계별 p50/p95 지연을 측정한다.
+결과는 JSON 으로 저장해 구성끼리 (또는 커밋 전후로) 나란히 비교한다.
+
+질의 라벨 (eval_data/retrieval_queries.json):
+    {"query": "되랑 돼 차이가 뭐야?", "concept_keys": ["되/돼"], "ids": ["lesson_4_q2"]}
+- ids: 정답 문서 id
+- concept_keys: 결과 메타데이터의 concept_key 가 일치하면 정답 (문서 id 가 인덱싱 순서에 따라 바뀌는 카드 등)
+recall@k 는 라벨 항목(id 와 개념) 중 top-k 안에서 찾은 비율, MRR 은 첫 정답 순위의 역수.
+
+실행은 scripts/evaluate_retrieval.py 참고.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+DEFAULT_QUERIES_PATH = os.path.join(os.path.dirname(__file__), "eval_data", "retrieval_queries.json")
+STAGES = ("embed", "dense", "fusion", "resolve", "total")
+
+# 구성별로 바꿀 수 있는 HybridSearchService 속성
+SERVICE_OVERRIDES = ("adaptive_depth", "initial_depth_factor", "depth_gap", "collections")
+
+DEFAULT_CONFIGS: List[Dict[str, Any]] = [
+    {"name": "full", "fusion_mode": "full"},
+    {"name": "candidates", "fusion_mode": "candidates"},
+    {"name": "full-fixed-depth", "fusion_mode": "full", "adaptive_depth": False},
+    {
+        "name": "full-base-only",
+        "fusion_mode": "full",
+        "collections": ["korean_word_problems", "card_check", "pdf_documents"],
+    },
+]
+
+
+def load_queries(path: str | None = None) -> List[Dict[str, Any]]:
+    with open(path or DEFAULT_QUERIES_PATH, encoding="utf-8") as f:
+        queries = json.load(f)
+    for item in queries:
+        if not item.get("ids") and not item.get("concept_keys"):
+            raise ValueError(f"라벨 없는 질의: {item.get('query')}")
+    return queries
+
+
+def _matched_labels(result: Dict[str, Any], label: Dict[str, Any]) -> set:
+    matched = set()
+    if result.get("id") in set(label.get("ids") or []):
+        matched.add(("id", result["id"]))
+    concept_key = (result.get("metadata") or {}).get("concept_key")
+    if concept_key and concept_key in set(label.get("concept_keys") or []):
+        matched.add(("concept", concept_key))
+    return matched
+
+
+def score_results(results: Sequence[Dict[str, Any]], label: Dict[str, Any], k: int) -> Dict[str, float]:
+    """한 질의의 recall@k 와 reciprocal rank."""
+    targets = {("id", doc_id) for doc_id in label.get("ids") or []}
+    targets |= {("concept", key) for key in label.get("concept_keys") or []}
+
+    found, reciprocal_rank = set(), 0.0
+    for rank, result in enumerate(results[:k], 1):
+        matched = _matched_labels(result, label)
+        if matched and not reciprocal_rank:
+            reciprocal_rank = 1.0 / rank
+        found |= matched
+    return {"recall": len(found & targets) / len(targets), "rr": reciprocal_rank}
+
+
+def latency_summary(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """단계별 p50 / p95 (ms)."""
+    summary = {}
+    for stage in STAGES:
+        values = samples.get(stage)
+        if not values:
+            continue
+        ms = np.asarray(values) * 1000
+        summary[stage] = {
+            "p50": round(float(np.percentile(ms, 50)), 3),
+            "p95": round(float(np.percentile(ms, 95)), 3),
+        }
+    return summary
+
+
+def apply_config(service, config: Dict[str, Any]) -> None:
+    for name in SERVICE_OVERRIDES:
+        if name in config:
+            value = config[name]
+            setattr(service, name, list(value) if name == "collections" else value)
+
+
+def _clear_query_cache(service) -> None:
+    query_cache = getattr(getattr(service, "embedding_model", None), "query_cache", None)
+    if query_cache is not None:
+        query_cache.clear()
+
+
+async def evaluate_config(
+    service,
+    queries: Sequence[Dict[str, Any]],
+    config: Dict[str, Any],
+    k: int = 5,
+    warmup: int = 1,
+) -> Dict[str, Any]:
+    """
+    service 에 구성을 적용하고 질의 세트를 순서대로 실행한다.
+    warmup 개 질의는 먼저 한 번 실행해 지연 통계에서 제외한다 (모델/캐시 예열).
+    측정 전에 질의 임베딩 LRU 를 비운다 — 예열이나 앞 구성에서 임베딩한 질의가 LRU 에 맞으면
+    embed 단계가 구성마다 다르게 0 에 가까워진다.
+    """
+    apply_config(service, config)
+    top_k = config.get("top_k", k)
+    search_kwargs = {
+        "collection_name": config.get("collection_name"),
+        "top_k": top_k,
+        "fusion_mode": config.get("fusion_mode"),
+    }
+
+    for item in queries[:warmup]:
+        await service.search(item["query"], **search_kwargs)
+    _clear_query_cache(service)
+
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    per_query = []
+    for item in queries:
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        results = await service.search(item["query"], timings=timings, **search_kwargs)
+        timings["total"] = time.perf_counter() - started
+        for stage, seconds in timings.items():
+            samples.setdefault(stage, []).append(seconds)
+
+        scores = score_results(results, item, top_k)
+        per_query.append(
+            {
+                "query": item["query"],
+                "recall": round(scores["recall"], 4),
+                "rr": round(scores["rr"], 4),
+                "top_ids": [result["id"] for result in results],
+            }
+        )
+
+    n = len(per_query) or 1
+    return {
+        "name": config.get("name", "unnamed"),
+        "config": config,
+        "k": top_k,
+        "n_queries": len(per_query),
+        "recall_at_k": round(sum(q["recall"] for q in per_query) / n, 4),
+        "mrr": round(sum(q["rr"] for q in per_query) / n, 4),
+        "latency_ms": latency_summary(samples),
+        "per_query": per_query,
+    }
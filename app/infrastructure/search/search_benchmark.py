@@ -0,0 +1,320 @@
+"""
+검색 경로 마이크로 벤치마크
+
+시드 데이터 어휘 + 합성 음절 단어로 만든 한국어 코퍼스(기본 1k / 10k / 100k / 1M 청크)에서
+검색 경로의 단계를 하나씩 따로 측정해 코퍼스 크기에 따른 증가 곡선을 구한다.
+
+- tokenize:    문서 토큰화 (µs/문서)
+- bm25_build:  BM25Retriever.build_index (s)
+- bm25_query:  BM25Retriever.search (ms/질의)
+- rrf:         _reciprocal_rank_fusion (ms/질의)
+- dense_dedup: HybridSearchService._collect_dense_results, 가상 질문 중복 포함 (ms/질의)
+- search:      HybridSearchService.search 전체, 스텁 임베딩 + Dense 행렬 인덱스 (ms/질의)
+
+ChromaDB / 임베딩 모델 / 네트워크 없이 실행된다 (컬렉션은 메모리 객체, Dense 는 DenseMatrixIndex).
+실행은 scripts/benchmark_search_path.py 참고.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import resource
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from app.infrastructure.loaders.hypothetical_questions_loader import N_QUESTIONS
+from app.infrastructure.search.bm25_retriever import BM25Retriever
+from app.infrastructure.search.dense_matrix import DenseMatrixIndex
+from app.infrastructure.search.hybrid_search import (
+    BASE_COLLECTIONS,
+    MAX_DEPTH_FACTOR,
+    HybridSearchService,
+    _reciprocal_rank_fusion,
+)
+from app.infrastructure.search.tokenizer import tokenize
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+STAGE_UNITS = {
+    "tokenize": "µs/doc",
+    "bm25_build": "s",
+    "bm25_query": "ms",
+    "rrf": "ms",
+    "dense_dedup": "ms",
+    "search": "ms",
+}
+
+CONCEPT_KEYS = [
+    "되/돼",
+    "안/않다",
+    "가르치다/가르키다",
+    "맞추다/맞히다",
+    "잊다/잃다",
+    "메다/매다",
+    "바라다/바래다",
+    "부치다/붙이다",
+    "반드시/반듯이",
+    "이따가/있다가",
+]
+
+
+# ----------------------------------------------------------------------
+# 합성 코퍼스
+# ----------------------------------------------------------------------
+
+
+def _seed_words() -> List[str]:
+    from app.infrastructure.loaders.seed_mongo_loader import CARD_CHECK_SEED, KOREAN_WORD_PROBLEMS_SEED
+
+    words: set[str] = set()
+    stack: List[Any] = [CARD_CHECK_SEED, KOREAN_WORD_PROBLEMS_SEED]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            words.update(re.findall(r"[가-힣]+", value))
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return sorted(words)
+
+
+def _vocabulary(n_docs: int, rng: np.random.Generator) -> np.ndarray:
+    """시드 단어 + 합성 단어. 코퍼스가 커질수록 어휘도 늘어난다 (Heaps 법칙, V ≈ 40·√N)."""
+    n_synthetic = int(40 * math.sqrt(n_docs))
+    syllables = rng.integers(0xAC00, 0xD7A4, size=(n_synthetic, 3))
+    lengths = rng.integers(1, 4, size=n_synthetic)
+    synthetic = ["".join(map(chr, row[:length])) for row, length in zip(syllables.tolist(), lengths)]
+    return np.array(_seed_words() + synthetic, dtype=object)
+
+
+def _zipf_probabilities(size: int, exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _clustered_unit_vectors(labels: np.ndarray, n_clusters: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(len(labels), dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_corpus(n_docs: int, dim: int = 64, seed: int = 0) -> Dict[str, Any]:
+    """
+    n_docs 개 청크를 BASE_COLLECTIONS 에 나눠 담은 합성 코퍼스.
+    {"collections": {이름: {"ids", "documents", "metadatas", "embeddings"}}, "vocab": 어휘 배열}
+    """
+    rng = np.random.default_rng(seed)
+    vocab = _vocabulary(n_docs, rng)
+
+    # 문장 길이 6~19 어절, 어절은 Zipf 분포 (자주 나오는 조사/어미 역할)
+    lengths = rng.integers(6, 20, size=n_docs)
+    word_ids = rng.choice(len(vocab), size=int(lengths.sum()), p=_zipf_probabilities(len(vocab)))
+    words = vocab[word_ids]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    documents = [" ".join(words[offsets[i] : offsets[i + 1]]) + "." for i in range(n_docs)]
+
+    concepts = rng.integers(len(CONCEPT_KEYS), size=n_docs)
+    embeddings = _clustered_unit_vectors(concepts, len(CONCEPT_KEYS), dim, rng)
+
+    # 실제 분포처럼 PDF 청크가 대부분이고 카드/문제가 일부
+    slot = np.arange(n_docs) % 10
+    placement = {
+        "card_check": np.flatnonzero(slot == 0),
+        "korean_word_problems": np.flatnonzero(slot == 1),
+        "pdf_documents": np.flatnonzero(slot >= 2),
+    }
+    collections = {}
+    for name, rows in placement.items():
+        collections[name] = {
+            "ids": [f"{name}_{row}" for row in rows.tolist()],
+            "documents": [documents[row] for row in rows.tolist()],
+            "metadatas": [
+                {
+                    "lesson_id": f"lesson_{row % 5 + 1}",
+                    "concept_key": CONCEPT_KEYS[concepts[row]],
+                    "document_type": name,
+                }
+                for row in rows.tolist()
+            ],
+            "embeddings": embeddings[rows],
+        }
+    return {"collections": collections, "vocab": vocab}
+
+
+def build_queries(vocab: np.ndarray, n_queries: int, seed: int = 1) -> List[str]:
+    """빈도 상위 어휘에서 3~6 어절을 뽑은 질의 (서로 달라야 질의 토큰화 LRU 에 걸리지 않는다)."""
+    rng = np.random.default_rng(seed)
+    probabilities = _zipf_probabilities(len(vocab))
+    queries = []
+    for i in range(n_queries):
+        words = vocab[rng.choice(len(vocab), size=int(rng.integers(3, 7)), p=probabilities)]
+        queries.append(" ".join(words) + f" {i}번")
+    return queries
+
+
+class SyntheticCollection:
+    """ChromaDB 컬렉션 중 벤치마크 경로가 쓰는 count / get 만 흉내 낸다."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+    def count(self) -> int:
+        return len(self.data["ids"])
+
+    def get(self, ids=None, include=None) -> Dict[str, Any]:
+        include = include or ["documents", "metadatas"]
+        rows = range(self.count())
+        if ids is not None:
+            wanted = set(ids)
+            rows = [row for row, doc_id in enumerate(self.data["ids"]) if doc_id in wanted]
+        result = {"ids": [self.data["ids"][row] for row in rows]}
+        for field in include:
+            values = self.data[field]
+            result[field] = values[list(rows)] if isinstance(values, np.ndarray) else [values[row] for row in rows]
+        return result
+
+
+class SyntheticVectorDB:
+    def __init__(self, collections: Dict[str, Dict[str, Any]]):
+        self.collections = {name: SyntheticCollection(data) for name, data in collections.items()}
+
+    def get_collection(self, name: str):
+        return self.collections.get(name)
+
+
+class StubEmbeddingModel:
+    """질의 텍스트 해시로 만든 결정적 단위 벡터 (모델 추론 비용을 측정에서 뺀다)."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        vector = np.random.default_rng(seed).normal(size=self.dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def get_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def get_embeddings(self, texts: List[str], cache_queries: bool = False) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+
+def _question_response(source_ids: Sequence[str], collection: str, depth: int, rng: np.random.Generator):
+    """가상 질문 컬렉션 응답 (원본 하나에 질문 N_QUESTIONS 개 → de-dup 대상 중복)."""
+    n_sources = max(1, depth // N_QUESTIONS)
+    sources = [source_ids[i] for i in rng.integers(len(source_ids), size=n_sources)]
+    originals = [sources[i % n_sources] for i in range(depth)]
+    return {
+        "ids": [[f"{original}_q{i}" for i, original in enumerate(originals)]],
+        "metadatas": [[{"original_id": original, "collection": collection} for original in originals]],
+        "distances": [np.sort(rng.uniform(0.1, 0.6, size=depth)).tolist()],
+    }
+
+
+# ----------------------------------------------------------------------
+# 측정
+# ----------------------------------------------------------------------
+
+
+def _median_seconds(fn: Callable[[Any], Any], inputs: Sequence[Any]) -> float:
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _peak_rss_mb() -> float:
+    # Linux 의 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_size(
+    n_docs: int,
+    dim: int = 64,
+    n_queries: int = 50,
+    top_k: int = 5,
+    seed: int = 0,
+    tokenize_sample: int = 2000,
+) -> Dict[str, Any]:
+    """코퍼스 하나를 만들어 단계별 시간을 측정한다 (STAGE_UNITS 단위)."""
+    corpus = build_corpus(n_docs, dim=dim, seed=seed)
+    collections = corpus["collections"]
+    vector_db = SyntheticVectorDB(collections)
+    queries = build_queries(corpus["vocab"], n_queries, seed=seed + 1)
+    fetch_n = top_k * MAX_DEPTH_FACTOR
+    result: Dict[str, Any] = {"n_docs": n_docs, "vocab": len(corpus["vocab"])}
+
+    documents = collections["pdf_documents"]["documents"][:tokenize_sample]
+    result["tokenize"] = _median_seconds(tokenize, documents) * 1e6
+
+    bm25 = BM25Retriever()
+    started = time.perf_counter()
+    bm25.build_index(vector_db)
+    result["bm25_build"] = time.perf_counter() - started
+    result["bm25_query"] = _median_seconds(lambda query: bm25.search(query, n_results=fetch_n), queries) * 1e3
+
+    dense_matrix = DenseMatrixIndex(collection_names=BASE_COLLECTIONS, enabled=True)
+    dense_matrix.load(vector_db)
+    service = HybridSearchService(
+        vector_db=vector_db,
+        embedding_model=StubEmbeddingModel(dim),
+        bm25=bm25,
+        dense_matrix=dense_matrix,
+    )
+    service.collections = list(BASE_COLLECTIONS)
+
+    try:
+        # 단계 입력은 실제 Dense 행렬 / BM25 결과로 만든다 (질문 컬렉션 응답만 합성)
+        rng = np.random.default_rng(seed + 2)
+        targets = list(BASE_COLLECTIONS) + ["card_check_questions"]
+        stage_inputs = []
+        for query in queries:
+            embedding = service.embedding_model._embed(query)
+            responses = [dense_matrix.query(name, [embedding], fetch_n) for name in BASE_COLLECTIONS]
+            responses.append(_question_response(collections["card_check"]["ids"], "card_check", fetch_n, rng))
+            dense_results = service._collect_dense_results(targets, responses, 0)
+            stage_inputs.append((responses, dense_results, bm25.search(query, n_results=fetch_n)))
+
+        result["dense_dedup"] = _median_seconds(
+            lambda item: service._collect_dense_results(targets, item[0], 0), stage_inputs
+        ) * 1e3
+        result["rrf"] = _median_seconds(
+            lambda item: _reciprocal_rank_fusion(item[1], item[2], top_k * 2), stage_inputs
+        ) * 1e3
+
+        async def _search_all() -> List[float]:
+            samples = []
+            for query in queries:
+                started = time.perf_counter()
+                await service.search(query, top_k=top_k, fusion_mode="full")
+                samples.append(time.perf_counter() - started)
+            return samples
+
+        result["search"] = statistics.median(asyncio.run(_search_all())) * 1e3
+    finally:
+        service.close()
+        bm25._merge_executor.shutdown(wait=False)
+
+    result["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    return result
+
+
+def scaling_exponents(results: Sequence[Dict[str, Any]], stage: str) -> List[float]:
+    """
+    연속한 두 크기 사이의 증가 지수 log(t2/t1) / log(n2/n1).
+    0 ≈ 크기와 무관, 1 ≈ 선형, 1 보다 크면 초선형 (그 구간에서 확장성이 무너진다).
+    """
+    exponents = []
+    for prev, cur in zip(results, results[1:]):
+        if prev[stage] <= 0 or cur[stage] <= 0:
+            exponents.append(float("nan"))
+            continue
+        exponents.append(math.log(cur[stage] / prev[stage]) / math.log(cur["n_docs"] / prev["n_docs"]))
+    return exponents
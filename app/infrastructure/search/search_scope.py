@@ -0,0 +1,95 @@
+"""
+검색 범위 (차시 / 개념 / 문서 유형)
+
+AgentService 처럼 학생의 현재 차시나 취약 개념을 아는 호출자가 검색 대상을 좁힐 때 사용한다.
+- Dense: ChromaDB where 필터로 변환해 HNSW 검색 단계에서 적용 (행렬 인덱스는 행 필터)
+- Sparse: BM25 문서 테이블의 메타데이터 역색인으로 row 를 먼저 고른 뒤 해당 샤드/row 만 채점
+
+각 필드는 문자열 하나 또는 목록 (목록은 OR, 필드 간에는 AND).
+인덱싱 시 메타데이터에 같은 키가 있어야 걸러진다 (없는 문서는 범위 검색에서 제외).
+단, SCOPE_EXEMPT_FIELDS 의 컬렉션은 해당 필드를 적용하지 않는다 (for_collection).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+# 메타데이터 키 = 필드명
+SCOPE_FIELDS = ("lesson_id", "concept_key", "document_type")
+
+# 컬렉션 → 적용하지 않는 범위 필드
+# 어문 규정 PDF 는 특정 차시/개념에 묶이지 않는 공통 근거라 개념 범위 검색에서도 후보로 남긴다
+SCOPE_EXEMPT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "pdf_documents": ("lesson_id", "concept_key"),
+}
+
+
+class SearchScope(BaseModel):
+    lesson_id: Optional[Union[str, List[str]]] = None
+    concept_key: Optional[Union[str, List[str]]] = None
+    document_type: Optional[Union[str, List[str]]] = None
+
+    def filters(self) -> Dict[str, List[str]]:
+        """지정된 필드만 {필드: [값, ...]} 로 반환한다 (중복 제거, 순서 유지)."""
+        filters = {}
+        for field in SCOPE_FIELDS:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            values = list(dict.fromkeys(str(v) for v in values if v))
+            if values:
+                filters[field] = values
+        return filters
+
+    def for_collection(self, collection: str) -> "SearchScope":
+        """해당 컬렉션에 적용할 범위 (면제 필드를 뺀다. 면제가 없으면 자기 자신)."""
+        exempt = [field for field in SCOPE_EXEMPT_FIELDS.get(collection, ()) if getattr(self, field) is not None]
+        if not exempt:
+            return self
+        return self.model_copy(update={field: None for field in exempt})
+
+    def is_empty(self) -> bool:
+        return not self.filters()
+
+    def to_where(self) -> Dict[str, Any] | None:
+        """ChromaDB where 필터. 범위가 비어 있으면 None."""
+        clauses = [
+            {field: values[0]} if len(values) == 1 else {field: {"$in": values}}
+            for field, values in self.filters().items()
+        ]
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return {"$and": clauses}
+
+    def matches(self, metadata: Dict[str, Any] | None) -> bool:
+        """메타데이터가 범위 안에 있는지 (where 필터와 같은 의미)."""
+        metadata = metadata or {}
+        for field, values in self.filters().items():
+            value = metadata.get(field)
+            if value is None or str(value) not in values:
+                return False
+        return True
+
+
+def scope_metadata(
+    lesson_id: str | None = None,
+    concept_key: str | None = None,
+    document_type: str | None = None,
+) -> Dict[str, str]:
+    """인덱싱 메타데이터에 넣을 범위 키 (값이 없는 키는 넣지 않는다 — ChromaDB 는 None 을 허용하지 않음)."""
+    values = {"lesson_id": lesson_id, "concept_key": concept_key, "document_type": document_type}
+    return {key: str(value) for key, value in values.items() if value}
+
+
+def normalize_lesson_id(raw_lesson_id) -> str:
+    """차시 ID 를 "lesson_<번호>" 형식으로 맞춘다 (인덱싱 메타데이터와 범위 값이 같은 형식이어야 걸러진다)."""
+    value = str(raw_lesson_id)
+    if value.startswith("lesson_"):
+        return value
+    if value.startswith("lesson"):
+        suffix = value.replace("lesson", "", 1)
+        return f"lesson_{suffix}"
+    return f"lesson_{value}"
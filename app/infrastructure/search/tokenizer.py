@@ -0,0 +1,100 @@
+"""
+BM25 용 한국어 토크나이저
+
+토큰 규칙 (기존 _tokenize_korean 과 같은 토큰, 같은 순서):
+- 특수문자를 제외한 어절 (\\w 연속 구간)
+- 각 어절의 한글 음절만 이어 붙인 뒤 글자 바이그램 → 글자 유니그램
+  예) "되다" → ["되다", "되다", "되", "다"]
+
+최적화:
+- 정규식은 모듈 로드 시 한 번만 컴파일
+- 어절 분리와 한글 추출을 한 번의 순회로 처리 (단어마다 re.sub 하지 않음)
+- 질의 토큰화 결과는 LRU 캐시
+- 토큰은 BM25Index 와 공유하는 어휘 사전(token → int id)으로 intern
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+# [^\w가-힣a-zA-Z0-9] 를 공백으로 바꾼 뒤 split 한 결과 == \w 연속 구간
+_WORD_RE = re.compile(r"\w+")
+_HANGUL_RE = re.compile(r"[가-힣]+")
+
+QUERY_CACHE_SIZE = int(os.getenv("BM25_QUERY_CACHE_SIZE", "2048"))
+
+
+def iter_tokens(text: str) -> Iterator[str]:
+    """어절 → (어절별) 한글 바이그램 → 한글 유니그램 순서로 토큰을 생성한다."""
+    words = _WORD_RE.findall(text)
+    yield from words
+
+    for word in words:
+        if _HANGUL_RE.fullmatch(word):
+            hangul = word
+        else:
+            hangul = "".join(_HANGUL_RE.findall(word))
+            if not hangul:
+                continue
+
+        for i in range(len(hangul) - 1):
+            yield hangul[i : i + 2]
+        # 단일 글자도 추가 (받침 없는 조사 붙은 형태 처리)
+        yield from hangul
+
+
+def tokenize(text: str) -> List[str]:
+    """텍스트를 BM25 토큰 리스트로 변환한다."""
+    return list(iter_tokens(text))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def tokenize_query(text: str) -> Tuple[str, ...]:
+    """질의 토큰화 (LRU 캐시). 같은 질문이 반복되는 채팅 트래픽용."""
+    return tuple(iter_tokens(text))
+
+
+class KoreanTokenizer:
+    """
+    토큰을 BM25Index 의 어휘 사전 id 로 변환한다.
+    vocab 은 인덱스와 같은 dict 객체를 공유하므로 별도 동기화가 필요 없다.
+    """
+
+    def __init__(self, vocab: Dict[str, int]):
+        self.vocab = vocab
+
+    def encode(self, text: str) -> List[int]:
+        """문서 토큰을 id 로 변환한다. 처음 보는 토큰은 새 id 를 부여한다."""
+        vocab = self.vocab
+        return [vocab.setdefault(token, len(vocab)) for token in iter_tokens(text)]
+
+    def encode_query(self, text: str) -> List[int]:
+        """질의 토큰을 id 로 변환한다. 어휘에 없는 토큰은 점수에 기여하지 않으므로 제외한다."""
+        vocab = self.vocab
+        ids = []
+        for token in tokenize_query(text):
+            term_id = vocab.get(token)
+            if term_id is not None:
+                ids.append(term_id)
+        return ids
+
+
+def reference_tokenize(text: str) -> List[str]:
+    """
+    기존 BM25Retriever._tokenize_korean 구현 그대로 (패리티 테스트/벤치마크 기준값).
+    검색 경로에서는 사용하지 않는다.
+    """
+    clean = re.sub(r"[^\w가-힣a-zA-Z0-9]", " ", text)
+    words = [w for w in clean.split() if w]
+
+    tokens = list(words)
+    for word in words:
+        korean_chars = re.sub(r"[^가-힣]", "", word)
+        if len(korean_chars) >= 2:
+            for i in range(len(korean_chars) - 1):
+                tokens.append(korean_chars[i : i + 2])
+        for ch in korean_chars:
+            tokens.append(ch)
+
+    return tokens
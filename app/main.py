@@ -176,6 +176,9 @@ async def startup_event():
 async def shutdown_event():
     """애플리케이션 종료 시 실행될 이벤트"""
     logger.info("[STOP] Beneficial RAG System 종료 중...")
+    from app.infrastructure.search.hybrid_search import close_hybrid_search_service
+
+    close_hybrid_search_service()
 
 
 # 라우터 등록
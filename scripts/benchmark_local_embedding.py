@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+로컬 임베딩 배칭 벤치마크 (고정 크기 배치 vs 길이 버킷 배치)
+
+시드 카드/문제 문자열(짧은 텍스트)과 800자 PDF 청크 형태의 긴 텍스트를 섞은 코퍼스를
+두 배치 계획으로 인코딩해 처리량(texts/s)과 패딩 포함 토큰 수를 비교한다.
+fixed 는 이전 _get_local_embeddings_batch 와 같이 model.encode(batch) 를 (내부 batch_size=32 로 다시 쪼갬),
+bucketed 는 현재 경로와 같이 model.encode(batch, batch_size=len(batch)) 를 호출한다.
+padded tok 은 배치 계획 기준 추정치 (fixed 는 sentence-transformers 내부 재정렬 전 기준).
+
+    python scripts/benchmark_local_embedding.py                        # jhgan/ko-sroberta-multitask
+    python scripts/benchmark_local_embedding.py --long-ratio 0.5 --texts 4000
+    python scripts/benchmark_local_embedding.py --dry-run              # 모델 없이 패딩 토큰 수만
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.embedding.length_batching import (
+    DEFAULT_TOKEN_BUDGET,
+    estimate_length,
+    fixed_batches,
+    padded_tokens,
+    plan_length_batches,
+)
+from app.infrastructure.loaders.seed_mongo_loader import CARD_CHECK_SEED, KOREAN_WORD_PROBLEMS_SEED
+
+PDF_CHUNK_SIZE = 800
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def build_mixed_corpus(n_texts: int, long_ratio: float, seed: int = 0):
+    """짧은 시드 문자열과 PDF 청크 길이의 긴 텍스트를 섞은 코퍼스 (입력 순서도 섞음)."""
+    rng = random.Random(seed)
+    short = [text for text in _strings(CARD_CHECK_SEED) if len(text) > 1]
+    short += [text for text in _strings(KOREAN_WORD_PROBLEMS_SEED) if len(text) > 1]
+    sentences = [text for text in short if len(text) >= 10]
+
+    corpus = []
+    for _ in range(n_texts):
+        if rng.random() < long_ratio:
+            chunk = ""
+            while len(chunk) < PDF_CHUNK_SIZE:
+                chunk += rng.choice(sentences) + " "
+            corpus.append(chunk[:PDF_CHUNK_SIZE])
+        else:
+            corpus.append(rng.choice(short))
+    return corpus
+
+
+def _encode(model, texts, batches, whole_batch: bool) -> float:
+    started = time.perf_counter()
+    for batch in batches:
+        batch_texts = [texts[i] for i in batch]
+        if whole_batch:
+            model.encode(batch_texts, batch_size=len(batch), show_progress_bar=False)
+        else:
+            model.encode(batch_texts, show_progress_bar=False)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="jhgan/ko-sroberta-multitask")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--long-ratio", type=float, default=0.3, help="긴 텍스트(PDF 청크) 비율")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("EMBEDDING_BATCH_SIZE", "50")))
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument("--max-length", type=int, default=None, help="기본값: 모델 max_seq_length")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="모델을 올리지 않고 패딩 토큰 수만 계산")
+    args = parser.parse_args()
+
+    texts = build_mixed_corpus(args.texts, args.long_ratio, args.seed)
+
+    model = None
+    max_length = args.max_length
+    if not args.dry_run:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(args.model)
+        max_length = max_length or model.max_seq_length
+        # 워밍업 (첫 forward 의 초기화 비용 제외)
+        model.encode(texts[:8], show_progress_bar=False)
+
+    lengths = [estimate_length(text, max_length) for text in texts]
+    plans = {
+        "fixed": fixed_batches(len(texts), args.batch_size),
+        "bucketed": plan_length_batches(texts, args.token_budget, max_length=max_length),
+    }
+
+    print(
+        f"코퍼스: {len(texts)}개 (긴 텍스트 비율 {args.long_ratio:.0%}), "
+        f"실제 토큰 ≈ {sum(lengths)}, max_length={max_length}"
+    )
+    print(f"\n  {'plan':<10} {'batches':>8} {'padded tok':>11} {'efficiency':>11} {'texts/s':>10}")
+    results = {}
+    for name, batches in plans.items():
+        padded = padded_tokens(batches, lengths)
+        throughput = float("nan")
+        if model is not None:
+            seconds = min(_encode(model, texts, batches, whole_batch=name == "bucketed") for _ in range(args.repeat))
+            throughput = len(texts) / seconds
+        results[name] = throughput
+        print(
+            f"  {name:<10} {len(batches):>8} {padded:>11} {sum(lengths) / padded:>10.1%} {throughput:>10.1f}"
+        )
+
+    if model is not None:
+        print(f"\n[OK] 길이 버킷 배치 처리량: 고정 배치 대비 {results['bucketed'] / results['fixed']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
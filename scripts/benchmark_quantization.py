@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+양자화 벡터 저장소 벤치마크
+
+합성 임베딩(군집 구조, ko-sroberta 768차원 / ada-002 1536차원)으로
+저장 방식별 메모리, float32 brute-force 대비 recall@k, 질의 지연을 비교한다.
+
+    python scripts/benchmark_quantization.py [--n 20000] [--dim 768] [--k 10] [--rescore 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.search.quantized_store import QuantizedVectorStore
+
+
+def _clustered_unit_vectors(n, dim, n_clusters, seed):
+    """실제 임베딩처럼 몇 개의 주제 군집 주위에 모인 단위 벡터."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    vectors = centers[rng.integers(n_clusters, size=n)] + 0.6 * rng.normal(size=(n, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _recall(found, exact):
+    return np.mean([len(set(f.tolist()) & set(e.tolist())) / len(e) for f, e in zip(found, exact)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=4)
+    args = parser.parse_args()
+
+    vectors = _clustered_unit_vectors(args.n, args.dim, n_clusters=50, seed=0)
+    queries = _clustered_unit_vectors(args.queries, args.dim, n_clusters=50, seed=1)
+    exact = [rows for rows, _ in QuantizedVectorStore.from_vectors(vectors, "float32").top_k(queries, args.k)]
+
+    # Python float 리스트 (리스트 객체 + float 객체 24B + 포인터 8B)
+    list_bytes = args.n * (56 + 8 * args.dim + 24 * args.dim)
+    print(f"벡터 {args.n}개 x {args.dim}차원, 질의 {args.queries}개, recall@{args.k}")
+    print(f"  {'저장 방식':<26} {'메모리':>10} {'절감':>7} {'recall':>8} {'ms/질의':>9}")
+    print(f"  {'Python float 리스트':<26} {list_bytes / 2**20:>8.1f}MB {'':>7} {'':>8} {'':>9}")
+    print(f"  {'float64 ndarray':<26} {vectors.nbytes * 2 / 2**20:>8.1f}MB {'':>7} {'':>8} {'':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "full.npy")
+        np.save(path, vectors)
+        full = np.load(path, mmap_mode="r")
+
+        baseline = None
+        for mode, rescore in [("float32", 0), ("float16", 0), ("int8", 0), ("int8", args.rescore)]:
+            store = QuantizedVectorStore.from_vectors(
+                vectors, mode, full_vectors=full if rescore else None
+            )
+            started = time.perf_counter()
+            found = [rows for rows, _ in store.top_k(queries, args.k, rescore=rescore)]
+            per_query_ms = (time.perf_counter() - started) / len(queries) * 1000
+
+            baseline = baseline or store.nbytes
+            label = f"{mode} + 재채점 x{rescore} (memmap)" if rescore else mode
+            print(
+                f"  {label:<26} {store.nbytes / 2**20:>8.1f}MB "
+                f"{1 - store.nbytes / baseline:>6.0%} {_recall(found, exact):>8.4f} {per_query_ms:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
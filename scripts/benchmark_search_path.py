@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+검색 경로 마이크로 벤치마크 (합성 한국어 코퍼스)
+
+토큰화, BM25 빌드/질의, RRF, Dense de-dup, HybridSearchService.search 전체를
+코퍼스 크기별로 따로 측정하고 증가 지수(0 ≈ 일정, 1 ≈ 선형)를 출력한다.
+ChromaDB / 임베딩 모델 / 네트워크 없이 실행된다.
+
+    python scripts/benchmark_search_path.py                       # 1k, 10k, 100k, 1M (수 분, 메모리 수 GB)
+    python scripts/benchmark_search_path.py --sizes 1000 10000 --output bench.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.search.search_benchmark import (
+    DEFAULT_SIZES,
+    STAGE_UNITS,
+    run_size,
+    scaling_exponents,
+)
+
+
+def _print_table(results):
+    stages = list(STAGE_UNITS)
+    header = "".join(f"{stage:>13}" for stage in stages)
+    units = "".join(f"{'(' + unit + ')':>13}" for unit in STAGE_UNITS.values())
+    print(f"\n  {'n_docs':>9} {'vocab':>8}{header} {'rss MB':>9}")
+    print(f"  {'':>9} {'':>8}{units}")
+    for r in results:
+        row = "".join(f"{r[stage]:>13.3f}" for stage in stages)
+        print(f"  {r['n_docs']:>9} {r['vocab']:>8}{row} {r['peak_rss_mb']:>9.1f}")
+
+    if len(results) < 2:
+        return
+    print("\n  증가 지수 log(t2/t1)/log(n2/n1)")
+    for i, (prev, cur) in enumerate(zip(results, results[1:])):
+        exponents = "".join(
+            f"{value:>13.2f}" if not math.isnan(value) else f"{'-':>13}"
+            for value in (scaling_exponents(results, stage)[i] for stage in stages)
+        )
+        print(f"  {prev['n_docs']:>9}→{cur['n_docs']:<8}{exponents}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--dim", type=int, default=64, help="합성 임베딩 차원")
+    parser.add_argument("--queries", type=int, default=50, help="크기별 질의 수")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    for n_docs in sorted(args.sizes):
+        result = run_size(n_docs, dim=args.dim, n_queries=args.queries, top_k=args.top_k, seed=args.seed)
+        results.append(result)
+        print(
+            f"[OK] {n_docs}개: build {result['bm25_build']:.2f}s, "
+            f"bm25 {result['bm25_query']:.3f}ms, search {result['search']:.3f}ms"
+        )
+
+    _print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
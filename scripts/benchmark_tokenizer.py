@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+BM25 토크나이저 마이크로 벤치마크
+
+기존 _tokenize_korean 구현(reference_tokenize)과 새 토크나이저를 시드 코퍼스로 비교한다.
+
+    python scripts/benchmark_tokenizer.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.loaders.seed_mongo_loader import CARD_CHECK_SEED, KOREAN_WORD_PROBLEMS_SEED
+from app.infrastructure.search.tokenizer import (
+    KoreanTokenizer,
+    reference_tokenize,
+    tokenize,
+    tokenize_query,
+)
+
+QUERIES = [
+    "되 돼 차이가 뭐야?",
+    "맞히다랑 맞추다 언제 써?",
+    "가르치다 가르키다 헷갈려",
+    "띄어쓰기 어떻게 해요",
+]
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _bench(label: str, fn, repeat: int, n_items: int) -> float:
+    seconds = min(timeit.repeat(fn, number=repeat, repeat=5))
+    per_item_us = seconds / (repeat * n_items) * 1e6
+    print(f"  {label:<28} {per_item_us:8.2f} µs/item")
+    return per_item_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = list(_strings(CARD_CHECK_SEED)) + list(_strings(KOREAN_WORD_PROBLEMS_SEED))
+    mismatches = sum(tokenize(text) != reference_tokenize(text) for text in corpus)
+    print(f"코퍼스: {len(corpus)}개 문자열, 토큰 불일치: {mismatches}개")
+
+    print("\n[문서 토큰화]")
+    ref = _bench("reference_tokenize", lambda: [reference_tokenize(t) for t in corpus], args.repeat, len(corpus))
+    new = _bench("tokenize", lambda: [tokenize(t) for t in corpus], args.repeat, len(corpus))
+    vocab = {}
+    tokenizer = KoreanTokenizer(vocab)
+    enc = _bench("KoreanTokenizer.encode", lambda: [tokenizer.encode(t) for t in corpus], args.repeat, len(corpus))
+    print(f"  → tokenize {ref / new:.2f}x, encode {ref / enc:.2f}x (기준 대비)")
+
+    print("\n[질의 토큰화 (반복 질문)]")
+    ref_q = _bench("reference_tokenize", lambda: [reference_tokenize(q) for q in QUERIES], args.repeat, len(QUERIES))
+    tokenize_query.cache_clear()
+    cached_q = _bench("encode_query (LRU)", lambda: [tokenizer.encode_query(q) for q in QUERIES], args.repeat, len(QUERIES))
+    print(f"  → {ref_q / cached_q:.2f}x (기준 대비)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+검색 품질 / 지연 평가
+
+라벨링된 질의 세트(app/infrastructure/search/eval_data/retrieval_queries.json)를 실제 인덱스에 대해
+구성별로 실행하고 recall@k, MRR, 단계별 p50/p95 지연을 표로 출력한다.
+
+    python scripts/evaluate_retrieval.py --k 5 --output eval_full.json
+    python scripts/evaluate_retrieval.py --configs my_configs.json
+
+--configs 파일은 구성 목록 JSON:
+    [{"name": "candidates", "fusion_mode": "candidates", "adaptive_depth": false}, ...]
+(fusion_mode, top_k, collection_name, adaptive_depth, initial_depth_factor, depth_gap, collections)
+
+토크나이저 / 임베딩 변경은 변경 전후 커밋에서 같은 명령을 실행해 --output 결과를 비교한다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chroma-dir", help="CHROMA_PERSIST_DIR (기본: 환경 변수 값)")
+    parser.add_argument("--queries", help="라벨링된 질의 JSON (기본: 내장 세트)")
+    parser.add_argument("--configs", help="구성 목록 JSON (기본: DEFAULT_CONFIGS)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="지연 통계에서 제외할 예열 질의 수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    return parser.parse_args()
+
+
+def _prepare_indexes(vector_db):
+    from app.infrastructure.loaders.hypothetical_questions_loader import mark_question_collection_ready
+    from app.infrastructure.search.bm25_retriever import get_bm25_retriever
+    from app.infrastructure.search.hybrid_search import QUESTION_COLLECTIONS
+
+    get_bm25_retriever().build_index(vector_db)
+    # 서버 startup 과 달리 질문 생성 단계를 거치지 않으므로 이미 채워진 질문 컬렉션만 검색 대상으로 표시
+    for name in QUESTION_COLLECTIONS:
+        collection = vector_db.get_collection(name)
+        if collection and collection.count() > 0:
+            mark_question_collection_ready(name)
+
+
+def _print_summary(results):
+    print(f"\n  {'config':<20} {'recall':>7} {'mrr':>7} {'embed p50':>10} {'total p50':>10} {'total p95':>10}")
+    for r in results:
+        latency = r["latency_ms"]
+        embed = latency.get("embed", {}).get("p50", 0.0)
+        total = latency.get("total", {})
+        print(
+            f"  {r['name']:<20} {r['recall_at_k']:>7.4f} {r['mrr']:>7.4f} "
+            f"{embed:>10.3f} {total.get('p50', 0.0):>10.3f} {total.get('p95', 0.0):>10.3f}"
+        )
+
+
+async def _run(args):
+    from app.infrastructure.db.vector.vector_db import get_vector_db
+    from app.infrastructure.search.hybrid_search import HybridSearchService
+    from app.infrastructure.search.retrieval_eval import DEFAULT_CONFIGS, evaluate_config, load_queries
+
+    queries = load_queries(args.queries)
+    if args.configs:
+        with open(args.configs, encoding="utf-8") as f:
+            configs = json.load(f)
+    else:
+        configs = DEFAULT_CONFIGS
+
+    vector_db = get_vector_db()
+    _prepare_indexes(vector_db)
+
+    results = []
+    for config in configs:
+        # 구성마다 새 서비스 (적응형 깊이 등 속성 변경이 다음 구성에 남지 않도록)
+        service = HybridSearchService(vector_db=vector_db)
+        try:
+            result = await evaluate_config(service, queries, config, k=args.k, warmup=args.warmup)
+        finally:
+            service.close()
+        results.append(result)
+        print(f"[OK] {result['name']}: recall@{result['k']}={result['recall_at_k']:.4f} mrr={result['mrr']:.4f}")
+
+    print(f"\n질의 {len(queries)}개, k={args.k}")
+    _print_summary(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] 결과 저장: {args.output}")
+
+
+def main():
+    args = _parse_args()
+    if args.chroma_dir:
+        os.environ["CHROMA_PERSIST_DIR"] = args.chroma_dir
+    # 질의 임베딩은 로컬 모델로 (API 비용 / 네트워크 지연이 측정에 섞이지 않도록)
+    os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+로컬 임베딩 모델 ONNX 내보내기 + 코사인 일치 검사 + 처리량 벤치마크
+
+1. SentenceTransformer 를 ONNX 로 내보내고 (기본: int8 동적 양자화 모델도 생성)
+2. 시드 카드/문제 문자열과 PDF 청크 형태 텍스트로 PyTorch 벡터와 ONNX 벡터의 코사인 유사도를 비교한 뒤
+3. 백엔드별 인덱싱 처리량(길이 버킷 배치, texts/s)과 단일 질의 지연(ms)을 측정한다.
+일치 검사 기준을 넘지 못하면 종료 코드 1 (해당 백엔드는 켜지 않는다).
+
+    pip install onnx onnxruntime
+    python scripts/export_onnx_embedder.py                              # jhgan/ko-sroberta-multitask
+    python scripts/export_onnx_embedder.py --skip-export --threads 4    # 이미 내보낸 모델로 검사/측정만
+
+워커 설정: EMBEDDING_LOCAL_BACKEND=onnx [EMBEDDING_ONNX_QUANTIZE=1] [EMBEDDING_ONNX_THREADS=코어/워커]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_local_embedding import build_mixed_corpus
+
+from app.infrastructure.embedding.length_batching import DEFAULT_TOKEN_BUDGET, plan_length_batches
+from app.infrastructure.embedding.onnx_backend import (
+    OnnxSentenceEncoder,
+    cosine_parity,
+    default_onnx_dir,
+    export_onnx,
+)
+
+QUERIES = [
+    "되 돼 차이가 뭐야?",
+    "맞히다랑 맞추다 언제 써?",
+    "가르치다 가르키다 헷갈려",
+    "띄어쓰기 어떻게 해요",
+]
+
+
+def _throughput(model, texts, batches, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for batch in batches:
+            model.encode([texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False)
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best
+
+
+def _query_latency_ms(model, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            model.encode([query], batch_size=1, show_progress_bar=False)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="jhgan/ko-sroberta-multitask")
+    parser.add_argument("--output", help="내보낼 디렉터리 (기본: EMBEDDING_ONNX_DIR/<모델명>)")
+    parser.add_argument("--no-quantize", action="store_true", help="int8 양자화 모델을 만들지 않음")
+    parser.add_argument("--skip-export", action="store_true", help="이미 내보낸 모델로 검사/측정만")
+    parser.add_argument("--min-cosine", type=float, default=0.999, help="fp32 ONNX 최소 코사인")
+    parser.add_argument("--min-cosine-int8", type=float, default=0.98, help="int8 ONNX 최소 코사인")
+    parser.add_argument("--threads", type=int, default=None, help="ONNX intra-op 스레드 (기본: EMBEDDING_ONNX_THREADS)")
+    parser.add_argument("--texts", type=int, default=1000, help="벤치마크 코퍼스 크기")
+    parser.add_argument("--long-ratio", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-benchmark", action="store_true")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = args.output or default_onnx_dir(args.model)
+    reference_model = SentenceTransformer(args.model, device="cpu")
+    if not args.skip_export:
+        export_onnx(args.model, output_dir, quantize=not args.no_quantize, model=reference_model)
+
+    backends = {"torch": reference_model}
+    thresholds = {"onnx": args.min_cosine}
+    backends["onnx"] = OnnxSentenceEncoder(output_dir, quantized=False, intra_op_threads=args.threads)
+    if not args.no_quantize:
+        thresholds["onnx-int8"] = args.min_cosine_int8
+        backends["onnx-int8"] = OnnxSentenceEncoder(output_dir, quantized=True, intra_op_threads=args.threads)
+
+    texts = build_mixed_corpus(args.texts, args.long_ratio) + QUERIES
+    batches = plan_length_batches(texts, DEFAULT_TOKEN_BUDGET, max_length=reference_model.max_seq_length)
+    reference = reference_model.encode(texts, show_progress_bar=False)
+
+    print(f"\n[코사인 일치 검사] {len(texts)}개 텍스트, 기준: PyTorch")
+    passed = True
+    for name, threshold in thresholds.items():
+        parity = cosine_parity(reference, backends[name].encode(texts, show_progress_bar=False))
+        ok = parity["min"] >= threshold
+        passed &= ok
+        print(
+            f"  {name:<10} min {parity['min']:.5f}  p01 {parity['p01']:.5f}  mean {parity['mean']:.5f}"
+            f"  (기준 {threshold}) {'[OK]' if ok else '[ERROR]'}"
+        )
+
+    if not args.skip_benchmark:
+        print(f"\n[처리량] 길이 버킷 배치 {len(batches)}개, 반복 {args.repeat}회 중 최고")
+        print(f"  {'backend':<10} {'texts/s':>10} {'speedup':>9} {'query ms':>10}")
+        baseline = None
+        for name, model in backends.items():
+            model.encode(texts[:8], show_progress_bar=False)  # 워밍업
+            throughput = _throughput(model, texts, batches, args.repeat)
+            baseline = baseline or throughput
+            latency = _query_latency_ms(model, args.repeat)
+            print(f"  {name:<10} {throughput:>10.1f} {throughput / baseline:>8.2f}x {latency:>10.2f}")
+
+    if not passed:
+        print("\n[ERROR] 코사인 일치 기준 미달 → 해당 백엔드를 켜지 마세요")
+        sys.exit(1)
+    print(f"\n[OK] ONNX 모델: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+HNSW 파라미터 튜너
+
+실제 ChromaDB 컬렉션을 brute-force 기준으로 recall@k / p50 / p99 지연을 측정하고,
+--write 를 주면 선택된 값을 VectorDBConfig 의 hnsw_params.json 에 기록한다.
+
+    python scripts/tune_hnsw.py --collections card_check pdf_documents --k 10 --write
+
+search_ef 는 다음 startup 에서 기존 컬렉션에 바로 반영되고,
+M / construction_ef 는 컬렉션을 다시 만든 뒤(재인덱싱) 적용된다.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.db.vector.config.vector_db_config import VectorDBConfig
+from app.infrastructure.db.vector.hnsw_tuner import DEFAULT_GRID, choose_params, sample_queries, sweep
+from app.infrastructure.db.vector.vector_db import get_vector_db
+
+DEFAULT_COLLECTIONS = [
+    "korean_word_problems",
+    "card_check",
+    "pdf_documents",
+    "korean_word_problems_questions",
+    "card_check_questions",
+]
+
+
+def _embeddings(vector_db, name):
+    collection = vector_db.get_collection(name)
+    if not collection or collection.count() == 0:
+        return None
+    data = collection.get(include=["embeddings"])
+    return np.asarray(data["embeddings"], dtype=np.float32)
+
+
+def _int_list(text):
+    return tuple(int(value) for value in text.split(","))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="컬렉션당 질의 수")
+    parser.add_argument("--target-recall", type=float, default=0.99)
+    parser.add_argument("--m", type=_int_list, default=DEFAULT_GRID["M"])
+    parser.add_argument("--construction-ef", type=_int_list, default=DEFAULT_GRID["construction_ef"])
+    parser.add_argument("--search-ef", type=_int_list, default=DEFAULT_GRID["search_ef"])
+    parser.add_argument("--write", action="store_true", help="선택된 값을 hnsw_params.json 에 기록")
+    args = parser.parse_args()
+
+    grid = {"M": args.m, "construction_ef": args.construction_ef, "search_ef": args.search_ef}
+    vector_db = get_vector_db()
+    chosen_params = {}
+
+    for name in args.collections:
+        vectors = _embeddings(vector_db, name)
+        if vectors is None:
+            print(f"[SKIP] {name}: 비어 있거나 없음")
+            continue
+
+        # 질문 컬렉션이 있으면 그 임베딩을 실제 질의 분포로 사용
+        question_vectors = None if name.endswith("_questions") else _embeddings(vector_db, f"{name}_questions")
+        source = "가상 질문" if question_vectors is not None else "문서 샘플"
+        queries = sample_queries(question_vectors if question_vectors is not None else vectors, args.queries)
+
+        print(f"\n[{name}] 문서 {len(vectors)}개, 질의 {len(queries)}개 ({source}), recall@{args.k}")
+        print(f"  {'M':>4} {'c_ef':>5} {'s_ef':>5} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        results = sweep(vectors, queries, k=args.k, grid=grid)
+        for r in results:
+            print(
+                f"  {r['M']:>4} {r['construction_ef']:>5} {r['search_ef']:>5} "
+                f"{r['recall']:>7.4f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f}"
+            )
+
+        best = choose_params(results, args.target_recall)
+        current = VectorDBConfig.get_hnsw_params(name)
+        print(
+            f"  → 선택: M={best['M']}, construction_ef={best['construction_ef']}, "
+            f"search_ef={best['search_ef']} (recall={best['recall']:.4f}, p99={best['p99_ms']:.3f}ms) "
+            f"/ 현재 설정: {current}"
+        )
+        chosen_params[name] = {
+            "construction_ef": best["construction_ef"],
+            "M": best["M"],
+            "search_ef": best["search_ef"],
+        }
+
+    if args.write and chosen_params:
+        path = VectorDBConfig.save_hnsw_params(chosen_params)
+        print(f"\n[OK] {path} 갱신. M / construction_ef 변경분은 컬렉션 재생성 후 적용됩니다.")
+
+
+if __name__ == "__main__":
+    main()
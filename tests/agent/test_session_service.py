@@ -8,6 +8,7 @@ from app.domains.agent.models import AgentDecision, ChatMessage, ChatSession
 from app.domains.agent.repository.chat_session_repository import ChatSessionRepository
 from app.domains.agent.service.agent_service import AgentService, ChatSessionService
 from app.domains.progress.models import StudentWeaknessProfile, WeakConcept
+from app.infrastructure.search.search_scope import SearchScope
 
 
 # ---------------------------------------------------------------------------
@@ -253,3 +254,49 @@ async def test_agent_chat_returns_expected_shape():
     assert result["agent_action"] == "answer_with_rag"
     assert "rag_search" in result["used_tools"]
     assert "되/돼" in result["weak_concepts"]
+    mock_rag.search.assert_awaited_once_with(
+        "되/돼 차이가 뭐야?", scope=SearchScope(concept_key=["되/돼"])
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_rag_search_falls_back_to_unscoped_when_scope_is_empty():
+    mock_rag = MagicMock()
+    mock_rag.search = AsyncMock(
+        side_effect=[
+            MagicMock(documents=[], context="참고 자료가 없습니다."),
+            MagicMock(documents=["문서"], context="맞춤법 자료"),
+        ]
+    )
+    mock_learning = MagicMock()
+    mock_learning.get_weakness_profile.return_value = _weak_profile(["되/돼"])
+    mock_openai = MagicMock()
+    mock_openai.generate_response_with_context = AsyncMock(return_value="힌트야")
+
+    svc = AgentService(
+        session_service=make_session_service(),
+        rag_service=mock_rag,
+        learning_record_service=mock_learning,
+        openai_client=mock_openai,
+    )
+
+    result = await svc.chat(user_id="user_1", message="오늘 학교 재밌었어")
+
+    assert result["agent_action"] == "proactive_hint"
+    first, second = mock_rag.search.await_args_list
+    assert first.kwargs["scope"] == SearchScope(concept_key="되/돼")
+    assert "scope" not in second.kwargs
+    assert mock_openai.generate_response_with_context.await_args.kwargs["context"] == "맞춤법 자료"
+
+
+def test_rag_scope_matches_concept_words_in_free_text():
+    svc = make_agent_service_stub()
+    profile = _weak_profile(["되/돼", "맞추다/맞히다", "안/않다"])
+    decision = svc._decide("되 돼 차이가 뭐야?", profile, [])
+
+    assert svc.rag_scope("되 돼 차이가 뭐야?", profile, decision) == SearchScope(concept_key=["되/돼"])
+    assert svc.rag_scope("맞추는 거랑 맞히는 거 차이가 뭐야?", profile, decision) == SearchScope(
+        concept_key=["맞추다/맞히다"]
+    )
+    # 한쪽 단어만 나오면 개념 언급으로 보지 않는다
+    assert svc.rag_scope("이거 안 해도 돼?", profile, decision) is None
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.infrastructure.embedding.embedding_cache import EmbeddingCache
+
+
+class FakeEmbeddingModel:
+    def __init__(self, namespace="fake:model@1", dim=2):
+        self.cache_namespace = namespace
+        self.embedding_dimension = dim
+        self.calls = []
+
+    async def get_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+def test_cache_persists_vectors_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    model = FakeEmbeddingModel()
+    first = EmbeddingCache(path=path, enabled=True)
+    vectors = asyncio.run(first.embed(model, ["되 돼", "안 않다"]))
+    first.close()
+
+    second = EmbeddingCache(path=path, enabled=True)
+    again = asyncio.run(second.embed(model, ["안 않다", "되 돼", "새 문장"]))
+
+    assert model.calls == [["되 돼", "안 않다"], ["새 문장"]]
+    assert again[:2] == [vectors[1], vectors[0]]
+    assert second.stats()["hits"] == 2
+    assert second.stats()["entries"] == 3
+
+
+def test_namespace_separates_models(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+    asyncio.run(cache.embed(FakeEmbeddingModel("local:a@1"), ["텍스트"]))
+
+    other = FakeEmbeddingModel("local:b@1")
+    asyncio.run(cache.embed(other, ["텍스트"]))
+
+    assert other.calls == [["텍스트"]]
+
+
+def test_duplicate_texts_in_one_call_are_embedded_once(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+    model = FakeEmbeddingModel()
+
+    vectors = asyncio.run(cache.embed(model, ["같은 문장", "같은 문장"]))
+
+    assert model.calls == [["같은 문장"]]
+    assert vectors[0] == vectors[1]
+
+
+def test_vectors_with_unexpected_dimension_are_not_stored(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+
+    stored = cache.put_many("openai:ada@1", ["a", "b"], [[0.1] * 3, [0.1] * 2], dim=2)
+
+    assert stored == 1
+    assert cache.get_many("openai:ada@1", ["a", "b"])[0] is None
+
+
+def test_disabled_cache_calls_model_directly(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=False)
+    model = FakeEmbeddingModel()
+
+    asyncio.run(cache.embed(model, ["a"]))
+    asyncio.run(cache.embed(model, ["a"]))
+
+    assert model.calls == [["a"], ["a"]]
+    assert not (tmp_path / "cache.sqlite3").exists()
+
+
+def test_quantized_cache_uses_its_own_namespace(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache(path=path, enabled=True).put_many("local:a@1", ["텍스트"], [[0.1, 0.2]])
+
+    half = EmbeddingCache(path=path, enabled=True, dtype="float16")
+    assert half.get_many("local:a@1", ["텍스트"]) == [None]
+
+    half.put_many("local:a@1", ["텍스트"], [[0.1, 0.2]])
+    [vector] = half.get_many("local:a@1", ["텍스트"])
+    assert vector == pytest.approx([0.1, 0.2], abs=1e-3)
+    assert half.stats()["entries"] == 2
+
+
+def test_sqlite_access_runs_off_the_event_loop(tmp_path, monkeypatch):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+    threads = []
+    for name in ("get_many", "put_many"):
+        original = getattr(cache, name)
+
+        def record(*args, _original=original, **kwargs):
+            threads.append(threading.get_ident())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(cache, name, record)
+
+    async def run():
+        await cache.embed(FakeEmbeddingModel(), ["되 돼"])
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_lookup_errors_fall_back_to_embedding_everything(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+    model = FakeEmbeddingModel()
+    asyncio.run(cache.embed(model, ["되 돼"]))
+    cache._conn.execute("DROP TABLE embeddings")
+
+    vectors = asyncio.run(cache.embed(model, ["되 돼", "안 않다"]))
+
+    assert model.calls[-1] == ["되 돼", "안 않다"]
+    assert vectors == [[3.0, 0.5], [4.0, 0.5]]
+    assert "entries" not in cache.stats()
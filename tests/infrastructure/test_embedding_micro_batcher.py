@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.embedding.micro_batcher import EmbeddingMicroBatcher
+
+
+class FakeEncoder:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_one_batch():
+    encoder = FakeEncoder()
+    batcher = EmbeddingMicroBatcher(encoder, max_batch_size=32, max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed("질문" * (i + 1)) for i in range(10)))
+
+    results = asyncio.run(run())
+
+    assert len(encoder.calls) == 1
+    assert results == [[float(2 * (i + 1))] for i in range(10)]
+    assert batcher.stats()["avg_batch_size"] == 10
+
+
+def test_full_batch_flushes_without_waiting():
+    encoder = FakeEncoder()
+    # 대기 시간이 길어도 크기 한도에 닿으면 바로 flush
+    batcher = EmbeddingMicroBatcher(encoder, max_batch_size=4, max_wait_ms=10_000)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.embed(f"q{i}") for i in range(8))), 1.0)
+
+    asyncio.run(run())
+
+    assert [len(call) for call in encoder.calls] == [4, 4]
+
+
+def test_duplicate_texts_are_encoded_once():
+    encoder = FakeEncoder()
+    batcher = EmbeddingMicroBatcher(encoder, max_batch_size=32, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("되 돼 차이"), batcher.embed("되 돼 차이"), batcher.embed("안 않"))
+
+    results = asyncio.run(run())
+
+    assert encoder.calls == [["되 돼 차이", "안 않"]]
+    assert results[0] == results[1]
+
+
+def test_batch_failure_is_raised_to_every_caller():
+    batcher = EmbeddingMicroBatcher(FakeEncoder(error=RuntimeError("모델 오류")), max_batch_size=8, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_batch_task_cancels_every_caller():
+    started = asyncio.Event()
+
+    async def hanging_encoder(texts):
+        started.set()
+        await asyncio.Event().wait()
+
+    batcher = EmbeddingMicroBatcher(hanging_encoder, max_batch_size=2, max_wait_ms=10_000)
+
+    async def run():
+        callers = [asyncio.ensure_future(batcher.embed(text)) for text in ("되", "돼")]
+        await started.wait()
+        [queue] = batcher._queues.values()
+        for task in list(queue.tasks):
+            task.cancel()
+        return await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=1)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_batcher_works_across_event_loops():
+    encoder = FakeEncoder()
+    batcher = EmbeddingMicroBatcher(encoder, max_batch_size=8, max_wait_ms=1)
+
+    assert asyncio.run(batcher.embed("첫 번째")) == [4.0]
+    assert asyncio.run(batcher.embed("두 번째")) == [4.0]
+    assert len(encoder.calls) == 2
+
+
+def test_single_request_latency_is_bounded_by_wait():
+    batcher = EmbeddingMicroBatcher(FakeEncoder(), max_batch_size=32, max_wait_ms=5)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await batcher.embed("혼자 질문")
+        return loop.time() - started
+
+    assert asyncio.run(run()) == pytest.approx(0.005, abs=0.05)
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embedding import embedding_model as embedding_module
+from app.infrastructure.embedding.query_embedding_cache import QueryEmbeddingCache
+from app.infrastructure.embedding.sidecar import (
+    EmbeddingSidecarClient,
+    EmbeddingSidecarServer,
+    SidecarError,
+)
+
+MODEL_NAME = "fake-ko-model"
+
+
+class FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.encoded.append(list(texts))
+        return np.array([[float(len(text)), 1.0, 0.0] for text in texts])
+
+
+@pytest.fixture
+def socket_path():
+    # Unix 소켓 경로 길이 한도(~108바이트) 때문에 pytest tmp_path 대신 짧은 경로 사용
+    directory = tempfile.mkdtemp(prefix="sidecar-")
+    yield os.path.join(directory, "embed.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_with_server(socket_path, scenario, max_wait_ms=20, token_budget=None):
+    model = FakeModel()
+
+    async def main():
+        server = EmbeddingSidecarServer(
+            model, MODEL_NAME, socket_path, max_batch_size=32, max_wait_ms=max_wait_ms, token_budget=token_budget
+        )
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+
+    return model, asyncio.run(main())
+
+
+def test_round_trip_returns_float32_vectors(socket_path):
+    client = EmbeddingSidecarClient(socket_path, MODEL_NAME, timeout=5)
+
+    async def scenario(server):
+        return await client.embed(["되", "돼요"])
+
+    _, vectors = run_with_server(socket_path, scenario)
+
+    assert vectors.dtype == np.float32
+    assert vectors.tolist() == [[1.0, 1.0, 0.0], [2.0, 1.0, 0.0]]
+    assert client.dimension == 3
+    assert not os.path.exists(socket_path)
+
+
+def test_requests_from_several_clients_share_one_forward(socket_path):
+    clients = [EmbeddingSidecarClient(socket_path, MODEL_NAME, timeout=5) for _ in range(4)]
+
+    async def scenario(server):
+        return await asyncio.gather(*(client.embed([f"질문{i}"]) for i, client in enumerate(clients)))
+
+    model, results = run_with_server(socket_path, scenario, max_wait_ms=50)
+
+    assert len(model.encoded) == 1
+    assert sorted(model.encoded[0]) == [f"질문{i}" for i in range(4)]
+    assert [result.shape for result in results] == [(1, 3)] * 4
+
+
+def test_mixed_length_batch_is_encoded_in_length_buckets(socket_path):
+    client = EmbeddingSidecarClient(socket_path, MODEL_NAME, timeout=5)
+    texts = ["되", "가" * 40, "돼요", "나" * 38]
+
+    async def scenario(server):
+        return await client.embed(texts)
+
+    # 예산 90 토큰: 긴 텍스트 둘 (42 × 2), 짧은 텍스트 둘이 따로 forward
+    model, vectors = run_with_server(socket_path, scenario, token_budget=90)
+
+    assert model.encoded == [["가" * 40, "나" * 38], ["돼요", "되"]]
+    assert vectors[:, 0].tolist() == [1.0, 40.0, 2.0, 38.0]
+
+
+def test_model_mismatch_is_rejected(socket_path):
+    client = EmbeddingSidecarClient(socket_path, "other-model", timeout=5)
+
+    async def scenario(server):
+        with pytest.raises(SidecarError, match="모델 불일치"):
+            await client.embed(["되"])
+
+    model, _ = run_with_server(socket_path, scenario)
+    assert model.encoded == []
+
+
+def test_backend_mismatch_is_rejected(socket_path):
+    onnx_client = EmbeddingSidecarClient(socket_path, MODEL_NAME, timeout=5, backend="onnx-int8")
+    torch_client = EmbeddingSidecarClient(socket_path, MODEL_NAME, timeout=5)
+
+    async def scenario(server):
+        with pytest.raises(SidecarError, match="백엔드 불일치"):
+            await onnx_client.embed(["되"])
+        return await torch_client.embed(["되"])
+
+    model, vectors = run_with_server(socket_path, scenario)
+    assert model.encoded == [["되"]]
+    assert vectors.shape == (1, 3)
+
+
+def test_unreachable_sidecar_raises_sidecar_error(socket_path):
+    client = EmbeddingSidecarClient(socket_path, MODEL_NAME, timeout=1)
+
+    with pytest.raises(SidecarError, match="호출 실패"):
+        asyncio.run(client.embed(["되"]))
+
+
+def test_embedding_model_delegates_to_sidecar(socket_path, monkeypatch):
+    def fail_to_load(model_name):
+        raise AssertionError("사이드카 모드에서는 워커가 모델을 올리지 않아야 한다")
+
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.setenv("EMBEDDING_MICRO_BATCH", "0")
+    monkeypatch.setenv("EMBEDDING_SIDECAR_SOCKET", socket_path)
+    monkeypatch.setattr(embedding_module, "SentenceTransformer", fail_to_load)
+    cache = QueryEmbeddingCache(max_entries=16, ttl_seconds=0)
+    monkeypatch.setattr(embedding_module, "get_query_embedding_cache", lambda: cache)
+    embedding_model = embedding_module.EmbeddingModel(MODEL_NAME)
+
+    async def scenario(server):
+        return await embedding_model.get_embeddings(["안", "않다"])
+
+    try:
+        model, vectors = run_with_server(socket_path, scenario)
+    finally:
+        embedding_model.executor.shutdown(wait=False)
+
+    assert vectors == [[1.0, 1.0, 0.0], [2.0, 1.0, 0.0]]
+    assert embedding_model.model is None
+    assert embedding_model.embedding_dimension == 3
+    assert embedding_model.cache_namespace.startswith(f"local:{MODEL_NAME}@")
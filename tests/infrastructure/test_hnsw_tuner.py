@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+
+from app.infrastructure.db.vector.config.vector_db_config import VectorDBConfig
+from app.infrastructure.db.vector.hnsw_tuner import choose_params, exact_top_k, recall_at_k, sweep
+
+
+def test_exact_top_k_orders_by_cosine_similarity():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7], [-1.0, 0.0]], dtype=np.float32)
+    queries = np.array([[1.0, 0.1]], dtype=np.float32)
+
+    assert exact_top_k(vectors, queries, 3).tolist() == [[0, 2, 1]]
+
+
+def test_recall_at_k_counts_overlap_per_query():
+    exact = np.array([[0, 1], [2, 3]])
+
+    assert recall_at_k([[1, 0], [2, 9]], exact) == 0.75
+
+
+def test_choose_params_prefers_lowest_p99_meeting_recall_target():
+    results = [
+        {"M": 16, "construction_ef": 100, "search_ef": 10, "recall": 0.95, "p50_ms": 0.1, "p99_ms": 0.2},
+        {"M": 16, "construction_ef": 100, "search_ef": 40, "recall": 0.995, "p50_ms": 0.3, "p99_ms": 0.6},
+        {"M": 32, "construction_ef": 200, "search_ef": 40, "recall": 1.0, "p50_ms": 0.4, "p99_ms": 0.9},
+    ]
+
+    assert choose_params(results, 0.99)["search_ef"] == 40
+    assert choose_params(results, 0.99)["M"] == 16
+    # 목표를 아무도 못 넘으면 recall 최대
+    assert choose_params(results, 1.01)["M"] == 32
+
+
+def test_sweep_reports_recall_and_latency_for_each_combination():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 8)).astype(np.float32)
+
+    results = sweep(
+        vectors,
+        vectors[:20],
+        k=5,
+        grid={"M": (8,), "construction_ef": (64,), "search_ef": (10, 100)},
+    )
+
+    assert [(r["M"], r["construction_ef"], r["search_ef"]) for r in results] == [
+        (8, 64, 10),
+        (8, 64, 100),
+    ]
+    assert all(0.0 <= r["recall"] <= 1.0 and r["p99_ms"] >= r["p50_ms"] for r in results)
+    assert results[1]["recall"] >= 0.95
+
+
+def test_hnsw_params_are_read_per_collection_and_saved_back(tmp_path, monkeypatch):
+    path = tmp_path / "hnsw_params.json"
+    path.write_text(
+        json.dumps({"default": {"search_ef": 50}, "collections": {"pdf_documents": {"M": 32}}})
+    )
+    monkeypatch.setenv("HNSW_PARAMS_FILE", str(path))
+
+    assert VectorDBConfig.get_hnsw_params("card_check") == {
+        "construction_ef": 100,
+        "M": 16,
+        "search_ef": 50,
+    }
+    assert VectorDBConfig.get_hnsw_metadata("pdf_documents")["hnsw:M"] == 32
+
+    VectorDBConfig.save_hnsw_params({"card_check": {"M": 8, "construction_ef": 64, "search_ef": 20}})
+
+    saved = json.loads(path.read_text())
+    assert saved["collections"]["pdf_documents"] == {"M": 32}
+    assert VectorDBConfig.get_hnsw_params("card_check") == {
+        "construction_ef": 64,
+        "M": 8,
+        "search_ef": 20,
+    }
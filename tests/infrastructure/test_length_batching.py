@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embedding import embedding_model as embedding_module
+from app.infrastructure.embedding.length_batching import (
+    estimate_length,
+    fixed_batches,
+    padded_tokens,
+    plan_length_batches,
+)
+from app.infrastructure.embedding.query_embedding_cache import QueryEmbeddingCache
+
+SHORT = ["되", "돼요", "안 않"]
+LONG = ["가" * 300, "나" * 298]
+
+
+def test_batches_group_similar_lengths_within_budget():
+    texts = [SHORT[0], LONG[0], SHORT[1], LONG[1], SHORT[2]]
+
+    batches = plan_length_batches(texts, token_budget=700)
+
+    assert batches == [[1, 3], [4, 2, 0]]
+    lengths = [estimate_length(text) for text in texts]
+    for batch in batches:
+        assert max(lengths[i] for i in batch) * len(batch) <= 700
+    assert sorted(i for batch in batches for i in batch) == list(range(len(texts)))
+    assert padded_tokens(batches, lengths) < padded_tokens(fixed_batches(len(texts), 5), lengths)
+
+
+def test_text_longer_than_budget_gets_its_own_batch_and_item_cap_applies():
+    assert plan_length_batches(["가" * 100, "나"], token_budget=10) == [[0], [1]]
+    assert plan_length_batches(["가"] * 5, token_budget=10_000, max_items=2) == [[0, 1], [2, 3], [4]]
+
+
+def test_max_length_clips_estimates_like_truncation():
+    texts = ["가" * 800, "나" * 400]
+    # 둘 다 max_seq_length 로 잘리므로 같은 배치
+    assert plan_length_batches(texts, token_budget=256, max_length=128) == [[0, 1]]
+
+
+class FakeSentenceTransformer:
+    max_seq_length = 128
+
+    def __init__(self, model_name):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.calls.append((list(texts), batch_size))
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.fixture
+def local_model(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.setenv("EMBEDDING_MICRO_BATCH", "0")
+    monkeypatch.setenv("EMBEDDING_TOKEN_BUDGET", "300")
+    monkeypatch.setattr(embedding_module, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(embedding_module, "get_query_embedding_cache", lambda: QueryEmbeddingCache(max_entries=0))
+    model = embedding_module.EmbeddingModel("fake-ko-model")
+    yield model
+    model.executor.shutdown(wait=False)
+
+
+def test_local_embeddings_are_bucketed_and_returned_in_input_order(local_model):
+    texts = [SHORT[0], "가" * 500, SHORT[1], "나" * 120, SHORT[2]]
+
+    vectors = asyncio.run(local_model.get_embeddings(texts))
+
+    assert [vector[0] for vector in vectors] == [float(len(text)) for text in texts]
+    calls = local_model.model.calls
+    assert [batch for batch, _ in calls] == [["가" * 500, "나" * 120], [SHORT[2], SHORT[1], SHORT[0]]]
+    # sentence-transformers 가 배치를 다시 쪼개지 않는다
+    assert [batch_size for _, batch_size in calls] == [2, 3]
+
+
+def test_zero_budget_keeps_fixed_batches(local_model):
+    local_model.token_budget = 0
+    local_model.batch_size = 2
+    texts = ["가" * 500, SHORT[0], SHORT[1]]
+
+    asyncio.run(local_model.get_embeddings(texts))
+
+    assert [batch for batch, _ in local_model.model.calls] == [texts[:2], texts[2:]]
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embedding import embedding_model as embedding_module
+from app.infrastructure.embedding import onnx_backend
+from app.infrastructure.embedding.onnx_backend import (
+    CONFIG_FILE,
+    MODEL_FILE,
+    OnnxBackendError,
+    OnnxSentenceEncoder,
+    cosine_parity,
+    get_local_backend,
+)
+from app.infrastructure.embedding.query_embedding_cache import QueryEmbeddingCache
+from app.infrastructure.embedding.sidecar import EmbeddingSidecarServer, SidecarError
+
+pytest.importorskip("onnxruntime")
+
+SYLLABLES = "가나다라마바사아자차카타파하되돼요안않다예시문장입니내보기용"
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", *SYLLABLES, *(f"##{s}" for s in SYLLABLES)]
+
+
+def _write_tokenizer(directory):
+    from transformers import BertTokenizerFast
+
+    vocab_file = directory / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB), encoding="utf-8")
+    # 소문자화(NFD 악센트 제거)를 켜면 한글 음절이 자모로 분해된다
+    BertTokenizerFast(str(vocab_file), do_lower_case=False).save_pretrained(str(directory))
+
+
+def test_cosine_parity_summarizes_rowwise_similarity():
+    reference = np.array([[1.0, 0.0], [0.0, 2.0]])
+
+    assert cosine_parity(reference, reference * 3)["min"] == pytest.approx(1.0)
+    parity = cosine_parity(reference, np.array([[1.0, 1.0], [0.0, 1.0]]))
+    assert parity["min"] == pytest.approx(np.sqrt(0.5))
+    assert parity["mean"] == pytest.approx((np.sqrt(0.5) + 1) / 2)
+    with pytest.raises(ValueError):
+        cosine_parity(reference, reference[:1])
+
+
+@pytest.mark.parametrize(
+    "backend, quantize, expected",
+    [(None, None, "torch"), ("onnx", None, "onnx"), ("ONNX", "1", "onnx-int8"), ("torch", "1", "torch")],
+)
+def test_local_backend_from_env(monkeypatch, backend, quantize, expected):
+    for name, value in (("EMBEDDING_LOCAL_BACKEND", backend), ("EMBEDDING_ONNX_QUANTIZE", quantize)):
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+    assert get_local_backend() == expected
+
+
+def test_missing_export_raises_backend_error(tmp_path):
+    with pytest.raises(OnnxBackendError, match="export_onnx_embedder"):
+        OnnxSentenceEncoder(str(tmp_path))
+
+
+class FakeSession:
+    def __init__(self, path, options, providers):
+        self.path = path
+        self.options = options
+        self.feeds = []
+
+    def run(self, output_names, feed):
+        self.feeds.append(feed)
+        # 문장별 실제 토큰 수를 첫 차원에 담은 가짜 임베딩
+        tokens = feed["attention_mask"].sum(axis=1).astype(np.float64)
+        return [np.stack([tokens, np.ones_like(tokens)], axis=1)]
+
+
+def test_encoder_tokenizes_in_batches_and_feeds_int64_inputs(tmp_path, monkeypatch):
+    _write_tokenizer(tmp_path)
+    (tmp_path / MODEL_FILE).write_bytes(b"")
+    (tmp_path / CONFIG_FILE).write_text(
+        json.dumps(
+            {
+                "model_name": "fake-ko-model",
+                "input_names": ["input_ids", "attention_mask"],
+                "max_seq_length": 6,
+                "dimension": 2,
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(onnx_backend.ort, "InferenceSession", FakeSession)
+
+    encoder = OnnxSentenceEncoder(str(tmp_path), intra_op_threads=3)
+    vectors = encoder.encode(["가나", "다", "가나다라마바사아"], batch_size=2)
+
+    session = encoder.session
+    assert session.options.intra_op_num_threads == 3
+    assert session.options.inter_op_num_threads == 1
+    assert [sorted(feed) for feed in session.feeds] == [["attention_mask", "input_ids"]] * 2
+    assert all(array.dtype == np.int64 for feed in session.feeds for array in feed.values())
+    # [CLS] + 글자 + [SEP], max_seq_length 로 잘림
+    assert vectors.dtype == np.float32
+    assert vectors[:, 0].tolist() == [4.0, 3.0, 6.0]
+    assert encoder.encode([]).shape == (0, 2)
+
+
+class FakeSentenceTransformer:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        return np.array([[float(len(text)), 0.0] for text in texts])
+
+
+class FakeOnnxEncoder(FakeSentenceTransformer):
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.fixture
+def onnx_env(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.setenv("EMBEDDING_MICRO_BATCH", "0")
+    monkeypatch.setenv("EMBEDDING_LOCAL_BACKEND", "onnx")
+    monkeypatch.setenv("EMBEDDING_ONNX_QUANTIZE", "1")
+    monkeypatch.setattr(embedding_module, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(embedding_module, "get_query_embedding_cache", lambda: QueryEmbeddingCache(max_entries=0))
+    return monkeypatch
+
+
+def test_embedding_model_uses_onnx_encoder_with_separate_namespace(onnx_env):
+    loaded = []
+
+    def load(model_name, backend):
+        loaded.append((model_name, backend))
+        return FakeOnnxEncoder(model_name)
+
+    onnx_env.setattr(embedding_module, "load_onnx_encoder", load)
+    model = embedding_module.EmbeddingModel("fake-ko-model")
+    try:
+        vectors = asyncio.run(model.get_embeddings(["되", "돼요"]))
+    finally:
+        model.executor.shutdown(wait=False)
+
+    assert loaded == [("fake-ko-model", "onnx-int8")]
+    assert vectors == [[1.0, 1.0], [2.0, 1.0]]
+    assert model.cache_namespace == "local:fake-ko-model+onnx-int8@1"
+
+
+def test_embedding_model_falls_back_to_torch_without_export(onnx_env, tmp_path):
+    onnx_env.setenv("EMBEDDING_ONNX_DIR", str(tmp_path))
+    model = embedding_module.EmbeddingModel("fake-ko-model")
+    model.executor.shutdown(wait=False)
+
+    assert isinstance(model.model, FakeSentenceTransformer)
+    assert model.local_backend == "torch"
+    assert model.cache_namespace == "local:fake-ko-model@1"
+
+
+def test_export_round_trip_matches_pytorch(tmp_path):
+    pytest.importorskip("onnx")
+    from transformers import BertConfig, BertModel
+    from sentence_transformers import SentenceTransformer, models
+
+    model_dir = tmp_path / "tiny"
+    model_dir.mkdir()
+    _write_tokenizer(model_dir)
+    config = BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    BertModel(config).save_pretrained(str(model_dir))
+    transformer = models.Transformer(str(model_dir), max_seq_length=32)
+    reference_model = SentenceTransformer(modules=[transformer, models.Pooling(32)], device="cpu")
+
+    output_dir = tmp_path / "onnx"
+    paths = onnx_backend.export_onnx("tiny", str(output_dir), quantize=True, model=reference_model)
+
+    texts = ["되 돼요", "안 않다 예시 문장입니다", "가"]
+    reference = reference_model.encode(texts)
+    assert cosine_parity(reference, OnnxSentenceEncoder(str(output_dir)).encode(texts))["min"] > 0.9999
+    assert "quantized" in paths
+    assert OnnxSentenceEncoder(str(output_dir), quantized=True).encode(texts).shape == reference.shape
+
+
+def test_sidecar_with_a_different_backend_is_rejected(onnx_env):
+    directory = tempfile.mkdtemp(prefix="sidecar-")
+    socket_path = os.path.join(directory, "embed.sock")
+    onnx_env.setenv("EMBEDDING_SIDECAR_SOCKET", socket_path)
+    model = embedding_module.EmbeddingModel("fake-ko-model")
+    torch_sidecar = EmbeddingSidecarServer(FakeSentenceTransformer("fake-ko-model"), "fake-ko-model", socket_path)
+
+    async def scenario():
+        await torch_sidecar.start()
+        try:
+            with pytest.raises(SidecarError, match="백엔드 불일치"):
+                await model.get_embeddings(["되"])
+        finally:
+            await torch_sidecar.close()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        model.executor.shutdown(wait=False)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # 워커 설정(onnx-int8)의 네임스페이스로 torch 벡터가 캐시되지 않는다
+    assert model.cache_namespace == "local:fake-ko-model+onnx-int8@1"
+    assert model.query_cache.stats()["size"] == 0
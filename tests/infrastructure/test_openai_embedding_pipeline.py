@@ -0,0 +1,185 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import AuthenticationError, RateLimitError
+
+from app.infrastructure.embedding import embedding_model as embedding_module
+from app.infrastructure.embedding import rate_limiter
+from app.infrastructure.embedding.query_embedding_cache import QueryEmbeddingCache
+from app.infrastructure.embedding.rate_limiter import TokenBucketLimiter, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fake_sleep(clock, slept):
+    async def sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    return sleep
+
+
+def _api_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(status, request=request, headers=headers or {})
+    return cls("error", response=response, body=None)
+
+
+class FakeEmbeddings:
+    def __init__(self, failures=None, delay=0.0):
+        # failures: 호출 순서대로 던질 예외 목록
+        self.failures = list(failures or [])
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                raise self.failures.pop(0)
+            data = [SimpleNamespace(index=i, embedding=[float(len(text))] * 4) for i, text in enumerate(input)]
+            # 응답 순서가 바뀌어도 index 로 정렬
+            return SimpleNamespace(data=list(reversed(data)))
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def openai_model(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("EMBEDDING_MICRO_BATCH", "0")
+    monkeypatch.setattr(embedding_module, "get_query_embedding_cache", lambda: QueryEmbeddingCache(max_entries=0))
+    monkeypatch.setattr(embedding_module, "OPENAI_EMBEDDING_DIMENSION", 4)
+    monkeypatch.setattr(embedding_module, "RETRY_BASE_SECONDS", 0.001)
+    model = embedding_module.EmbeddingModel()
+    model.rate_limiter = TokenBucketLimiter(requests_per_minute=60_000, tokens_per_minute=10_000_000)
+    model.batch_size = 2
+    yield model
+    model.executor.shutdown(wait=False)
+
+
+def test_token_bucket_waits_for_request_budget():
+    clock, slept = FakeClock(), []
+    limiter = TokenBucketLimiter(60, 1_000_000, clock=clock, sleep=_fake_sleep(clock, slept))
+
+    async def run():
+        for _ in range(62):
+            await limiter.acquire(10)
+
+    asyncio.run(run())
+
+    # 버스트 60건 이후에는 초당 1건
+    assert slept == pytest.approx([1.0, 1.0])
+
+
+def test_token_bucket_waits_for_token_budget():
+    clock, slept = FakeClock(), []
+    limiter = TokenBucketLimiter(1000, 600, clock=clock, sleep=_fake_sleep(clock, slept))
+
+    async def run():
+        await limiter.acquire(600)
+        await limiter.acquire(300)
+
+    asyncio.run(run())
+
+    assert sum(slept) == pytest.approx(30.0)
+
+
+def test_estimate_tokens_counts_hangul_syllables():
+    assert estimate_tokens(["되 돼"]) >= 2
+    assert estimate_tokens(["", ""]) == 2
+
+
+def test_token_encoding_is_loaded_off_the_loop_and_only_at_warm_up(monkeypatch):
+    loaded_on = []
+
+    class FakeEncoding:
+        def encode(self, text):
+            return text.split()
+
+    def get_encoding(name):
+        loaded_on.append(threading.get_ident())
+        return FakeEncoding()
+
+    monkeypatch.setattr(rate_limiter, "_token_encoding", None)
+    monkeypatch.setattr(rate_limiter, "tiktoken", SimpleNamespace(get_encoding=get_encoding))
+
+    # 로드 전에는 파일을 받지 않고 근사치
+    assert estimate_tokens(["되 돼 안 않다"]) == 6
+    assert loaded_on == []
+
+    async def warm_up():
+        return await rate_limiter.warm_up_token_estimator(), threading.get_ident()
+
+    loaded, loop_thread = asyncio.run(warm_up())
+
+    assert loaded is True
+    assert loaded_on and loaded_on[0] != loop_thread
+    assert estimate_tokens(["되 돼 안 않다"]) == 4
+
+
+def test_batches_are_pipelined_with_bounded_concurrency(openai_model):
+    fake = FakeEmbeddings(delay=0.01)
+    openai_model.client = SimpleNamespace(embeddings=fake)
+    openai_model.openai_concurrency = 3
+    texts = [f"문장 {i}" * (i + 1) for i in range(12)]
+
+    vectors = asyncio.run(openai_model.get_embeddings(texts))
+
+    assert len(fake.calls) == 6
+    assert fake.max_in_flight == 3
+    assert vectors == [[float(len(text))] * 4 for text in texts]
+
+
+def test_retryable_errors_are_retried_with_backoff(openai_model):
+    fake = FakeEmbeddings(failures=[_api_error(RateLimitError, 429), _api_error(RateLimitError, 429)])
+    openai_model.client = SimpleNamespace(embeddings=fake)
+
+    vectors = asyncio.run(openai_model.get_embeddings(["되 돼"]))
+
+    assert len(fake.calls) == 3
+    assert vectors == [[3.0] * 4]
+
+
+def test_exhausted_retries_raise_instead_of_local_fallback(openai_model, monkeypatch):
+    fake = FakeEmbeddings(failures=[_api_error(RateLimitError, 429)] * 3)
+    openai_model.client = SimpleNamespace(embeddings=fake)
+    openai_model.openai_max_retries = 2
+
+    async def local_fallback(texts):
+        raise AssertionError("로컬 모델로 대체하면 안 된다")
+
+    monkeypatch.setattr(openai_model, "_get_local_embeddings_batch", local_fallback)
+
+    with pytest.raises(embedding_module.EmbeddingError):
+        asyncio.run(openai_model.get_embeddings(["되 돼"]))
+    assert len(fake.calls) == 3
+
+
+def test_non_retryable_error_fails_immediately(openai_model):
+    fake = FakeEmbeddings(failures=[_api_error(AuthenticationError, 401)])
+    openai_model.client = SimpleNamespace(embeddings=fake)
+
+    with pytest.raises(embedding_module.EmbeddingError):
+        asyncio.run(openai_model.get_embeddings(["되 돼"]))
+    assert len(fake.calls) == 1
+
+
+def test_backoff_respects_retry_after():
+    assert embedding_module._backoff_delay(0, retry_after=7.0) >= 7.0
+    assert embedding_module._retry_after(_api_error(RateLimitError, 429, {"retry-after": "3"})) == 3.0
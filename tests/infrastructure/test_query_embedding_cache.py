@@ -0,0 +1,133 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embedding import embedding_model as embedding_module
+from app.infrastructure.embedding.query_embedding_cache import QueryEmbeddingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSentenceTransformer:
+    instances = []
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.encoded = []
+        FakeSentenceTransformer.instances.append(self)
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.encoded.append(list(texts))
+        return np.array([[float(len(text)), 1.0, 0.0] for text in texts])
+
+
+@pytest.fixture
+def local_model(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.setenv("EMBEDDING_MICRO_BATCH", "0")
+    monkeypatch.setattr(embedding_module, "SentenceTransformer", FakeSentenceTransformer)
+    cache = QueryEmbeddingCache(max_entries=16, ttl_seconds=0)
+    monkeypatch.setattr(embedding_module, "get_query_embedding_cache", lambda: cache)
+    model = embedding_module.EmbeddingModel("fake-ko-model")
+    yield model
+    model.executor.shutdown(wait=False)
+
+
+def test_lru_evicts_least_recently_used_and_tracks_memory():
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=0)
+    cache.put("m", "a", [1.0, 2.0])
+    cache.put("m", "b", [3.0, 4.0])
+    assert cache.get("m", "a") == [1.0, 2.0]
+
+    cache.put("m", "c", [5.0, 6.0])
+
+    assert cache.get("m", "b") is None
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] > 0
+    assert stats["hit_rate"] == 0.5
+
+
+def test_ttl_expires_entries():
+    clock = FakeClock()
+    cache = QueryEmbeddingCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("m", "되 돼", [1.0])
+
+    clock.now = 11
+
+    assert cache.get("m", "되 돼") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_keys_are_normalized_and_namespaced():
+    cache = QueryEmbeddingCache(max_entries=4, ttl_seconds=0)
+    cache.put("local:a", "되 돼  차이 ", [1.0])
+
+    assert cache.get("local:a", "되 돼 차이") == [1.0]
+    assert cache.get("local:b", "되 돼 차이") is None
+
+
+def test_cached_vector_is_a_copy():
+    cache = QueryEmbeddingCache(max_entries=4, ttl_seconds=0)
+    cache.put("m", "q", [1.0, 2.0])
+
+    cache.get("m", "q").append(3.0)
+
+    assert cache.get("m", "q") == [1.0, 2.0]
+
+
+def test_embedding_model_reuses_query_embeddings(local_model):
+    first = asyncio.run(local_model.get_embedding("되 돼 차이가 뭐야?"))
+    second = asyncio.run(local_model.get_embedding("되 돼 차이가 뭐야?"))
+    batch = asyncio.run(local_model.get_embeddings(["되 돼 차이가 뭐야?", "안 않다"]))
+
+    assert first == second == batch[0]
+    assert local_model.model.encoded == [["되 돼 차이가 뭐야?"], ["안 않다"]]
+    assert local_model.query_cache.stats()["hits"] == 2
+
+
+def test_embedding_model_does_not_cache_wrong_dimension(local_model, monkeypatch):
+    async def wrong_dimension(texts):
+        return [[0.0] * 5 for _ in texts]
+
+    monkeypatch.setattr(local_model, "_get_local_embeddings_batch", wrong_dimension)
+
+    asyncio.run(local_model.get_embedding("차원이 다른 결과"))
+
+    assert local_model.query_cache.stats()["size"] == 0
+
+
+def test_int8_entries_are_smaller_and_close_to_original():
+    vector = [0.5, -0.25, 0.125, 1.0] * 16
+    full = QueryEmbeddingCache(max_entries=4, dtype="float32")
+    int8 = QueryEmbeddingCache(max_entries=4, dtype="int8")
+    full.put("m", "q", vector)
+    int8.put("m", "q", vector)
+
+    assert int8.stats()["memory_bytes"] < full.stats()["memory_bytes"]
+    assert full.get("m", "q") == vector
+    assert max(abs(a - b) for a, b in zip(int8.get("m", "q"), vector)) < 1e-2
+
+
+def test_bulk_embeddings_do_not_fill_the_query_lru(local_model):
+    asyncio.run(local_model.get_embedding("되 돼 차이가 뭐야?"))
+    asyncio.run(local_model.get_embeddings([f"카드 {i}" for i in range(40)]))
+
+    assert local_model.query_cache.stats()["size"] == 1
+    assert asyncio.run(local_model.get_embeddings(["되 돼 차이가 뭐야?"])) == [[11.0, 1.0, 0.0]]
+    # 마지막 호출은 LRU 적중이라 모델에 가지 않았다
+    assert "되 돼 차이가 뭐야?" not in local_model.model.encoded[-1]
+
+    asyncio.run(local_model.get_embeddings(["안 않다", "잊다 잃다"], cache_queries=True))
+    assert local_model.query_cache.stats()["size"] == 3
@@ -0,0 +1,91 @@
+import numpy as np
+
+from app.infrastructure.search.bm25_doc_store import BM25DocStore
+
+
+def _store():
+    store = BM25DocStore()
+    store.extend(
+        ["card_0", "card_1"],
+        "card_check",
+        ["단어: 되/돼", "단어: 맞히다/맞추다"],
+        [{"word": "되/돼"}, None],
+    )
+    store.extend(["rule_1"], "pdf_documents", ["제1항 한글 맞춤법"], [{"page": 1}])
+    return store
+
+
+def test_rows_decode_text_collection_and_metadata():
+    store = _store()
+
+    assert len(store) == 3
+    assert [store.doc_id(row) for row in range(3)] == ["card_0", "card_1", "rule_1"]
+    assert [store.collection(row) for row in range(3)] == ["card_check", "card_check", "pdf_documents"]
+    assert store.document(1) == "단어: 맞히다/맞추다"
+    assert store.metadata(0) == {"word": "되/돼"}
+    assert store.metadata(1) == {}
+    assert store.rows_in_collection("card_check").tolist() == [0, 1]
+    assert store.rows_in_collection("unknown").tolist() == []
+
+
+def test_save_drops_cleared_rows_and_load_is_appendable(tmp_path):
+    store = _store()
+    store.clear([1])
+    assert store.document(1) == ""
+
+    store.save(str(tmp_path))
+    loaded = BM25DocStore.load(str(tmp_path))
+
+    # row 번호는 유지되고, 삭제된 행의 본문만 버퍼에서 빠진다
+    assert [loaded.doc_id(row) for row in range(3)] == ["card_0", "card_1", "rule_1"]
+    assert loaded.document(1) == ""
+    assert loaded.document(2) == "제1항 한글 맞춤법"
+    assert loaded.metadata(2) == {"page": 1}
+    assert loaded.nbytes < store.nbytes
+
+    loaded.extend(["card_2"], "card_check", ["단어: 가르치다"], [{"word": "가르치다"}])
+    assert loaded.document(3) == "단어: 가르치다"
+    assert loaded.collection(3) == "card_check"
+    assert loaded.rows_in_collection("card_check").tolist() == [0, 1, 3]
+    assert loaded.document(0) == "단어: 되/돼"
+
+
+def test_scope_rows_survive_save_and_load(tmp_path):
+    store = BM25DocStore()
+    store.extend(
+        ["card_0", "card_1", "rule_1"],
+        "card_check",
+        ["단어: 되/돼", "단어: 안/않다", "제1항"],
+        [
+            {"lesson_id": "lesson_4", "concept_key": "되/돼"},
+            {"lesson_id": "lesson_4", "concept_key": "안/않다"},
+            {"document_type": "official_grammar_rule"},
+        ],
+    )
+    assert store.rows_matching({"lesson_id": ["lesson_4"]}).tolist() == [0, 1]
+    assert store.rows_matching({"lesson_id": ["lesson_4"], "concept_key": ["안/않다"]}).tolist() == [1]
+    assert store.rows_matching({"concept_key": ["없음"]}).tolist() == []
+
+    store.clear([0])
+    store.save(str(tmp_path))
+    loaded = BM25DocStore.load(str(tmp_path))
+
+    assert loaded.rows_matching({"lesson_id": ["lesson_4"]}).tolist() == [1]
+    assert loaded.rows_matching({"document_type": ["official_grammar_rule"]}).tolist() == [2]
+    assert loaded.collections_of(loaded.rows_matching({"lesson_id": ["lesson_4"]})) == ["card_check"]
+
+
+def test_collection_lookups_use_row_ranges_not_the_collection_array(tmp_path):
+    store = _store()
+    store.extend(["card_2"], "card_check", ["단어: 가르치다"], None)
+    store.save(str(tmp_path))
+    loaded = BM25DocStore.load(str(tmp_path))
+
+    for docs in (store, loaded):
+        # 질의 경로는 컬렉션 배열을 읽지 않는다 (빌드/로드 때 만든 구간만 사용)
+        docs._collections = None
+        assert docs.collections_of(np.array([1, 3])) == ["card_check"]
+        assert docs.collections_of(np.array([0, 2])) == ["card_check", "pdf_documents"]
+        assert docs.collections_of(np.array([], dtype=np.int64)) == []
+        assert docs.rows_in_collection("card_check").tolist() == [0, 1, 3]
+        assert docs.rows_in_collection("pdf_documents").tolist() == [2]
@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.infrastructure.search.bm25_index import BM25Index
+from app.infrastructure.search.tokenizer import tokenize
+
+rank_bm25 = pytest.importorskip("rank_bm25")
+
+WORDS = [
+    "되다", "돼요", "안", "돼", "맞히다", "맞추다", "정답을", "문제를", "띄어쓰기",
+    "받침", "소리", "표준어", "원칙으로", "한다", "어법에", "맞도록", "학교에", "갔다",
+]
+
+
+def _synthetic_corpus(n_docs, seed=7):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20)))
+        for _ in range(n_docs)
+    ]
+
+
+@pytest.mark.parametrize("query", ["되와 돼의 차이가 뭐야?", "정답을 맞히다", "없는단어"])
+def test_scores_match_bm25okapi(query):
+    tokenized = [tokenize(doc) for doc in _synthetic_corpus(300)]
+    reference = rank_bm25.BM25Okapi(tokenized)
+    index = BM25Index(tokenized)
+
+    tokens = tokenize(query)
+
+    np.testing.assert_allclose(index.get_scores(tokens), reference.get_scores(tokens))
+
+
+def test_top_k_returns_highest_positive_scores_in_order():
+    tokenized = [tokenize(doc) for doc in _synthetic_corpus(300)]
+    reference = rank_bm25.BM25Okapi(tokenized)
+    index = BM25Index(tokenized)
+    tokens = tokenize("받침 소리 표준어")
+
+    doc_indices, scores = index.top_k(tokens, 10)
+
+    expected = np.sort(reference.get_scores(tokens))[::-1][:10]
+    np.testing.assert_allclose(scores, expected)
+    assert np.all(np.diff(scores) <= 0)
+    np.testing.assert_allclose(index.get_scores(tokens)[doc_indices], scores)
+
+
+def test_batch_scores_match_full_scores():
+    tokenized = [tokenize(doc) for doc in _synthetic_corpus(100)]
+    index = BM25Index(tokenized)
+    tokens = tokenize("학교에 갔다")
+
+    subset = [3, 50, 99, 0]
+
+    np.testing.assert_allclose(
+        index.get_batch_scores(tokens, subset), index.get_scores(tokens)[subset]
+    )
+
+
+def test_unknown_query_returns_empty_top_k():
+    index = BM25Index([tokenize("되다 돼요")])
+
+    doc_indices, scores = index.top_k(tokenize("xyz"), 5)
+
+    assert len(doc_indices) == 0
+    assert len(scores) == 0
+
+
+def _assert_matches_fresh_build(index, live_docs, query):
+    tokens = tokenize(query)
+    reference = rank_bm25.BM25Okapi(live_docs)
+    live_rows = np.flatnonzero(index.live)
+
+    np.testing.assert_allclose(index.get_scores(tokens)[live_rows], reference.get_scores(tokens))
+
+
+def test_incremental_add_and_delete_match_fresh_build():
+    corpus = [tokenize(doc) for doc in _synthetic_corpus(120)]
+    index = BM25Index(corpus[:100])
+
+    index.add_documents(corpus[100:110])
+    index.add_documents(corpus[110:])
+    index.delete_documents([0, 5, 105, 119])
+
+    live_docs = [doc for row, doc in enumerate(corpus) if row not in {0, 5, 105, 119}]
+    assert index.corpus_size == len(live_docs)
+    assert len(index.segments) == 3
+    _assert_matches_fresh_build(index, live_docs, "정답을 맞히다")
+
+
+def test_merge_segments_drops_deleted_postings_and_keeps_scores():
+    corpus = [tokenize(doc) for doc in _synthetic_corpus(60)]
+    index = BM25Index(corpus[:30])
+    index.add_documents(corpus[30:])
+    index.delete_documents([1, 2, 40])
+    before = index.get_scores(tokenize("받침 소리"))
+
+    assert index.merge_segments() is True
+
+    assert len(index.segments) == 1
+    assert not np.isin(index.segments[0].docs, [1, 2, 40]).any()
+    np.testing.assert_allclose(index.get_scores(tokenize("받침 소리")), before)
@@ -0,0 +1,192 @@
+from app.infrastructure.search.bm25_retriever import BM25Retriever
+from app.infrastructure.search.search_scope import SearchScope
+
+
+CORPUS = {
+    "card_check": [
+        ("card_0", "단어: 되/돼 의미: 돼는 되어의 줄임말"),
+        ("card_1", "단어: 맞히다/맞추다 의미: 정답을 맞히다"),
+    ],
+    "korean_word_problems": [
+        ("question_1", "문제 1: 그렇게 하면 안 ( ). 정답: 돼"),
+        ("question_2", "문제 2: 시험 문제를 ( ). 정답: 맞혔다"),
+    ],
+    "pdf_documents": [
+        ("korean_grammar_rule_1", "제1항: 한글 맞춤법은 표준어를 소리대로 적되 어법에 맞도록 함을 원칙으로 한다"),
+        ("korean_grammar_rule_2", "제2항: 문장의 각 단어는 띄어 씀을 원칙으로 한다"),
+    ],
+}
+
+
+class FakeCollection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include):
+        return {
+            "ids": [row[0] for row in self.rows],
+            "documents": [row[1] for row in self.rows],
+            "metadatas": [{"collection": "fake"} for _ in self.rows],
+        }
+
+
+class FakeVectorDB:
+    def get_collection(self, name):
+        rows = CORPUS.get(name)
+        return FakeCollection(rows) if rows else None
+
+
+def _build_retriever():
+    retriever = BM25Retriever()
+    retriever.build_index(FakeVectorDB())
+    return retriever
+
+
+def test_search_ranks_keyword_match_first():
+    retriever = _build_retriever()
+
+    results = retriever.search("되와 돼의 차이", n_results=3)
+
+    assert results[0][0] == "card_0"
+    assert results[0][2] == "card_check"
+
+
+def test_score_candidates_matches_full_scan_scores():
+    retriever = _build_retriever()
+    full_scores = {r[0]: r[3] for r in retriever.search("맞히다 정답", n_results=10)}
+
+    candidates = retriever.score_candidates("맞히다 정답", ["question_2", "card_1", "missing"])
+
+    assert [r[0] for r in candidates] == sorted(
+        ["question_2", "card_1"], key=lambda d: full_scores[d], reverse=True
+    )
+    for doc_id, _, _, score, _ in candidates:
+        assert abs(score - full_scores[doc_id]) < 1e-9
+
+
+def test_upsert_replaces_existing_document_without_rebuild():
+    retriever = _build_retriever()
+
+    retriever.upsert_documents("card_check", ["card_0"], ["단어: 띄어쓰기 의미: 단어 사이를 띄운다"])
+
+    assert retriever.search("되와 돼의 차이", n_results=3)[0][0] != "card_0"
+    assert retriever.search("띄어쓰기", n_results=1)[0][0] == "card_0"
+    assert retriever._bm25.corpus_size == 6
+
+
+def test_upsert_ignores_collections_outside_bm25_index():
+    retriever = _build_retriever()
+
+    added = retriever.upsert_documents("card_check_questions", ["hq_card_0_0"], ["되랑 돼 뭐가 달라?"])
+
+    assert added == 0
+    assert retriever._bm25.corpus_size == 6
+
+
+def test_delete_collection_removes_only_that_collection():
+    retriever = _build_retriever()
+
+    removed = retriever.delete_collection("pdf_documents")
+
+    assert removed == 2
+    assert all(r[2] != "pdf_documents" for r in retriever.search("원칙으로 한다", n_results=10))
+    assert retriever.search("되와 돼의 차이", n_results=1)[0][0] == "card_0"
+
+
+def test_segments_are_merged_in_background_past_limit():
+    retriever = _build_retriever()
+    retriever.max_segments = 3
+
+    retriever.upsert_documents("card_check", ["card_2"], ["단어: 받침 의미: 글자 아래 자음"])
+    retriever._merge_future.result()
+
+    # 컬렉션(샤드)마다 세그먼트 하나로 병합
+    assert [seg.shard for seg in retriever._bm25.segments] == [
+        "card_check",
+        "korean_word_problems",
+        "pdf_documents",
+    ]
+    assert retriever.search("받침", n_results=1)[0][0] == "card_2"
+
+
+def test_collection_filter_searches_only_requested_shard():
+    retriever = _build_retriever()
+    unfiltered = {r[0]: r[3] for r in retriever.search("정답을 맞히다", n_results=10)}
+
+    filtered = retriever.search("정답을 맞히다", n_results=10, collection_names=["korean_word_problems"])
+
+    assert filtered
+    assert {r[2] for r in filtered} == {"korean_word_problems"}
+    # 통계는 전역 공유 → 필터 검색 점수가 전역 검색 점수와 같다
+    for doc_id, _, _, score, _ in filtered:
+        assert abs(score - unfiltered[doc_id]) < 1e-9
+
+
+def test_scope_restricts_rows_before_scoring():
+    retriever = BM25Retriever()
+    retriever.upsert_documents(
+        "card_check",
+        ["card_0", "card_1"],
+        ["단어: 되/돼 의미: 돼는 되어의 줄임말", "단어: 맞히다/맞추다 의미: 정답을 맞히다"],
+        [{"concept_key": "되/돼", "lesson_id": "lesson_4"}, {"concept_key": "맞추다/맞히다", "lesson_id": "lesson_1"}],
+    )
+    retriever.upsert_documents(
+        "korean_word_problems",
+        ["lesson_4_q1"],
+        ["문제 1: 그렇게 하면 안 ( ). 정답: 돼"],
+        [{"concept_key": "되/돼", "lesson_id": "lesson_4"}],
+    )
+    unscoped = {r[0]: r[3] for r in retriever.search("정답 돼", n_results=10)}
+
+    scoped = retriever.search("정답 돼", n_results=10, scope=SearchScope(concept_key="되/돼"))
+
+    assert {r[0] for r in scoped} == {"card_0", "lesson_4_q1"}
+    # 범위 검색도 전역 통계를 쓰므로 점수는 전체 검색과 같다
+    for doc_id, _, _, score, _ in scoped:
+        assert abs(score - unscoped[doc_id]) < 1e-9
+
+    both = SearchScope(concept_key="되/돼", lesson_id="lesson_4")
+    assert [r[0] for r in retriever.search("정답 돼", collection_names=["card_check"], scope=both)] == [
+        "card_0"
+    ]
+    assert retriever.search("정답 돼", scope=SearchScope(lesson_id="lesson_9")) == []
+
+    # 교체된 문서는 이전 범위 값으로 걸리지 않는다
+    retriever.upsert_documents("card_check", ["card_0"], ["단어: 되/돼"], [{"concept_key": "안/않다"}])
+    scoped = retriever.search("정답 돼", n_results=10, scope=SearchScope(concept_key="되/돼"))
+    assert {r[0] for r in scoped} == {"lesson_4_q1"}
+
+
+def test_get_documents_returns_live_rows_only():
+    retriever = _build_retriever()
+    retriever.delete_documents(["card_1"])
+
+    found = retriever.get_documents(["card_0", "card_1", "unknown"])
+
+    assert found == {"card_0": ("단어: 되/돼 의미: 돼는 되어의 줄임말", {"collection": "fake"})}
+
+
+def test_concept_scope_keeps_grammar_rules_without_concept_keys():
+    retriever = BM25Retriever()
+    retriever.upsert_documents(
+        "card_check",
+        ["card_0", "card_1"],
+        ["단어: 되/돼 의미: 돼는 되어의 줄임말", "단어: 맞히다/맞추다 의미: 정답을 맞히다"],
+        [{"concept_key": "되/돼"}, {"concept_key": "맞추다/맞히다"}],
+    )
+    retriever.upsert_documents(
+        "pdf_documents",
+        ["korean_grammar_rule_1"],
+        ["제35항: 되어 가 줄어 돼 로 될 적에는 준 대로 적는다"],
+        [{"document_type": "official_grammar_rule"}],
+    )
+
+    scoped = retriever.search("되어 돼", n_results=10, scope=SearchScope(concept_key="되/돼"))
+    assert {r[0] for r in scoped} == {"card_0", "korean_grammar_rule_1"}
+
+    # 문서 유형 범위는 PDF 에도 그대로 적용된다
+    cards_only = SearchScope(concept_key="되/돼", document_type="card")
+    assert [r[0] for r in retriever.search("되어 돼", scope=cards_only)] == []
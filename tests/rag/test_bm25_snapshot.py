@@ -0,0 +1,146 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.infrastructure.search.bm25_retriever import BM25Retriever
+from app.infrastructure.search.index_generation import bump_index_generation, read_bm25_generation
+
+
+CORPUS = {
+    "card_check": [
+        ("card_0", "단어: 되/돼 의미: 돼는 되어의 줄임말"),
+        ("card_1", "단어: 맞히다/맞추다 의미: 정답을 맞히다"),
+    ],
+    "pdf_documents": [
+        ("korean_grammar_rule_2", "제2항: 문장의 각 단어는 띄어 씀을 원칙으로 한다"),
+    ],
+}
+
+
+class FakeCollection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include):
+        return {
+            "ids": [row[0] for row in self.rows],
+            "documents": [row[1] for row in self.rows],
+            "metadatas": [{"source": "fake"} for _ in self.rows],
+        }
+
+
+class FakeVectorDB:
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def get_collection(self, name):
+        rows = self.corpus.get(name)
+        return FakeCollection(rows) if rows else None
+
+
+@pytest.fixture(autouse=True)
+def snapshot_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("BM25_SNAPSHOT_DIR", str(tmp_path / "bm25_snapshot"))
+    monkeypatch.setenv("INDEX_GENERATION_FILE", str(tmp_path / "index_generation"))
+
+
+def _saved_retriever(vector_db):
+    retriever = BM25Retriever()
+    retriever.build_index(vector_db)
+    retriever.save_snapshot(vector_db)
+    return retriever
+
+
+def test_snapshot_round_trip_uses_memmap_and_same_results():
+    vector_db = FakeVectorDB(CORPUS)
+    original = _saved_retriever(vector_db)
+
+    loaded = BM25Retriever()
+    assert loaded.load_snapshot(vector_db) is True
+
+    assert isinstance(loaded._bm25.segments[0].docs, np.memmap)
+    assert loaded.search("되와 돼의 차이") == original.search("되와 돼의 차이")
+    assert loaded.search("띄어 씀") == original.search("띄어 씀")
+
+
+def test_snapshot_is_stale_after_generation_bump():
+    vector_db = FakeVectorDB(CORPUS)
+    _saved_retriever(vector_db)
+
+    bump_index_generation()
+
+    assert BM25Retriever().load_snapshot(vector_db) is False
+
+
+def test_snapshot_directory_is_named_after_bm25_generation():
+    vector_db = FakeVectorDB(CORPUS)
+    bump_index_generation()
+    bump_index_generation(affects_bm25=False)
+
+    path = _saved_retriever(vector_db).save_snapshot(vector_db)
+
+    assert os.path.basename(path).startswith("gen-000001-")
+
+
+def test_snapshot_survives_question_only_generation_bump():
+    vector_db = FakeVectorDB(CORPUS)
+    _saved_retriever(vector_db)
+
+    # 가상 질문 생성: 검색 캐시용 세대만 오르고 BM25 세대는 그대로
+    bump_index_generation(affects_bm25=False)
+
+    assert BM25Retriever().load_snapshot(vector_db) is True
+
+
+def test_snapshot_is_stale_when_collection_counts_change():
+    _saved_retriever(FakeVectorDB(CORPUS))
+    changed = dict(CORPUS, card_check=CORPUS["card_check"][:1])
+
+    assert BM25Retriever().load_snapshot(FakeVectorDB(changed)) is False
+
+
+def test_loaded_snapshot_accepts_incremental_updates():
+    vector_db = FakeVectorDB(CORPUS)
+    original = _saved_retriever(vector_db)
+    original.delete_documents(["card_1"])
+    original.save_snapshot(vector_db)
+
+    loaded = BM25Retriever()
+    assert loaded.load_snapshot(vector_db) is True
+    loaded.upsert_documents(
+        "card_check",
+        ["card_0", "card_2"],
+        ["단어: 받침 의미: 글자 아래 자음", "단어: 소리 의미: 귀로 듣는 것"],
+    )
+
+    assert loaded.search("받침", n_results=1)[0][0] == "card_0"
+    assert all(r[0] != "card_1" for r in loaded.search("맞히다 정답"))
+
+
+def test_other_worker_reloads_after_incremental_update_and_own_bump_is_acknowledged():
+    corpus = {name: list(rows) for name, rows in CORPUS.items()}
+    vector_db = FakeVectorDB(corpus)
+    writer = _saved_retriever(vector_db)
+    reader = BM25Retriever()
+    assert reader.load_snapshot(vector_db) is True
+    writer.generation_check_interval = reader.generation_check_interval = 0
+
+    # writer 워커가 /admin 요청으로 카드를 추가 (IndexingService 와 같은 순서)
+    corpus["card_check"].append(("card_2", "단어: 받침 의미: 글자 아래 자음"))
+    writer.upsert_documents("card_check", ["card_2"], ["단어: 받침 의미: 글자 아래 자음"])
+    bump_index_generation()
+    writer.acknowledge_generation(read_bm25_generation())
+    writer.save_snapshot(vector_db)
+
+    assert writer.search("받침", n_results=1)[0][0] == "card_2"
+    assert writer._reload_thread is None
+
+    # reader 워커는 세대 변경을 보고 백그라운드에서 새 스냅샷을 로드 (그동안은 기존 인덱스로 검색)
+    assert reader.search("받침", n_results=1) == []
+    reader._reload_thread.join(timeout=5)
+    assert reader.search("받침", n_results=1)[0][0] == "card_2"
+    assert isinstance(reader._bm25.segments[0].docs, np.memmap)
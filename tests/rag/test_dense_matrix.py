@@ -0,0 +1,232 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.infrastructure.search.dense_matrix import DenseMatrixIndex
+from app.infrastructure.search.index_generation import bump_index_generation
+from app.infrastructure.search.hybrid_search import HybridSearchService
+from app.infrastructure.search.search_scope import SearchScope
+
+
+@pytest.fixture(autouse=True)
+def generation_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("INDEX_GENERATION_FILE", str(tmp_path / "index_generation"))
+
+
+class FakeCollection:
+    def __init__(self, ids, embeddings, documents, metadatas):
+        self.ids = ids
+        self.embeddings = embeddings
+        self.documents = documents
+        self.metadatas = metadatas
+        self.query_calls = 0
+
+    def get(self, include):
+        return {
+            "ids": list(self.ids),
+            "embeddings": np.asarray(self.embeddings),
+            "documents": list(self.documents),
+            "metadatas": list(self.metadatas),
+        }
+
+    def count(self):
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results, include, where=None):
+        self.query_calls += 1
+        raise AssertionError("행렬 인덱스가 처리해야 하는 컬렉션")
+
+
+class FakeVectorDB:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def get_collection(self, name):
+        return self.collections.get(name)
+
+
+class FakeEmbeddingModel:
+    def __init__(self, vector):
+        self.vector = vector
+
+    async def get_embedding(self, text):
+        return self.vector
+
+
+class FakeBM25:
+    def search(self, query, n_results=20, collection_names=None, scope=None):
+        return []
+
+    def score_candidates(self, query, doc_ids):
+        return []
+
+    def get_documents(self, doc_ids):
+        return {}
+
+
+def _random_collection(n=50, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"card_{i}" for i in range(n)]
+    documents = [f"단어 {i}" for i in range(n)]
+    metadatas = [{"type": "card", "i": i} for i in range(n)]
+    return FakeCollection(ids, embeddings, documents, metadatas)
+
+
+def _cosine_distances(matrix, query):
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = query / np.linalg.norm(query)
+    return 1.0 - matrix @ query
+
+
+def test_query_matches_brute_force_cosine_in_chroma_shape():
+    collection = _random_collection()
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    assert index.load(FakeVectorDB({"card_check": collection})) == {"card_check": 50}
+
+    query = np.random.default_rng(1).normal(size=16).astype(np.float32)
+    res = index.query("card_check", [query.tolist()], n_results=5)
+
+    expected = _cosine_distances(np.asarray(collection.embeddings), query)
+    order = np.argsort(expected)[:5]
+    assert set(res) == {"ids", "documents", "metadatas", "distances"}
+    assert res["ids"][0] == [collection.ids[i] for i in order]
+    assert res["documents"][0] == [collection.documents[i] for i in order]
+    assert res["metadatas"][0] == [collection.metadatas[i] for i in order]
+    np.testing.assert_allclose(res["distances"][0], expected[order], atol=1e-5)
+
+
+def test_upsert_replaces_and_appends_rows():
+    collection = _random_collection(n=3, dim=4)
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.load(FakeVectorDB({"card_check": collection}))
+
+    target = [0.0, 0.0, 0.0, 1.0]
+    index.upsert_documents(
+        "card_check",
+        ["card_1", "card_new"],
+        [target, [1.0, 0.0, 0.0, 0.0]],
+        ["수정된 단어", "새 단어"],
+        [{"type": "card"}, {"type": "card"}],
+    )
+
+    res = index.query("card_check", [target], n_results=10)
+    assert len(res["ids"][0]) == 4
+    assert res["ids"][0][0] == "card_1"
+    assert res["documents"][0][0] == "수정된 단어"
+    assert abs(res["distances"][0][0]) < 1e-6
+
+
+def test_disabled_or_untracked_collections_are_ignored():
+    disabled = DenseMatrixIndex(collection_names=["card_check"], enabled=False)
+    assert disabled.load(FakeVectorDB({"card_check": _random_collection()})) == {}
+    assert not disabled.handles("card_check")
+
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    assert index.upsert_documents("pdf_documents", ["rule_1"], [[1.0]], ["제1항"]) == 0
+    assert not index.handles("pdf_documents")
+
+
+def test_hybrid_search_uses_matrix_instead_of_chroma_query():
+    collection = _random_collection(n=10, dim=8)
+    vector_db = FakeVectorDB({"card_check": collection})
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.load(vector_db)
+
+    service = HybridSearchService(
+        vector_db=vector_db,
+        embedding_model=FakeEmbeddingModel(collection.embeddings[3].tolist()),
+        bm25=FakeBM25(),
+        dense_matrix=index,
+    )
+    results = asyncio.run(service.search("단어", collection_name="card_check", top_k=3))
+
+    assert collection.query_calls == 0
+    assert results[0]["id"] == "card_3"
+    assert set(results[0]) == {"id", "document", "collection", "metadata", "distance", "rrf_score"}
+    assert results[0]["collection"] == "card_check"
+
+
+def test_query_with_scope_scores_only_rows_in_scope():
+    collection = _random_collection(n=20, dim=8)
+    for i, meta in enumerate(collection.metadatas):
+        meta["lesson_id"] = "lesson_1" if i % 2 else "lesson_2"
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.load(FakeVectorDB({"card_check": collection}))
+
+    query = collection.embeddings[4].tolist()
+    res = index.query("card_check", [query], n_results=5, scope=SearchScope(lesson_id="lesson_1"))
+
+    expected = _cosine_distances(np.asarray(collection.embeddings), np.asarray(query))
+    odd_rows = [i for i in np.argsort(expected) if i % 2][:5]
+    assert res["ids"][0] == [collection.ids[i] for i in odd_rows]
+    assert index.query("card_check", [query], n_results=5, scope=SearchScope(lesson_id="lesson_9")) is None
+
+
+def test_generation_bump_from_another_worker_triggers_reload():
+    collection = _random_collection(n=5, dim=4)
+    vector_db = FakeVectorDB({"card_check": collection})
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.generation_check_interval = 0
+    index.load(vector_db)
+    assert index.handles("card_check")
+
+    # 다른 워커가 카드를 추가하고 세대 번호를 올림
+    collection.ids.append("card_new")
+    collection.embeddings = np.vstack([collection.embeddings, [[0.0, 0.0, 0.0, 1.0]]])
+    collection.documents.append("새 단어")
+    collection.metadatas.append({})
+    bump_index_generation()
+
+    # 재로드가 끝나기 전에는 ChromaDB 로 검색하도록 False
+    start_reload = index._start_reload
+    index._start_reload = lambda: None
+    assert not index.handles("card_check")
+    index._start_reload = start_reload
+    index.handles("card_check")
+    index._reload_thread.join(timeout=5)
+
+    assert index.handles("card_check")
+    res = index.query("card_check", [[0.0, 0.0, 0.0, 1.0]], n_results=1)
+    assert res["ids"][0] == ["card_new"]
+
+
+def test_own_upsert_and_bump_keeps_the_updated_matrix():
+    vector_db = FakeVectorDB({"card_check": _random_collection(n=5, dim=4)})
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.generation_check_interval = 0
+    index.load(vector_db)
+
+    index.upsert_documents("card_check", ["card_new"], [[0.0, 0.0, 0.0, 1.0]], ["새 단어"])
+    index.acknowledge_generation(bump_index_generation())
+
+    assert index.handles("card_check")
+    assert index._reload_thread is None
+    assert index.query("card_check", [[0.0, 0.0, 0.0, 1.0]], n_results=1)["ids"][0] == ["card_new"]
+
+
+def test_acknowledge_ignores_bumps_from_other_workers_in_between():
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.generation_check_interval = 0
+    index.load(FakeVectorDB({"card_check": _random_collection(n=3, dim=4)}))
+    index._start_reload = lambda: None
+
+    bump_index_generation()  # 다른 워커
+    index.acknowledge_generation(bump_index_generation())
+
+    assert not index.handles("card_check")
+
+
+def test_generation_is_checked_at_most_once_per_interval(monkeypatch):
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.load(FakeVectorDB({"card_check": _random_collection(n=3, dim=4)}))
+    index.generation_check_interval = 60
+
+    reads = []
+    monkeypatch.setattr(
+        "app.infrastructure.search.dense_matrix.read_index_generation", lambda: reads.append(1) or 0
+    )
+    for _ in range(5):
+        assert index.handles("card_check")
+    assert len(reads) == 1
@@ -0,0 +1,465 @@
+import asyncio
+import time
+
+from app.infrastructure.search.hybrid_search import HybridSearchService
+from app.infrastructure.search.search_scope import SearchScope
+
+
+class FakeCollection:
+    def __init__(self, docs, delay=0.0, error=None):
+        # docs: [(doc_id, document, distance, metadata)]
+        self.docs = docs
+        self.delay = delay
+        self.error = error
+        self.count_calls = 0
+        self.requested_depths = []
+        self.wheres = []
+        self.get_calls = []
+
+    def count(self):
+        self.count_calls += 1
+        return len(self.docs)
+
+    def query(self, query_embeddings, n_results, include, where=None):
+        self.requested_depths.append(n_results)
+        self.wheres.append(where)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        docs = self.docs
+        if where is not None:
+            # 테스트는 단일 필드 where 만 사용
+            [(field, value)] = where.items()
+            docs = [d for d in docs if d[3].get(field) == value]
+        docs = sorted(docs, key=lambda d: d[2])[:n_results]
+        return {
+            "ids": [[d[0] for d in docs]],
+            "documents": [[d[1] for d in docs]],
+            "distances": [[d[2] for d in docs]],
+            "metadatas": [[d[3] for d in docs]],
+        }
+
+
+    def get(self, ids, include):
+        self.get_calls.append(list(ids))
+        docs = [d for d in self.docs if d[0] in ids]
+        return {
+            "ids": [d[0] for d in docs],
+            "documents": [d[1] for d in docs],
+            "metadatas": [d[3] for d in docs],
+        }
+
+
+class FakeVectorDB:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def get_collection(self, name):
+        return self.collections.get(name)
+
+
+class FakeEmbeddingModel:
+    def __init__(self):
+        self.batch_calls = []
+
+    async def get_embedding(self, text):
+        return [0.1, 0.2, 0.3]
+
+    async def get_embeddings(self, texts, cache_queries=False):
+        self.batch_calls.append(list(texts))
+        return [[float(i), 0.0, 0.0] for i in range(len(texts))]
+
+
+class PerQueryCollection:
+    """질의 임베딩 첫 값(질의 번호)에 따라 다른 거리를 돌려주는 컬렉션."""
+
+    def __init__(self, docs):
+        # docs: [(doc_id, document, [질의별 distance])]
+        self.docs = docs
+        self.query_calls = []
+
+    def count(self):
+        return len(self.docs)
+
+    def query(self, query_embeddings, n_results, include, where=None):
+        self.query_calls.append(len(query_embeddings))
+        res = {"ids": [], "documents": [], "distances": [], "metadatas": []}
+        for embedding in query_embeddings:
+            row = int(embedding[0])
+            docs = sorted(self.docs, key=lambda d: d[2][row])[:n_results]
+            res["ids"].append([d[0] for d in docs])
+            res["documents"].append([d[1] for d in docs])
+            res["distances"].append([d[2][row] for d in docs])
+            res["metadatas"].append([{} for _ in docs])
+        return res
+
+
+class FakeBM25:
+    def __init__(self, hits=None, sources=None):
+        # hits: [(doc_id, document, collection, score, metadata)]
+        self.hits = hits or []
+        # sources: 문서 테이블 {doc_id: (document, metadata)}
+        self.sources = sources or {}
+        self.searched = False
+        self.scored_candidates = None
+        self.scope = None
+        self.lookups = []
+
+    def search(self, query, n_results=20, collection_names=None, scope=None):
+        self.searched = True
+        self.scope = scope
+        hits = [hit for hit in self.hits if collection_names is None or hit[2] in collection_names]
+        return hits[:n_results]
+
+    def score_candidates(self, query, doc_ids):
+        self.scored_candidates = list(doc_ids)
+        return [hit for hit in self.hits if hit[0] in doc_ids]
+
+    def get_documents(self, doc_ids):
+        self.lookups.append(sorted(doc_ids))
+        return {doc_id: self.sources[doc_id] for doc_id in doc_ids if doc_id in self.sources}
+
+
+def _make_service(collections, timeout=1.0, bm25=None):
+    service = HybridSearchService(
+        vector_db=FakeVectorDB(collections),
+        embedding_model=FakeEmbeddingModel(),
+        bm25=bm25 or FakeBM25(),
+    )
+    service.collection_timeout = timeout
+    return service
+
+
+def test_search_merges_results_from_all_base_collections():
+    service = _make_service(
+        {
+            "card_check": FakeCollection([("card_0", "단어: 되/돼", 0.1, {})]),
+            "korean_word_problems": FakeCollection([("question_1", "문제 1: 안 돼", 0.2, {})]),
+            "pdf_documents": FakeCollection([("korean_grammar_rule_1", "제1항", 0.3, {})]),
+        }
+    )
+
+    results = asyncio.run(service.search("되와 돼의 차이"))
+
+    assert [item["id"] for item in results] == ["card_0", "question_1", "korean_grammar_rule_1"]
+    assert results[0]["collection"] == "card_check"
+
+
+def test_search_counts_each_collection_once():
+    card = FakeCollection([("card_0", "단어: 되/돼", 0.1, {})])
+    service = _make_service({"card_check": card})
+
+    asyncio.run(service.search("되와 돼의 차이", collection_name="card_check"))
+
+    assert card.count_calls == 1
+
+
+def test_slow_collection_is_skipped_and_counted_as_timeout():
+    service = _make_service(
+        {
+            "card_check": FakeCollection([("card_0", "단어: 되/돼", 0.1, {})]),
+            "pdf_documents": FakeCollection([("rule_1", "제1항", 0.05, {})], delay=0.5),
+        },
+        timeout=0.1,
+    )
+
+    degraded = []
+    started = time.perf_counter()
+    results = asyncio.run(service.search("되와 돼의 차이", degraded=degraded))
+    elapsed = time.perf_counter() - started
+
+    assert [item["id"] for item in results] == ["card_0"]
+    assert service.metrics["timeouts"]["pdf_documents"] == 1
+    assert degraded == ["timeout:pdf_documents"]
+    assert elapsed < 0.5
+
+
+class SlowDenseMatrix:
+    """행렬 스캔이 오래 걸리는 Dense 행렬 인덱스."""
+
+    def handles(self, coll_name):
+        return coll_name == "card_check"
+
+    def query(self, coll_name, query_embeddings, n_results, scope=None):
+        time.sleep(0.5)
+        return None
+
+
+def test_slow_dense_matrix_runs_off_the_event_loop_under_timeout():
+    service = HybridSearchService(
+        vector_db=FakeVectorDB({"pdf_documents": FakeCollection([("rule_1", "제1항", 0.05, {})])}),
+        embedding_model=FakeEmbeddingModel(),
+        bm25=FakeBM25(),
+        dense_matrix=SlowDenseMatrix(),
+    )
+    service.collection_timeout = 0.1
+
+    started = time.perf_counter()
+    results = asyncio.run(service.search("제1항", top_k=1))
+    elapsed = time.perf_counter() - started
+    service.close()
+
+    assert [item["id"] for item in results] == ["rule_1"]
+    assert service.metrics["timeouts"]["card_check"] == 1
+    assert elapsed < 0.5
+    assert service.executor._shutdown
+
+
+def test_failing_collection_is_skipped_and_counted_as_error():
+    service = _make_service(
+        {
+            "card_check": FakeCollection([("card_0", "단어: 되/돼", 0.1, {})]),
+            "korean_word_problems": FakeCollection(
+                [("question_1", "문제 1: 안 돼", 0.2, {})], error=RuntimeError("boom")
+            ),
+        }
+    )
+
+    degraded = []
+    results = asyncio.run(service.search_many(["되와 돼의 차이"], degraded=degraded))
+
+    assert [item["id"] for item in results[0]] == ["card_0"]
+    assert service.metrics["errors"]["korean_word_problems"] == 1
+    assert degraded == ["error:korean_word_problems"]
+
+
+def test_candidates_fusion_mode_rescores_only_dense_candidates():
+    bm25 = FakeBM25(
+        [
+            ("question_1", "문제 1: 안 돼", "korean_word_problems", 3.0, {}),
+            ("card_9", "단어: 다른 카드", "card_check", 2.0, {}),
+        ]
+    )
+    service = _make_service(
+        {
+            "card_check": FakeCollection([("card_0", "단어: 되/돼", 0.1, {})]),
+            "korean_word_problems": FakeCollection([("question_1", "문제 1: 안 돼", 0.2, {})]),
+        },
+        bm25=bm25,
+    )
+
+    results = asyncio.run(service.search("되와 돼의 차이", fusion_mode="candidates"))
+
+    assert bm25.searched is False
+    assert sorted(bm25.scored_candidates) == ["card_0", "question_1"]
+    # Dense 2위 question_1 이 BM25 점수를 더해 1위로 올라온다
+    assert {item["id"] for item in results} == {"card_0", "question_1"}
+    assert results[0]["id"] == "question_1"
+
+
+def test_candidates_and_full_fusion_rank_differently_when_bm25_top_is_outside_candidates():
+    # 코퍼스 전체 BM25 순위: card_2, (후보 밖 5개), card_0 — card_1 은 BM25 점수 없음
+    outside = [(f"pdf_{i}", "다른 문서", "pdf_documents", 5.0 - i * 0.1, {}) for i in range(5)]
+    hits = [("card_2", "단어: 2", "card_check", 9.0, {}), *outside, ("card_0", "단어: 0", "card_check", 1.0, {})]
+    collections = {
+        "card_check": FakeCollection(
+            [("card_0", "단어: 0", 0.1, {}), ("card_1", "단어: 1", 0.2, {}), ("card_2", "단어: 2", 0.3, {})]
+        )
+    }
+
+    full = asyncio.run(_make_service(collections, bm25=FakeBM25(hits)).search("질의", fusion_mode="full"))
+    candidates = asyncio.run(
+        _make_service(collections, bm25=FakeBM25(hits)).search("질의", fusion_mode="candidates")
+    )
+
+    # 같은 후보라도 BM25 순위 기준이 달라 최종 순서가 다르다
+    assert [item["id"] for item in full] == ["card_2", "card_0", "card_1"]
+    assert [item["id"] for item in candidates] == ["card_0", "card_2", "card_1"]
+
+
+def test_search_many_batches_embeddings_and_collection_queries():
+    card = PerQueryCollection(
+        [
+            ("card_0", "단어: 되/돼", [0.1, 0.9, 0.5]),
+            ("card_1", "단어: 맞히다/맞추다", [0.9, 0.1, 0.4]),
+        ]
+    )
+    problems = PerQueryCollection([("question_1", "문제 1: 안 돼", [0.3, 0.8, 0.2])])
+    service = _make_service({"card_check": card, "korean_word_problems": problems})
+
+    queries = ["되와 돼의 차이", "맞히다 맞추다", "안 돼"]
+    results = asyncio.run(service.search_many(queries, top_k=1))
+
+    assert service.embedding_model.batch_calls == [queries]
+    assert card.query_calls == [3]
+    assert problems.query_calls == [3]
+    assert [[item["id"] for item in items] for items in results] == [
+        ["card_0"],
+        ["card_1"],
+        ["question_1"],
+    ]
+
+
+def test_search_many_with_no_queries_skips_embedding():
+    service = _make_service({})
+
+    assert asyncio.run(service.search_many([])) == []
+    assert service.embedding_model.batch_calls == []
+
+
+def _card_docs(distances):
+    return [(f"card_{i}", f"단어 {i}", dist, {}) for i, dist in enumerate(distances)]
+
+
+def test_adaptive_depth_stops_when_top_k_is_settled():
+    # top_k=2 → 초기 깊이 4. 4위가 2위보다 한참 멀어 더 볼 필요 없음
+    card = FakeCollection(_card_docs([0.1, 0.12, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95]))
+    service = _make_service({"card_check": card})
+
+    results = asyncio.run(service.search("되와 돼의 차이", collection_name="card_check", top_k=2))
+
+    assert card.requested_depths == [4]
+    assert [item["id"] for item in results] == ["card_0", "card_1"]
+    assert service.metrics["widened"]["card_check"] == 0
+
+
+def test_adaptive_depth_widens_when_distances_are_tight():
+    card = FakeCollection(_card_docs([0.1, 0.11, 0.12, 0.13, 0.14, 0.15, 0.16, 0.17, 0.18]))
+    service = _make_service({"card_check": card})
+
+    asyncio.run(service.search("되와 돼의 차이", collection_name="card_check", top_k=2))
+
+    assert card.requested_depths == [4, 8]
+    assert service.metrics["widened"]["card_check"] == 1
+
+
+def test_depth_is_recorded_per_collection():
+    card = FakeCollection(_card_docs([0.1, 0.11, 0.12, 0.13, 0.14, 0.15, 0.16, 0.17, 0.18]))
+    pdf = FakeCollection([(f"rule_{i}", f"제{i}항", 0.1 * (i + 1), {}) for i in range(9)])
+    service = _make_service({"card_check": card, "pdf_documents": pdf})
+    service.collections = ["card_check", "pdf_documents"]
+
+    asyncio.run(service.search("되와 돼의 차이", top_k=2))
+
+    # card_check 만 넓혀 재조회, pdf_documents 는 초기 깊이에서 확정
+    assert service.metrics["depths"] == {"card_check:8": 1, "pdf_documents:4": 1}
+
+
+def test_question_collection_widens_until_k_distinct_originals(monkeypatch):
+    # 가상 질문 4개가 모두 같은 원본 → 원본 기준 top-2 가 모이지 않음
+    questions = FakeCollection(
+        [
+            (f"q_{i}", f"질문 {i}", 0.1 + i * 0.2, {"original_id": "card_0"})
+            for i in range(4)
+        ]
+        + [("q_9", "질문 9", 0.95, {"original_id": "card_1"})]
+    )
+    service = _make_service(
+        {"card_check": FakeCollection([]), "card_check_questions": questions}
+    )
+
+    monkeypatch.setattr(
+        "app.infrastructure.search.hybrid_search.is_question_collection_ready", lambda name: True
+    )
+
+    asyncio.run(service.search("되와 돼의 차이", collection_name="card_check", top_k=2))
+
+    # 재조회는 최대 깊이(8)와 컬렉션 크기(5) 중 작은 값
+    assert questions.requested_depths == [4, 5]
+
+
+def test_fixed_depth_when_adaptive_depth_disabled():
+    card = FakeCollection(_card_docs([0.1, 0.12, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95]))
+    service = _make_service({"card_check": card})
+    service.adaptive_depth = False
+
+    asyncio.run(service.search("되와 돼의 차이", collection_name="card_check", top_k=2))
+
+    assert card.requested_depths == [8]
+
+
+def test_scope_is_pushed_down_to_chroma_where_and_bm25():
+    card = FakeCollection(
+        [
+            ("card_0", "단어: 되/돼", 0.3, {"concept_key": "되/돼"}),
+            ("card_1", "단어: 맞히다/맞추다", 0.1, {"concept_key": "맞추다/맞히다"}),
+        ]
+    )
+    bm25 = FakeBM25()
+    service = _make_service({"card_check": card}, bm25=bm25)
+    scope = SearchScope(concept_key="되/돼")
+
+    results = asyncio.run(service.search("되와 돼의 차이", collection_name="card_check", scope=scope))
+
+    assert [item["id"] for item in results] == ["card_0"]
+    assert card.wheres and all(where == {"concept_key": "되/돼"} for where in card.wheres)
+    assert bm25.scope is scope
+
+
+def test_search_without_scope_sends_no_where_filter():
+    card = FakeCollection([("card_0", "단어: 되/돼", 0.1, {})])
+    service = _make_service({"card_check": card})
+
+    asyncio.run(service.search("되와 돼의 차이", collection_name="card_check"))
+
+    assert card.wheres == [None]
+
+
+def _ready_questions(monkeypatch):
+    monkeypatch.setattr(
+        "app.infrastructure.search.hybrid_search.is_question_collection_ready", lambda name: True
+    )
+
+
+def test_question_hits_resolve_source_text_in_one_lookup_after_dedup(monkeypatch):
+    _ready_questions(monkeypatch)
+    questions = FakeCollection(
+        [
+            ("hq_card_0_0", "되랑 돼 뭐가 달라?", 0.1, {"original_id": "card_0", "collection": "card_check"}),
+            ("hq_card_0_1", "돼는 언제 써?", 0.2, {"original_id": "card_0", "collection": "card_check"}),
+            ("hq_card_1_0", "맞히다 뜻이 뭐야?", 0.3, {"original_id": "card_1", "collection": "card_check"}),
+        ]
+    )
+    bm25 = FakeBM25(
+        sources={
+            "card_0": ("단어: 되/돼", {"type": "card", "word": "되/돼"}),
+            "card_1": ("단어: 맞히다/맞추다", {"type": "card", "word": "맞히다/맞추다"}),
+        }
+    )
+    service = _make_service({"card_check": FakeCollection([]), "card_check_questions": questions}, bm25=bm25)
+
+    results = asyncio.run(service.search("되와 돼의 차이", collection_name="card_check"))
+
+    assert [(item["id"], item["document"]) for item in results] == [
+        ("card_0", "단어: 되/돼"),
+        ("card_1", "단어: 맞히다/맞추다"),
+    ]
+    assert results[0]["collection"] == "card_check"
+    assert results[0]["metadata"]["word"] == "되/돼"
+    assert bm25.lookups == [["card_0", "card_1"]]
+
+
+def test_question_sources_fall_back_to_chroma_and_drop_missing(monkeypatch):
+    _ready_questions(monkeypatch)
+    card = FakeCollection([("card_1", "단어: 맞히다/맞추다", 0.9, {"type": "card"})])
+    questions = FakeCollection(
+        [
+            ("hq_card_1_0", "맞히다 뜻이 뭐야?", 0.1, {"original_id": "card_1", "collection": "card_check"}),
+            ("hq_gone_0", "삭제된 원본", 0.2, {"original_id": "card_gone", "collection": "card_check"}),
+            ("hq_old_0", "예전 형식", 0.3, {"original_id": "card_old", "original_text": "단어: 예전"}),
+        ]
+    )
+    service = _make_service({"card_check": card, "card_check_questions": questions})
+
+    degraded = []
+    results = asyncio.run(service.search("맞히다", collection_name="card_check", degraded=degraded))
+
+    assert [(item["id"], item["document"]) for item in results] == [
+        ("card_1", "단어: 맞히다/맞추다"),
+        ("card_old", "단어: 예전"),
+    ]
+    assert card.get_calls == [["card_1", "card_gone"]]
+    assert degraded == ["unresolved:card_gone"]
+
+
+def test_search_records_stage_timings():
+    service = _make_service({"card_check": FakeCollection([("card_0", "단어: 되/돼", 0.1, {})])})
+    timings = {}
+
+    degraded = []
+    asyncio.run(service.search("되와 돼의 차이", timings=timings, degraded=degraded))
+
+    assert degraded == []
+    assert set(timings) == {"embed", "dense", "fusion", "resolve"}
+    assert all(seconds >= 0 for seconds in timings.values())
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from app.infrastructure.search.dense_matrix import DenseMatrixIndex
+from app.infrastructure.search.quantized_store import QuantizedVectorStore, decode_vector, encode_vector
+
+
+def _unit_vectors(n, dim, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _exact_top(vectors, query, k):
+    return np.argsort(-(vectors @ query), kind="stable")[:k]
+
+
+@pytest.mark.parametrize("mode,max_error,bytes_per_dim", [("float16", 1e-3, 2), ("int8", 1e-2, 1)])
+def test_dequantize_is_close_and_smaller(mode, max_error, bytes_per_dim):
+    vectors = _unit_vectors(100, 64) * 3.0  # 정규화되지 않은 벡터도 벡터별 scale 로 복원
+    store = QuantizedVectorStore.from_vectors(vectors, mode)
+
+    assert np.abs(store.dequantize() - vectors).max() < max_error * 3.0
+    assert store.codes.nbytes == 100 * 64 * bytes_per_dim
+
+
+def test_float32_mode_matches_exact_ranking():
+    vectors = _unit_vectors(300, 32)
+    query = _unit_vectors(1, 32, seed=1)[0]
+    store = QuantizedVectorStore.from_vectors(vectors, "float32")
+
+    [(rows, scores)] = store.top_k([query], 10)
+
+    assert rows.tolist() == _exact_top(vectors, query, 10).tolist()
+    np.testing.assert_allclose(scores, vectors[rows] @ query, rtol=1e-6)
+
+
+def test_int8_rescoring_with_full_vectors_restores_exact_top_k():
+    vectors = _unit_vectors(2000, 64)
+    queries = _unit_vectors(20, 64, seed=2)
+    store = QuantizedVectorStore.from_vectors(vectors, "int8", full_vectors=vectors)
+
+    for query, (rows, scores) in zip(queries, store.top_k(queries, 10, rescore=4)):
+        assert rows.tolist() == _exact_top(vectors, query, 10).tolist()
+        np.testing.assert_allclose(scores, vectors[rows] @ query, rtol=1e-5)
+
+
+def test_replace_rows_and_append_keep_existing_codes():
+    vectors = _unit_vectors(10, 16)
+    store = QuantizedVectorStore.from_vectors(vectors, "int8")
+    new = _unit_vectors(3, 16, seed=3)
+
+    updated = store.replace_rows([2], new[:1]).append(new[1:])
+    rebuilt = QuantizedVectorStore.from_vectors(np.vstack([vectors[:2], new[:1], vectors[3:], new[1:]]), "int8")
+
+    assert len(updated) == 12
+    np.testing.assert_array_equal(updated.codes, rebuilt.codes)
+    np.testing.assert_array_equal(updated.scales, rebuilt.scales)
+    # 원본 저장소는 바뀌지 않는다 (스냅샷 교체용)
+    assert len(store) == 10
+
+
+class FakeCollection:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def get(self, include):
+        n = len(self.vectors)
+        return {
+            "ids": [f"doc_{i}" for i in range(n)],
+            "embeddings": self.vectors,
+            "documents": [f"문서 {i}" for i in range(n)],
+            "metadatas": [{} for _ in range(n)],
+        }
+
+
+class FakeVectorDB:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def get_collection(self, name):
+        return self.collections.get(name)
+
+
+def test_dense_matrix_int8_with_rescore(monkeypatch, tmp_path):
+    monkeypatch.setenv("DENSE_MATRIX_DTYPE", "int8")
+    monkeypatch.setenv("DENSE_MATRIX_RESCORE", "4")
+    monkeypatch.setenv("DENSE_MATRIX_RESCORE_DIR", str(tmp_path))
+    vectors = _unit_vectors(500, 32)
+    index = DenseMatrixIndex(collection_names=["card_check"], enabled=True)
+    index.load(FakeVectorDB({"card_check": FakeCollection(vectors)}))
+
+    query = _unit_vectors(1, 32, seed=4)[0]
+    res = index.query("card_check", [query.tolist()], n_results=5)
+
+    assert res["ids"][0] == [f"doc_{i}" for i in _exact_top(vectors, query, 5)]
+    assert index.memory_usage()["card_check"] == 500 * 32 + 500 * 4
+
+    # upsert 후에도 재채점용 원본이 함께 갱신된다
+    index.upsert_documents("card_check", ["doc_new"], [query.tolist()], ["새 문서"])
+    res = index.query("card_check", [query.tolist()], n_results=1)
+    assert res["ids"][0] == ["doc_new"]
+    assert abs(res["distances"][0][0]) < 1e-5
+
+
+def test_top_k_with_rows_scores_only_those_rows():
+    vectors = _unit_vectors(200, 16)
+    query = _unit_vectors(1, 16, seed=5)[0]
+    rows = np.arange(0, 200, 3)
+    store = QuantizedVectorStore.from_vectors(vectors, "int8", full_vectors=vectors)
+
+    [(found, scores)] = store.top_k([query], 5, rescore=4, rows=rows)
+
+    expected = rows[_exact_top(vectors[rows], query, 5)]
+    assert found.tolist() == expected.tolist()
+    np.testing.assert_allclose(scores, vectors[found] @ query, rtol=1e-5)
+
+
+@pytest.mark.parametrize("mode, size", [("float32", 64), ("float16", 32), ("int8", 20)])
+def test_encode_vector_round_trip(mode, size):
+    vector = _unit_vectors(1, 16)[0]
+
+    payload = encode_vector(vector, mode)
+    decoded = decode_vector(payload, mode)
+
+    assert len(payload) == size
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, QuantizedVectorStore.from_vectors(vector, mode).dequantize()[0])
@@ -5,7 +5,10 @@ from app.infrastructure.rag.service import RagService
 
 
 class FakeRetriever:
-    async def search(self, query, collection_name=None, top_k=5):
+    async def search_many(self, queries, collection_name=None, top_k=5, scope=None):
+        return [await self.search(query, collection_name, top_k, scope) for query in queries]
+
+    async def search(self, query, collection_name=None, top_k=5, scope=None):
         return [
             RagDocument(
                 document="단어: 되/돼 의미: 돼는 되어의 줄임말",
@@ -43,3 +46,12 @@ def test_search_returns_documents_and_context():
     assert result.query == "되와 돼의 차이"
     assert len(result.documents) == 1
     assert "되/돼" in result.context
+
+
+def test_search_many_returns_results_in_input_order():
+    service = RagService(retriever=FakeRetriever())
+
+    results = asyncio.run(service.search_many(["되와 돼의 차이", "안 돼"]))
+
+    assert [result.query for result in results] == ["되와 돼의 차이", "안 돼"]
+    assert all("되/돼" in result.context for result in results)
@@ -0,0 +1,128 @@
+import asyncio
+
+from app.infrastructure.rag.retrieval_cache import RetrievalCache, normalize_query
+from app.infrastructure.rag.retriever import RagRetriever
+from app.infrastructure.search.search_scope import SearchScope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeHybridSearch:
+    def __init__(self):
+        self.calls = []
+        self.degraded = []
+
+    async def search(self, query, collection_name=None, top_k=5, scope=None, degraded=None):
+        self.calls.append(query)
+        if degraded is not None:
+            degraded.extend(self.degraded)
+        return [{"id": "card_0", "document": f"결과: {query}", "collection": "card_check", "distance": 0.1}]
+
+    async def search_many(self, queries, collection_name=None, top_k=5, scope=None, degraded=None):
+        return [await self.search(query, collection_name, top_k, scope, degraded) for query in queries]
+
+
+def _retriever(generation=None, **cache_kwargs):
+    generation = generation if generation is not None else [0]
+    cache = RetrievalCache(
+        max_entries=cache_kwargs.pop("max_entries", 10),
+        ttl_seconds=cache_kwargs.pop("ttl_seconds", 60),
+        enabled=True,
+        generation_reader=lambda: generation[0],
+        **cache_kwargs,
+    )
+    hybrid = FakeHybridSearch()
+    return RagRetriever(hybrid_search=hybrid, cache=cache), hybrid, cache
+
+
+def test_normalize_query_ignores_spacing_case_and_trailing_punctuation():
+    assert normalize_query("  되 돼  차이가 뭐야?? ") == normalize_query("되 돼 차이가 뭐야")
+    assert normalize_query("BM25 란!") == "bm25 란"
+
+
+def test_repeated_query_is_served_from_cache():
+    retriever, hybrid, cache = _retriever()
+
+    first = asyncio.run(retriever.search("되 돼 차이가 뭐야?"))
+    second = asyncio.run(retriever.search("되  돼 차이가 뭐야"))
+
+    assert hybrid.calls == ["되 돼 차이가 뭐야?"]
+    assert second == first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # 반환값을 수정해도 캐시된 결과는 그대로
+    second[0].document = "변경"
+    assert asyncio.run(retriever.search("되 돼 차이가 뭐야"))[0].document == first[0].document
+
+
+def test_key_includes_collection_top_k_and_scope():
+    retriever, hybrid, _ = _retriever()
+
+    asyncio.run(retriever.search("되 돼"))
+    asyncio.run(retriever.search("되 돼", collection_name="card_check"))
+    asyncio.run(retriever.search("되 돼", top_k=3))
+    asyncio.run(retriever.search("되 돼", scope=SearchScope(concept_key="되/돼")))
+    asyncio.run(retriever.search("되 돼", scope=SearchScope(concept_key=["되/돼"])))
+
+    assert len(hybrid.calls) == 4
+
+
+def test_generation_bump_invalidates_entries():
+    generation = [0]
+    retriever, hybrid, _ = _retriever(generation)
+
+    asyncio.run(retriever.search("되 돼"))
+    generation[0] += 1
+    asyncio.run(retriever.search("되 돼"))
+
+    assert len(hybrid.calls) == 2
+
+
+def test_entries_expire_after_ttl_and_evict_lru_past_max_entries():
+    clock = FakeClock()
+    retriever, hybrid, cache = _retriever(max_entries=2, ttl_seconds=10, clock=clock)
+
+    for query in ["a 질문", "b 질문", "a 질문", "c 질문"]:
+        asyncio.run(retriever.search(query))
+    # b 가 가장 오래 쓰이지 않아 밀려난다
+    assert cache.stats()["evictions"] == 1
+    asyncio.run(retriever.search("a 질문"))
+    assert hybrid.calls == ["a 질문", "b 질문", "c 질문"]
+
+    clock.now = 11
+    asyncio.run(retriever.search("a 질문"))
+    assert hybrid.calls[-1] == "a 질문"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_search_many_only_fetches_uncached_queries():
+    retriever, hybrid, _ = _retriever()
+    asyncio.run(retriever.search("되 돼"))
+
+    results = asyncio.run(retriever.search_many(["되 돼?", "안 않다", "안 않다"]))
+
+    assert hybrid.calls == ["되 돼", "안 않다"]
+    assert [docs[0].document for docs in results] == ["결과: 되 돼", "결과: 안 않다", "결과: 안 않다"]
+
+
+def test_degraded_results_are_not_cached():
+    retriever, hybrid, _ = _retriever()
+    hybrid.degraded = ["timeout:card_check"]
+
+    asyncio.run(retriever.search("되 돼"))
+    asyncio.run(retriever.search_many(["안 않다"]))
+    asyncio.run(retriever.search("되 돼"))
+    asyncio.run(retriever.search_many(["안 않다"]))
+    assert hybrid.calls == ["되 돼", "안 않다", "되 돼", "안 않다"]
+
+    # 컬렉션이 복구되면 다시 캐시된다
+    hybrid.degraded = []
+    asyncio.run(retriever.search("되 돼"))
+    asyncio.run(retriever.search("되 돼"))
+    assert hybrid.calls[-1:] == ["되 돼"] and len(hybrid.calls) == 5
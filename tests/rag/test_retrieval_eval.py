@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.infrastructure.search.retrieval_eval import (
+    evaluate_config,
+    latency_summary,
+    load_queries,
+    score_results,
+)
+
+
+def _result(doc_id, concept_key=None):
+    return {"id": doc_id, "metadata": {"concept_key": concept_key} if concept_key else {}}
+
+
+class FakeSearchService:
+    def __init__(self, results_by_query):
+        self.results_by_query = results_by_query
+        self.adaptive_depth = True
+        self.collections = ["card_check", "card_check_questions"]
+        self.calls = []
+
+    async def search(self, query, collection_name=None, top_k=5, fusion_mode=None, timings=None):
+        self.calls.append((query, fusion_mode, top_k))
+        if timings is not None:
+            timings.update({"embed": 0.002, "dense": 0.001, "fusion": 0.0005, "resolve": 0.0})
+        return self.results_by_query[query][:top_k]
+
+
+def test_score_results_counts_id_and_concept_labels():
+    label = {"ids": ["lesson_4_q2"], "concept_keys": ["되/돼"]}
+    results = [_result("card_3", "안/않다"), _result("card_0", "되/돼"), _result("lesson_4_q2", "되/돼")]
+
+    assert score_results(results, label, k=3) == {"recall": 1.0, "rr": 0.5}
+    # k=2 에서는 개념만 찾음
+    assert score_results(results, label, k=2) == {"recall": 0.5, "rr": 0.5}
+    assert score_results(results[:1], label, k=3) == {"recall": 0.0, "rr": 0.0}
+
+
+def test_latency_summary_reports_percentiles_in_ms():
+    summary = latency_summary({"total": [0.001 * i for i in range(1, 101)], "embed": []})
+
+    assert set(summary) == {"total"}
+    assert summary["total"]["p50"] == 50.5
+    assert summary["total"]["p95"] == 95.05
+
+
+def test_evaluate_config_applies_overrides_and_aggregates():
+    queries = [
+        {"query": "되 돼 차이", "concept_keys": ["되/돼"]},
+        {"query": "안 않 차이", "concept_keys": ["안/않다"]},
+    ]
+    service = FakeSearchService(
+        {
+            "되 돼 차이": [_result("card_0", "되/돼")],
+            "안 않 차이": [_result("card_0", "되/돼"), _result("card_1", "잊다/잃다")],
+        }
+    )
+    config = {"name": "fixed", "fusion_mode": "candidates", "adaptive_depth": False, "collections": ["card_check"]}
+
+    report = asyncio.run(evaluate_config(service, queries, config, k=3, warmup=1))
+
+    assert service.adaptive_depth is False
+    assert service.collections == ["card_check"]
+    # 예열 1회 + 측정 2회
+    assert [call[0] for call in service.calls] == ["되 돼 차이", "되 돼 차이", "안 않 차이"]
+    assert all(call[1:] == ("candidates", 3) for call in service.calls)
+    assert report["n_queries"] == 2
+    assert report["recall_at_k"] == 0.5
+    assert report["mrr"] == 0.5
+    assert set(report["latency_ms"]) == {"embed", "dense", "fusion", "resolve", "total"}
+    assert report["per_query"][1]["top_ids"] == ["card_0", "card_1"]
+
+
+class FakeQueryCache:
+    def __init__(self):
+        self.entries = set()
+
+    def clear(self):
+        self.entries.clear()
+
+
+def test_query_cache_is_cleared_before_measuring():
+    queries = [{"query": "되 돼 차이", "concept_keys": ["되/돼"]}]
+    service = FakeSearchService({"되 돼 차이": [_result("card_0", "되/돼")]})
+    service.embedding_model = SimpleNamespace(query_cache=FakeQueryCache())
+    seen = []
+    search = service.search
+
+    async def search_and_cache(query, **kwargs):
+        seen.append(query in service.embedding_model.query_cache.entries)
+        service.embedding_model.query_cache.entries.add(query)
+        return await search(query, **kwargs)
+
+    service.search = search_and_cache
+    asyncio.run(evaluate_config(service, queries, {"name": "a"}, warmup=1))
+    asyncio.run(evaluate_config(service, queries, {"name": "b"}, warmup=0))
+
+    # 예열에서 임베딩한 질의도, 앞 구성에서 임베딩한 질의도 측정 때는 LRU 에 없다
+    assert seen == [False, False, False]
+
+
+def test_bundled_query_set_is_labelled():
+    queries = load_queries()
+
+    assert len(queries) >= 30
+    assert all(item["concept_keys"] for item in queries)
@@ -0,0 +1,49 @@
+import math
+
+from app.infrastructure.search.search_benchmark import (
+    STAGE_UNITS,
+    SyntheticVectorDB,
+    build_corpus,
+    build_queries,
+    run_size,
+    scaling_exponents,
+)
+
+
+def test_build_corpus_splits_chunks_across_base_collections():
+    corpus = build_corpus(200, dim=8)
+    collections = corpus["collections"]
+
+    assert sum(len(data["ids"]) for data in collections.values()) == 200
+    assert len(collections["pdf_documents"]["ids"]) == 160
+    assert collections["card_check"]["embeddings"].shape == (20, 8)
+    assert collections["card_check"]["metadatas"][0]["concept_key"]
+
+    db = SyntheticVectorDB(collections)
+    fetched = db.get_collection("card_check").get(ids=["card_check_0"], include=["documents"])
+    assert fetched["ids"] == ["card_check_0"]
+    assert fetched["documents"] == [collections["card_check"]["documents"][0]]
+
+
+def test_build_queries_are_distinct():
+    queries = build_queries(build_corpus(100, dim=8)["vocab"], 20)
+
+    assert len(set(queries)) == 20
+
+
+def test_run_size_measures_every_stage():
+    result = run_size(300, dim=8, n_queries=5, tokenize_sample=50)
+
+    assert result["n_docs"] == 300
+    for stage in STAGE_UNITS:
+        assert result[stage] > 0
+
+
+def test_scaling_exponents():
+    results = [
+        {"n_docs": 1000, "linear": 1.0, "flat": 2.0},
+        {"n_docs": 10000, "linear": 10.0, "flat": 2.0},
+    ]
+
+    assert math.isclose(scaling_exponents(results, "linear")[0], 1.0)
+    assert math.isclose(scaling_exponents(results, "flat")[0], 0.0, abs_tol=1e-12)
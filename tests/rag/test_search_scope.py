@@ -0,0 +1,78 @@
+from app.infrastructure.search.search_scope import SearchScope, normalize_lesson_id, scope_metadata
+
+
+def test_empty_scope_has_no_where_filter():
+    assert SearchScope().to_where() is None
+    assert SearchScope(concept_key=[]).is_empty()
+
+
+def test_single_and_multi_value_fields_become_chroma_where():
+    assert SearchScope(lesson_id="lesson_4").to_where() == {"lesson_id": "lesson_4"}
+    assert SearchScope(concept_key=["되/돼", "안/않다", "되/돼"], document_type="card").to_where() == {
+        "$and": [
+            {"concept_key": {"$in": ["되/돼", "안/않다"]}},
+            {"document_type": "card"},
+        ]
+    }
+
+
+def test_matches_requires_every_field():
+    scope = SearchScope(lesson_id="lesson_4", concept_key=["되/돼", "안/않다"])
+
+    assert scope.matches({"lesson_id": "lesson_4", "concept_key": "안/않다", "type": "card"})
+    assert not scope.matches({"lesson_id": "lesson_1", "concept_key": "안/않다"})
+    assert not scope.matches({"concept_key": "되/돼"})
+
+
+def test_scope_metadata_skips_missing_values():
+    assert scope_metadata(lesson_id="lesson_1", concept_key=None, document_type="card") == {
+        "lesson_id": "lesson_1",
+        "document_type": "card",
+    }
+
+
+def test_normalize_lesson_id_accepts_seed_variants():
+    assert [normalize_lesson_id(raw) for raw in ("lesson_3", "lesson3", 3)] == ["lesson_3"] * 3
+
+
+class FakeMongo:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find_many(self, name):
+        return self.docs
+
+
+def test_loaders_attach_lesson_and_concept_keys(monkeypatch):
+    from app.infrastructure.loaders import card_check_loader, korean_word_problems_loader
+
+    monkeypatch.setattr(card_check_loader, "load_rag_config", lambda: {"collections": {"card_check": {}}})
+    monkeypatch.setattr(
+        card_check_loader,
+        "get_mongo_client",
+        lambda: FakeMongo([{"lessonId": "4", "cards": [{"word1": "되다", "word2": "돼다"}]}]),
+    )
+    monkeypatch.setattr(
+        korean_word_problems_loader,
+        "load_rag_config",
+        lambda: {"collections": {"korean_word_problems": {}}},
+    )
+    monkeypatch.setattr(
+        korean_word_problems_loader,
+        "get_mongo_client",
+        lambda: FakeMongo([{"lessonId": "1", "questions": [{"sentence": "선생님이 ( ).", "answer": "가르쳐"}]}]),
+    )
+
+    [card] = card_check_loader.get_card_check_data()
+    [question] = korean_word_problems_loader.get_korean_word_problems()["questions"]
+
+    assert (card["lesson_id"], card["concept_key"]) == ("lesson_4", "되/돼")
+    assert (question["lesson_id"], question["concept_key"]) == ("lesson_1", "가르치다/가르키다")
+
+
+def test_pdf_collection_is_exempt_from_lesson_and_concept_fields():
+    scope = SearchScope(lesson_id="lesson_4", concept_key="되/돼", document_type="official_grammar_rule")
+
+    assert scope.for_collection("card_check") is scope
+    assert scope.for_collection("pdf_documents").to_where() == {"document_type": "official_grammar_rule"}
+    assert SearchScope(concept_key="되/돼").for_collection("pdf_documents").is_empty()
@@ -0,0 +1,61 @@
+import pytest
+
+from app.infrastructure.loaders.seed_mongo_loader import CARD_CHECK_SEED, KOREAN_WORD_PROBLEMS_SEED
+from app.infrastructure.search.tokenizer import (
+    KoreanTokenizer,
+    reference_tokenize,
+    tokenize,
+    tokenize_query,
+)
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def test_tokenize_matches_reference_on_seed_corpus():
+    texts = list(_strings(CARD_CHECK_SEED)) + list(_strings(KOREAN_WORD_PROBLEMS_SEED))
+    assert texts
+
+    for text in texts:
+        assert tokenize(text) == reference_tokenize(text), text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "되와 돼의 차이가 뭐야?",
+        "제1항: 한글 맞춤법은 '표준어'를 소리대로 적되",
+        "a가b나 snake_case 123 ㄱㄴ ㅏ 😀 가.나,다",
+        "",
+        "   ",
+    ],
+)
+def test_tokenize_matches_reference_on_edge_cases(text):
+    assert tokenize(text) == reference_tokenize(text)
+
+
+def test_tokenizer_interns_tokens_into_shared_vocab():
+    vocab = {}
+    tokenizer = KoreanTokenizer(vocab)
+
+    ids = tokenizer.encode("되다 되다")
+
+    assert [token for token, _ in sorted(vocab.items(), key=lambda x: x[1])] == ["되다", "되", "다"]
+    assert ids == [0, 0, 0, 1, 2, 0, 1, 2]
+
+
+def test_encode_query_drops_unknown_tokens_and_caches():
+    tokenizer = KoreanTokenizer({"돼": 0, "차이": 1})
+
+    assert tokenizer.encode_query("돼 차이 없는말") == [0, 1, 0, 1]
+    hits_before = tokenize_query.cache_info().hits
+    tokenizer.encode_query("돼 차이 없는말")
+    assert tokenize_query.cache_info().hits == hits_before + 1
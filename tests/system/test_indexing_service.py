@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+
+from app.domains.developer.indexing_service import IndexingService
+from app.infrastructure.embedding.embedding_cache import EmbeddingCache
+
+
+class FakeCollection:
+    def __init__(self):
+        self.upserted_ids = []
+
+    def upsert(self, documents, embeddings, metadatas, ids):
+        self.upserted_ids.extend(ids)
+
+
+class FakeChromaClient:
+    def __init__(self):
+        self.deleted = []
+
+    def delete_collection(self, name):
+        self.deleted.append(name)
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.collection = FakeCollection()
+        self.client = FakeChromaClient()
+
+    def get_collection(self, name):
+        return self.collection
+
+
+class FakeEmbeddingModel:
+    cache_namespace = "fake:model@1"
+    embedding_dimension = 2
+
+    def __init__(self):
+        self.embedded = []
+
+    async def get_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return [[0.0, 1.0] for _ in texts]
+
+
+class FakeBM25:
+    def __init__(self):
+        self.upserts = []
+        self.deleted_collections = []
+        self.acknowledged = []
+        self.snapshots = 0
+
+    def upsert_documents(self, collection_name, ids, documents, metadatas=None):
+        self.upserts.append((collection_name, list(ids)))
+        return len(ids)
+
+    def delete_collection(self, collection_name):
+        self.deleted_collections.append(collection_name)
+        return 0
+
+    def acknowledge_generation(self, generation):
+        self.acknowledged.append(generation)
+
+    def save_snapshot(self, vector_db):
+        self.snapshots += 1
+
+
+class FakeDenseMatrix:
+    def __init__(self):
+        self.upserts = []
+        self.deleted_collections = []
+        self.acknowledged = []
+
+    def upsert_documents(self, collection_name, ids, embeddings, documents, metadatas=None):
+        self.upserts.append((collection_name, list(ids), len(embeddings)))
+        return len(ids)
+
+    def delete_collection(self, collection_name):
+        self.deleted_collections.append(collection_name)
+
+    def acknowledge_generation(self, generation):
+        self.acknowledged.append(generation)
+
+
+@pytest.fixture(autouse=True)
+def generation_file(tmp_path, monkeypatch):
+    path = tmp_path / "index_generation"
+    monkeypatch.setenv("INDEX_GENERATION_FILE", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def embedding_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    cache = EmbeddingCache()
+    yield cache
+    cache.close()
+
+
+def _make_service(embedding_cache=None):
+    return IndexingService(
+        FakeVectorDB(),
+        FakeEmbeddingModel(),
+        bm25=FakeBM25(),
+        dense_matrix=FakeDenseMatrix(),
+        embedding_cache=embedding_cache or EmbeddingCache(enabled=False),
+    )
+
+
+def test_index_documents_batch_applies_bm25_deltas_per_batch():
+    service = _make_service()
+    service.batch_size = 2
+    documents = [
+        {"id": f"card_{i}", "text": f"단어 {i}", "metadata": {"type": "card"}}
+        for i in range(3)
+    ]
+
+    indexed = asyncio.run(service.index_documents_batch(documents, "card_check"))
+
+    assert indexed == 3
+    assert service.vector_db.collection.upserted_ids == ["card_0", "card_1", "card_2"]
+    assert service.bm25.upserts == [
+        ("card_check", ["card_0", "card_1"]),
+        ("card_check", ["card_2"]),
+    ]
+    assert service.dense_matrix.upserts == [
+        ("card_check", ["card_0", "card_1"], 2),
+        ("card_check", ["card_2"], 1),
+    ]
+
+
+def test_clear_collection_removes_bm25_documents():
+    service = _make_service()
+
+    result = service.clear_collection("pdf_documents")
+
+    assert result["status"] == "success"
+    assert service.bm25.deleted_collections == ["pdf_documents"]
+    assert service.dense_matrix.deleted_collections == ["pdf_documents"]
+
+
+def test_indexing_bumps_index_generation(generation_file):
+    service = _make_service()
+    documents = [{"id": "card_0", "text": "단어 0", "metadata": {}}]
+
+    asyncio.run(service.index_documents_batch(documents, "card_check"))
+    service.clear_collection("card_check")
+
+    assert generation_file.read_text() == "2"
+    assert generation_file.with_name("index_generation.bm25").read_text() == "2"
+    # 이 워커의 BM25 는 이미 반영했으므로 자기 세대 증가를 알려 재로드하지 않게 한다
+    assert service.bm25.acknowledged == [1, 2]
+    assert service.dense_matrix.acknowledged == [1, 2]
+    # 삭제 후 스냅샷 저장 (재시작한 워커가 삭제 전 스냅샷을 읽지 않도록)
+    assert service.bm25.snapshots == 1
+
+
+def test_pdf_indexing_persists_bm25_snapshot(monkeypatch):
+    from app.infrastructure.loaders import pdf_loader
+
+    monkeypatch.setattr(pdf_loader, "load_pdf_documents", lambda: [{"id": "rule_1"}])
+    service = _make_service()
+    service.embedding_model.prepare_documents_for_indexing = lambda data, name: [
+        {"id": "rule_1", "text": "제1항", "metadata": {}}
+    ]
+
+    result = asyncio.run(service.index_pdf_documents())
+
+    assert result["indexed_count"] == 1
+    assert service.bm25.snapshots == 1
+
+
+def test_non_bm25_collection_does_not_bump_bm25_generation(generation_file):
+    service = _make_service()
+    documents = [{"id": "q_0", "text": "되와 돼는 어떻게 달라?", "metadata": {}}]
+
+    asyncio.run(service.index_documents_batch(documents, "card_check_questions"))
+
+    assert generation_file.read_text() == "1"
+    assert not generation_file.with_name("index_generation.bm25").exists()
+
+
+def test_reindexing_embeds_only_new_or_changed_texts(embedding_cache):
+    documents = [{"id": f"card_{i}", "text": f"단어 {i}", "metadata": {}} for i in range(3)]
+    asyncio.run(_make_service(embedding_cache).index_documents_batch(documents, "card_check"))
+
+    service = _make_service(embedding_cache)
+    documents[1] = {"id": "card_1", "text": "단어 1 (수정)", "metadata": {}}
+    documents.append({"id": "card_3", "text": "단어 3", "metadata": {}})
+    indexed = asyncio.run(service.index_documents_batch(documents, "card_check"))
+
+    assert indexed == 4
+    assert service.embedding_model.embedded == ["단어 1 (수정)", "단어 3"]
+    assert service.vector_db.collection.upserted_ids == ["card_0", "card_1", "card_2", "card_3"]